@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+# Sizes the batches of an import by the width of its rows, so narrow and wide files both send batches of about the
+# same number of bytes, adjusting them from the time each batch takes to write
+
+import sys
+
+# Bytes of SQL per batch aimed for when the batch section sets no target and the server reports no packet limit
+__batch_bytes__ = 16 * 1024 * 1024
+
+# Rows per batch kept at least, and at most when the importer declares no batch_size for the type
+__min_batch_rows__ = 100
+__max_batch_rows__ = 200000
+
+# Settings of the batch section that turn on sizing batches by the width of their rows
+__adaptive_settings__ = ["bytes", "memory", "seconds"]
+
+# Rows of each batch measured to estimate the width of a row
+__sample_rows__ = 64
+
+
+class BatchSizer:
+    """
+    Import.Batching.BatchSizer class holds the number of rows per batch of one type of file. Batches start at the
+    row count of the batch section and are only resized when it sets bytes, memory or seconds
+    """
+
+    def __init__(
+        self,
+        rows: int,
+        max_rows: int = __max_batch_rows__,
+        target_bytes: int | None = None,
+        packet_bytes: int | None = None,
+        memory_bytes: int | None = None,
+        seconds: float | None = None,
+        buffered: int = 1
+    ) -> None:
+        """
+        __init__ Starts at a fixed number of rows per batch
+
+        :param int rows: The number of rows per batch until rows are measured
+        :param int max_rows: The number of rows per batch at most
+        :param int | None target_bytes: The estimated bytes of SQL per batch aimed for
+        :param int | None packet_bytes: The bytes of the largest statement the server accepts
+        :param int | None memory_bytes: The bytes of parsed rows held in memory at most
+        :param float | None seconds: The seconds each batch should take to write and commit
+        :param int buffered: The number of batches held in memory at once
+        :return: None
+        """
+        self.adaptive = any(value is not None for value in [target_bytes, memory_bytes, seconds])
+        self.max_rows = max_rows
+        self.rows = max(1, min(rows, max_rows))
+        self.target_bytes = target_bytes or packet_bytes or __batch_bytes__
+        self.packet_bytes = packet_bytes
+        self.memory_limit = memory_bytes
+        self.seconds = seconds
+        self.buffered = buffered
+        # Estimated bytes of SQL and of memory per row, and the factor applied to the target from write latency
+        self.row_bytes = None
+        self.row_memory = None
+        self.scale = 1.0
+
+    @classmethod
+    def from_config(
+        cls,
+        batch_limits: dict,
+        t: str,
+        max_rows: int = __max_batch_rows__,
+        packet_bytes: int | None = None,
+        buffered: int = 1
+    ) -> "BatchSizer":
+        """
+        from_config Returns the sizer of a type of file from the batch section of the config file
+
+        :param dict batch_limits: The batch section of the config file
+        :param str t: String representing the type of file being imported
+        :param int max_rows: The number of rows per batch at most
+        :param int | None packet_bytes: The bytes of the largest statement the server accepts
+        :param int buffered: The number of batches held in memory at once
+        :return: The sizer
+        :rtype: BatchSizer
+        """
+        return cls(
+            batch_limits[t],
+            max_rows,
+            batch_limits.get("bytes"),
+            packet_bytes,
+            batch_limits.get("memory"),
+            batch_limits.get("seconds"),
+            buffered
+        )
+
+    @staticmethod
+    def statement_bytes(row: tuple) -> int:
+        """
+        statement_bytes Estimates the bytes a row adds to a multi-row INSERT, with its quotes and separators
+
+        :param tuple row: The prepared values of a row
+        :return: The estimated bytes
+        :rtype: int
+        """
+        return 3 + sum(4 if value is None else len(str(value)) + 3 for value in row)
+
+    @staticmethod
+    def memory_bytes(row: tuple) -> int:
+        """
+        memory_bytes Returns the bytes a parsed row holds in memory, not counting values shared with other rows
+
+        :param tuple row: The prepared values of a row
+        :return: The bytes
+        :rtype: int
+        """
+        return sys.getsizeof(row) + sum(map(sys.getsizeof, row))
+
+    def observe_rows(self, data: list[tuple]) -> None:
+        """
+        observe_rows Measures a sample of a parsed batch and resizes the batches to come
+
+        :param list[tuple] data: A list of tuples of SQL ready prepared parameters
+        :return: None
+        """
+        if not self.adaptive or len(data) == 0:
+            return
+        sample = data[::max(1, len(data) // __sample_rows__)]
+        self.row_bytes = sum(map(self.statement_bytes, sample)) / len(sample)
+        self.row_memory = sum(map(self.memory_bytes, sample)) / len(sample)
+        self.resize()
+
+    def observe_write(self, rows: int, seconds: float) -> None:
+        """
+        observe_write Scales the batches to come towards the seconds each batch should take to write and commit.
+        Batches cut short by the end of a file are not measured
+
+        :param int rows: The number of rows in the batch
+        :param float seconds: The seconds the batch took to write and commit
+        :return: None
+        """
+        if self.seconds is None or self.row_bytes is None or rows < self.rows // 2:
+            return
+        # Moving at most half or one and a half times per batch, so one slow commit does not collapse the batches
+        self.scale *= min(max(self.seconds / max(seconds, 1e-6), 0.5), 1.5)
+        self.resize()
+
+    def resize(self) -> None:
+        """
+        resize Sets the rows per batch from the target bytes and write latency, within the row, packet and memory
+        limits
+
+        :return: None
+        """
+        base = self.target_bytes / self.row_bytes
+        limit = float(self.max_rows)
+        if self.packet_bytes is not None:
+            limit = min(limit, self.packet_bytes / self.row_bytes)
+        if self.memory_limit is not None:
+            limit = min(limit, self.memory_limit / (self.row_memory * self.buffered))
+        floor = min(float(__min_batch_rows__), limit)
+        # Keeping the scale within the limits, so it turns around as soon as the write latency does
+        self.scale = min(max(self.scale, floor / base), limit / base)
+        self.rows = max(1, int(base * self.scale))
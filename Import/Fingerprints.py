@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+# Holds the stored fingerprints of a delta import in sorted arrays per county, about 17 bytes per voter record, so a
+# statewide voter file of millions of records is compared without a dictionary and set entry for each of them
+
+import array
+import bisect
+from typing import Iterable
+
+
+class FingerprintIndex:
+    """
+    Import.Fingerprints.FingerprintIndex class looks up the stored fingerprint of each imported record and marks it
+    seen, so the stored records of the imported counties missing from the import can be listed once it completes
+    """
+
+    def __init__(self, rows: Iterable[tuple]) -> None:
+        """
+        __init__ Reads the stored fingerprints, best given in county code and voter id order so no county is sorted
+
+        :param Iterable[tuple] rows: County code, voter id and fingerprint of each stored record
+        :return: None
+        """
+        self.voter_ids = {}
+        self.fingerprints = {}
+        for county_code, voter_id, fingerprint in rows:
+            if county_code not in self.voter_ids:
+                self.voter_ids[county_code] = array.array("Q")
+                self.fingerprints[county_code] = array.array("q")
+            self.voter_ids[county_code].append(voter_id)
+            self.fingerprints[county_code].append(fingerprint)
+        for county_code, voter_ids in self.voter_ids.items():
+            if any(voter_ids[i] > voter_ids[i + 1] for i in range(len(voter_ids) - 1)):
+                order = sorted(range(len(voter_ids)), key=voter_ids.__getitem__)
+                self.voter_ids[county_code] = array.array("Q", (voter_ids[i] for i in order))
+                self.fingerprints[county_code] = array.array(
+                    "q", (self.fingerprints[county_code][i] for i in order)
+                )
+        # A byte per stored record, set once the import has seen it, and the counties the import has seen
+        self.seen = {county_code: bytearray(len(voter_ids)) for county_code, voter_ids in self.voter_ids.items()}
+        self.counties = set()
+
+    def __len__(self) -> int:
+        """
+        __len__ Returns the number of stored fingerprints
+
+        :return: The number of fingerprints
+        :rtype: int
+        """
+        return sum(map(len, self.voter_ids.values()))
+
+    def see(self, key: tuple[str, int]) -> int | None:
+        """
+        see Marks a record as seen by the import and returns its stored fingerprint
+
+        :param tuple[str, int] key: County code and voter id of the record
+        :return: The stored fingerprint, None for a record without one
+        :rtype: int | None
+        """
+        county_code, voter_id = key
+        self.counties.add(county_code)
+        voter_ids = self.voter_ids.get(county_code)
+        if voter_ids is None:
+            return None
+        i = bisect.bisect_left(voter_ids, voter_id)
+        if i == len(voter_ids) or voter_ids[i] != voter_id:
+            return None
+        self.seen[county_code][i] = 1
+        return self.fingerprints[county_code][i]
+
+    def missing(self) -> list[tuple[str, int]]:
+        """
+        missing Returns the stored records of the counties seen by the import that it did not see
+
+        :return: County code and voter id of each missing record
+        :rtype: list[tuple[str, int]]
+        """
+        return [
+            (county_code, self.voter_ids[county_code][i])
+            for county_code in sorted(self.counties & self.voter_ids.keys())
+            for i, seen in enumerate(self.seen[county_code]) if not seen
+        ]
@@ -2,10 +2,7 @@
 
 # Handles Raw data import methods for Georgia data
 
-import csv
-import datetime
-import io
-import zipfile
+from typing import Callable
 
 import Warehouse.GeorgiaSQL as StateSQL
 from Import.State import State
@@ -14,6 +11,17 @@
 from Import.GeorgiaCodes import __parties__
 from Import.GeorgiaCodes import __history_import_map__
 
+# Reverse lookups built once from the code tables, keyed by the normalized names found in the raw files
+__county_codes__ = {v.replace(" ", "").lower(): k for k, v in reversed(__counties__.items())}
+__unknown_county_code__ = __county_codes__["unknown"]
+__election_type_codes__ = {v: k for k, v in reversed(__election_types__.items())}
+# Every prefix of every normalized party name, the first party in code table order winning shared prefixes
+__party_prefixes__ = {
+    normalized[0:length]: code
+    for code, normalized in reversed([(k, v.replace(" ", "").replace("-", "").lower()) for k, v in __parties__.items()])
+    for length in range(1, len(normalized) + 1)
+}
+
 
 class Georgia(State):
     """
@@ -27,70 +35,20 @@ class Georgia(State):
         },
         "histories": {
             "sql": "set_history",
-            "parse": "parse_history_into_tuple"
+            "load": "load_history",
+            "parse": "compile_history_parser",
+            "fields": __history_import_map__.keys(),
+            "turnout": ["county_code", "voter_id", "election_date", "election_type"]
         }
     }
-
-    def import_source(self, file: str, t: str) -> None:
-        """
-        import_source Reads in a Voter or History File in Zip format and sends it to the datastore.
-
-        :param str t: String representing the type of zip file to import
-        :param str file: The full path to the Zip file
-        :return: None
-        """
-        self.db.init_schema()
-        try:
-            with zipfile.ZipFile(file, mode="r") as archive:
-                for info in archive.infolist():
-                    print(f"Filename: {info.filename}")
-                    print(f"Modified: {datetime.datetime(*info.date_time)}")
-                    print(f"Normal size: {info.file_size} bytes")
-                    print(f"Compressed size: {info.compress_size} bytes")
-                    print("-" * 20)
-                    data = []
-                    records_imported = 0
-                    with archive.open(info.filename, "r") as f:
-                        reader = csv.DictReader(
-                            io.TextIOWrapper(f, newline='')
-                        )
-                        for row in reader:
-                            if t in self.valid_import_types.keys():
-                                if len(data) < self.db.batch_limits[t]:
-                                    data.append(getattr(self, self.valid_import_types[t]["parse"])(
-                                        row
-                                    ))
-
-                                else:
-                                    print(f"Importing batch of {len(data)} records from {info.filename}..")
-                                    self.db.executemany_prepared_sql(
-                                        getattr(StateSQL, self.valid_import_types[t]["sql"])(),
-                                        data
-                                    )
-                                    records_imported += len(data)
-                                    data = []
-                            else:
-                                raise ValueError(f"Usage: Type 't' {t} is not valid")
-                        if len(data) > 0:
-                            if t in self.valid_import_types.keys():
-                                print(f"Importing batch of {len(data)} records from {info.filename}..")
-                                self.db.executemany_prepared_sql(
-                                    getattr(StateSQL, self.valid_import_types[t]["sql"])(),
-                                    data
-                                )
-                                records_imported += len(data)
-                            else:
-                                raise ValueError(f"Usage: Type 't' {t} is not valid")
-                        print(f"{records_imported} total records imported")
-                        print("-" * 20)
-        except Exception as error:
-            print('Caught this error: ' + repr(error))
-            raise
+    state_sql = StateSQL
+    text_options = {"newline": ''}
+    csv_options = {}
 
     @staticmethod
     def get_party_code(name: str) -> str:
         """
-        Convert a party name to it's party code
+        Convert a party name, or the start of one, to it's party code
 
         :param str name: The long name for a party
         :return: The party code
@@ -100,14 +58,9 @@ def get_party_code(name: str) -> str:
         name = name.strip().replace(" ", "").replace("-", "").lower()
         if name == '':
             return ''
-        else:
-            return list(__parties__.keys())[
-                list(
-                    map(
-                        lambda x: x.replace(" ", "").replace("-", "").lower()[0:len(name)], __parties__.values()
-                    )
-                ).index(name)
-            ]
+        if name not in __party_prefixes__:
+            raise ValueError(f"{name} is not a known party")
+        return __party_prefixes__[name]
 
     @staticmethod
     def get_county_code(name: str) -> str:
@@ -118,22 +71,7 @@ def get_county_code(name: str) -> str:
         :return: The county code
         :rtype str
         """
-        name = name.replace(" ", "").lower()
-        if name in list(
-            map(lambda x: x.replace(" ", "").lower(), __counties__.values())
-        ):
-            return list(__counties__.keys())[
-                list(
-                    map(
-                        lambda x: x.replace(" ", "").lower(),
-                        __counties__.values()
-                    )
-                ).index(name)
-            ]
-        else:
-            return list(__counties__.keys())[
-                list(__counties__.values()).index('UNKNOWN')
-            ]
+        return __county_codes__.get(name.replace(" ", "").lower(), __unknown_county_code__)
 
     @staticmethod
     def get_election_type(name: str) -> str:
@@ -146,44 +84,26 @@ def get_election_type(name: str) -> str:
         """
         if name == '':
             name = "UNKNOWN"
-        return list(__election_types__.keys())[
-            list(__election_types__.values()).index(name)
-        ]
+        if name not in __election_type_codes__:
+            raise ValueError(f"{name} is not a known election type")
+        return __election_type_codes__[name]
 
     @staticmethod
-    def parse_history_into_tuple(history: dict) -> tuple[str | None, ...]:
+    def compile_history_parser(header: list[str], export_date: str) -> Callable[[list[str]], tuple]:
         """
-        Build a temporary dictionary from raw voter binary string
+        Build a row parser for a history file with the provided header
 
-        :param bytes history: A byte string containing a raw row of history data
-        :return: A tuple of SQL ready prepared parameters
-        :rtype: tuple[str | None, ...]
+        :param list[str] header: The column names of the history file
+        :param str export_date: Export date string in YYYY-MM-DD format (not stored for Georgia)
+        :return: A function converting a raw row of history data into a tuple of SQL ready prepared parameters
+        :rtype: Callable[[list[str]], tuple]
         """
-        row = {}
-        for k, v in __history_import_map__.items():
-            if k in history:
-                # handle matching keys
-                row[k] = history[k].strip()
-            else:
-                # handle non-matching keys
-                row[k] = ''
-                for match in v:
-                    if match in history:
-                        row[k] = history[match].strip()
-                        break
-        for k in ["election_date"]:
-            if len(row[k]) < 10:
-                row[k] = None
-            else:
-                row[k] = datetime.datetime.strptime(row[k], "%m/%d/%Y").strftime('%Y-%m-%d')
-        for k in ["absentee", "provisional", "supplemental"]:
-            if row[k].upper() == 'Y':
-                row[k] = 1
-            else:
-                row[k] = 0
-        row['county_code'] = Georgia.get_county_code(row['county_code'])
-        row['party'] = Georgia.get_party_code(row['party'])
-        row['election_type'] = Georgia.get_election_type(row['election_type'])
-        if row['voter_id'] == '':
-            row['voter_id'] = 0
-        return tuple(row.values())
+        transforms = [("election_date", State.format_date)]
+        transforms += [(k, lambda v: 1 if v.upper() == 'Y' else 0) for k in ["absentee", "provisional", "supplemental"]]
+        transforms += [
+            ("county_code", Georgia.get_county_code),
+            ("party", Georgia.get_party_code),
+            ("election_type", Georgia.get_election_type),
+            ("voter_id", lambda v: 0 if v == '' else v)
+        ]
+        return State.compile_parser(header, __history_import_map__, transforms)
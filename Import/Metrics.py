@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+
+# Measures where the time of importing each Zip file member goes and writes the measurements as JSON lines or a
+# Prometheus textfile
+
+import io
+import json
+import os
+import time
+from typing import Callable, IO, Iterator
+
+
+class TimedStream(io.BufferedIOBase):
+    """
+    Import.Metrics.TimedStream class wraps a Zip file member, adding the time spent reading and decompressing it
+    and the bytes read to the metrics of the member
+    """
+
+    def __init__(self, stream: IO[bytes], metrics: "MemberMetrics") -> None:
+        """
+        __init__ Wraps an open Zip file member
+
+        :param IO[bytes] stream: The open member
+        :param MemberMetrics metrics: The metrics of the member
+        :return: None
+        """
+        super().__init__()
+        self.stream = stream
+        self.metrics = metrics
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int | None = -1) -> bytes:
+        start = time.perf_counter()
+        data = self.stream.read(size)
+        self.metrics.timings["decompress"] += time.perf_counter() - start
+        self.metrics.bytes += len(data)
+        return data
+
+    def read1(self, size: int = -1) -> bytes:
+        start = time.perf_counter()
+        data = self.stream.read1(size)
+        self.metrics.timings["decompress"] += time.perf_counter() - start
+        self.metrics.bytes += len(data)
+        return data
+
+
+class MemberMetrics:
+    """
+    Import.Metrics.MemberMetrics class accumulates the time spent in each stage of importing a Zip file member.
+    Reading and writing are timed per batch. Decompressing, decoding and parsing are timed per row, and only
+    when detailed
+    """
+
+    def __init__(self, state: str, t: str, archive: str, member: str, detailed: bool = False) -> None:
+        """
+        __init__ Starts measuring the import of a member
+
+        :param str state: The state name
+        :param str t: String representing the type of file being imported
+        :param str archive: The file name of the Zip file
+        :param str member: The name of the archive member
+        :param bool detailed: Whether to time the stages of reading each row
+        :return: None
+        """
+        self.labels = {"state": state, "type": t, "archive": archive, "member": member}
+        self.detailed = detailed
+        self.timings = {"decompress": 0.0, "lines": 0.0, "parse": 0.0, "read": 0.0, "write": 0.0, "commit": 0.0}
+        # Whether rows are parsed by the importing thread, so the parser itself can be timed
+        self.parsed_here = True
+        self.bytes = 0
+        self.rows = 0
+        self.start = time.perf_counter()
+        self.seconds = 0.0
+
+    def stream(self, stream: IO[bytes]) -> IO[bytes]:
+        """
+        stream Returns the member wrapped to time its decompression when detailed
+
+        :param IO[bytes] stream: The open member
+        :return: The stream to decode
+        :rtype: IO[bytes]
+        """
+        return TimedStream(stream, self) if self.detailed else stream
+
+    def lines(self, lines: IO[str]) -> Iterator[str]:
+        """
+        lines Returns the decoded member wrapped to time reading each line when detailed
+
+        :param IO[str] lines: The decoded member
+        :return: An iterator of lines
+        :rtype: Iterator[str]
+        """
+        if not self.detailed:
+            return lines
+        timings = self.timings
+
+        def timed() -> Iterator[str]:
+            while True:
+                start = time.perf_counter()
+                line = next(lines, None)
+                timings["lines"] += time.perf_counter() - start
+                if line is None:
+                    return
+                yield line
+        return timed()
+
+    def parser(self, parse: Callable[[list[str]], tuple]) -> Callable[[list[str]], tuple]:
+        """
+        parser Returns the row parser wrapped to time each row when detailed
+
+        :param Callable[[list[str]], tuple] parse: The compiled row parser
+        :return: The row parser
+        :rtype: Callable[[list[str]], tuple]
+        """
+        if not self.detailed:
+            return parse
+        timings = self.timings
+
+        def timed(row: list[str]) -> tuple:
+            start = time.perf_counter()
+            parsed = parse(row)
+            timings["parse"] += time.perf_counter() - start
+            return parsed
+        return timed
+
+    def batches(self, batches: Iterator[list[tuple]]) -> Iterator[list[tuple]]:
+        """
+        batches Returns the batches of the member wrapped to time producing each one and count its rows
+
+        :param Iterator[list[tuple]] batches: The batches read from the member
+        :return: An iterator of the same batches
+        :rtype: Iterator[list[tuple]]
+        """
+        while True:
+            start = time.perf_counter()
+            data = next(batches, None)
+            self.timings["read"] += time.perf_counter() - start
+            if data is None:
+                return
+            self.rows += len(data)
+            yield data
+
+    def finish(self) -> dict:
+        """
+        finish Stops measuring and returns the measurements of the member
+
+        Decoding covers the text decoding and CSV splitting of the rows. When rows are parsed in worker processes,
+        parsing is the time spent waiting on the workers.
+
+        :return: The labels, stage seconds, rows and bytes of the member with its throughput
+        :rtype: dict
+        """
+        self.seconds = time.perf_counter() - self.start
+        t = self.timings
+        if self.parsed_here:
+            decode = t["read"] - t["decompress"] - t["parse"]
+            parse = t["parse"]
+        else:
+            decode = t["lines"] - t["decompress"]
+            parse = t["read"] - t["lines"]
+        stages = {
+            "decompress": t["decompress"],
+            "decode": max(decode, 0.0),
+            "parse": max(parse, 0.0),
+            "db_wait": max(t["write"] - t["commit"], 0.0),
+            "commit": t["commit"]
+        }
+        return {
+            **self.labels,
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "seconds": self.seconds,
+            "stages": stages if self.detailed else {k: stages[k] for k in ["db_wait", "commit"]},
+            "rows_per_second": self.rows / self.seconds if self.seconds > 0 else 0.0,
+            "bytes_per_second": self.bytes / self.seconds if self.seconds > 0 else 0.0
+        }
+
+
+def write_json_lines(file: str, records: list[dict]) -> None:
+    """
+    write_json_lines Appends the measurements of each member to a file as one JSON object per line
+
+    :param str file: The path of the file
+    :param list[dict] records: The measurements of each member
+    :return: None
+    """
+    with open(file, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def prometheus_labels(labels: dict[str, str]) -> str:
+    """
+    prometheus_labels Returns the label set of a Prometheus sample
+
+    :param dict[str, str] labels: Label values keyed by label name
+    :return: The label set in braces
+    :rtype: str
+    """
+    return "{" + ",".join(
+        f'{k}="' + str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for k, v in labels.items()
+    ) + "}"
+
+
+def write_prometheus(file: str, records: list[dict]) -> None:
+    """
+    write_prometheus Replaces a Prometheus textfile collector file with the measurements of the latest import
+
+    :param str file: The path of the file, ending in .prom
+    :param list[dict] records: The measurements of each member
+    :return: None
+    """
+    gauges = [
+        ("rows", "Rows read from the archive member"),
+        ("bytes", "Uncompressed bytes read from the archive member"),
+        ("seconds", "Seconds spent importing the archive member"),
+        ("rows_per_second", "Rows imported per second"),
+        ("bytes_per_second", "Uncompressed bytes imported per second")
+    ]
+    lines = [
+        "# HELP voterwarehouse_import_stage_seconds Seconds spent in each stage of importing the archive member",
+        "# TYPE voterwarehouse_import_stage_seconds gauge"
+    ]
+    for record in records:
+        labels = {k: record[k] for k in ["state", "type", "archive", "member"]}
+        for stage, seconds in record["stages"].items():
+            stage_labels = prometheus_labels({**labels, "stage": stage})
+            lines.append(f"voterwarehouse_import_stage_seconds{stage_labels} {seconds}")
+    for name, description in gauges:
+        lines.append(f"# HELP voterwarehouse_import_{name} {description}")
+        lines.append(f"# TYPE voterwarehouse_import_{name} gauge")
+        for record in records:
+            labels = {k: record[k] for k in ["state", "type", "archive", "member"]}
+            lines.append(f"voterwarehouse_import_{name}{prometheus_labels(labels)} {record[name]}")
+    # Written beside the file and renamed over it, so the collector never reads a partial file
+    with open(f"{file}.tmp", "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(f"{file}.tmp", file)
+
+
+def write_metrics(file: str, records: list[dict]) -> None:
+    """
+    write_metrics Writes the measurements of each member as a Prometheus textfile for files ending in .prom, or as
+    JSON lines otherwise
+
+    :param str file: The path of the file
+    :param list[dict] records: The measurements of each member
+    :return: None
+    """
+    if file.endswith(".prom"):
+        write_prometheus(file, records)
+    else:
+        write_json_lines(file, records)
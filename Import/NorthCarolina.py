@@ -2,10 +2,7 @@
 
 # Handles Raw data import methods for North Carolina data
 
-import csv
-import datetime
-import io
-import zipfile
+from typing import Callable
 
 import Warehouse.NorthCarolinaSQL as StateSQL
 from Import.NorthCarolinaCodes import __history_import_map__
@@ -21,127 +18,50 @@ class NorthCarolina(State):
     valid_import_types = {
         "voters": {
             "sql": "set_voter",
-            "parse": "parse_voter_into_tuple"
+            "load": "load_voter",
+            "parse": "compile_voter_parser",
+            "fields": __voter_import_map__.keys(),
+            "key": ["county_code", "voter_id"]
         },
         "histories": {
             "sql": "set_history",
-            "parse": "parse_history_into_tuple"
+            "load": "load_history",
+            "parse": "compile_history_parser",
+            "fields": __history_import_map__.keys(),
+            "turnout": ["county_code", "voter_id", "election_date", "election_type"]
         }
     }
-
-    def import_source(self, file: str, t: str) -> None:
-        """
-        import_source Reads in a Voter or History File in Zip format and sends it to the datastore.
-
-        :param str t: String representing the type of zip file to import
-        :param str file: The full path to the Zip file
-        :return: None
-        """
-        self.db.init_schema()
-        try:
-            with zipfile.ZipFile(file, mode="r") as archive:
-                for info in archive.infolist():
-                    print(f"Filename: {info.filename}")
-                    print(f"Modified: {datetime.datetime(*info.date_time)}")
-                    print(f"Normal size: {info.file_size} bytes")
-                    print(f"Compressed size: {info.compress_size} bytes")
-                    print("-" * 20)
-                    data = []
-                    records_imported = 0
-                    with archive.open(info.filename, "r") as f:
-                        reader = csv.DictReader(
-                            io.TextIOWrapper(
-                                f,
-                                newline='\r\n',
-                                encoding='utf-8',
-                                errors='ignore'
-                            ),
-                            delimiter="\t"
-                        )
-                        for row in reader:
-                            if t in self.valid_import_types.keys():
-                                if len(data) < self.db.batch_limits[t]:
-                                    data.append(getattr(self, self.valid_import_types[t]["parse"])(
-                                        row
-                                    ))
-                                else:
-                                    print(f"Importing batch of {len(data)} records from {info.filename}..")
-                                    self.db.executemany_prepared_sql(
-                                        getattr(StateSQL, self.valid_import_types[t]["sql"])(),
-                                        data
-                                    )
-                                    records_imported += len(data)
-                                    data = []
-                            else:
-                                raise ValueError(f"Usage: Type 't' {t} is not valid")
-                        if len(data) > 0:
-                            if t in self.valid_import_types.keys():
-                                print(f"Importing batch of {len(data)} records from {info.filename}..")
-                                self.db.executemany_prepared_sql(
-                                    getattr(StateSQL, self.valid_import_types[t]["sql"])(),
-                                    data
-                                )
-                                records_imported += len(data)
-                            else:
-                                raise ValueError(f"Usage: Type 't' {t} is not valid")
-                        print(f"{records_imported} total records imported")
-                        print("-" * 20)
-        except Exception as error:
-            print('Caught this error: ' + repr(error))
-            raise
+    state_sql = StateSQL
+    text_options = {"newline": '\r\n', "encoding": 'utf-8', "errors": 'ignore'}
 
     @staticmethod
-    def parse_history_into_tuple(history: dict[str, str | None]) -> tuple[str | None, ...]:
+    def compile_history_parser(header: list[str], export_date: str) -> Callable[[list[str]], tuple]:
         """
-        Build a temporary dictionary from raw voter binary string
+        Build a row parser for a history file with the provided header
 
-        :param dict history: A byte string containing a raw row of history data
-        :return: A tuple of SQL ready prepared parameters
-        :rtype: tuple[str | None, ...]
+        :param list[str] header: The column names of the history file
+        :param str export_date: Export date string in YYYY-MM-DD format (not stored for North Carolina)
+        :return: A function converting a raw row of history data into a tuple of SQL ready prepared parameters
+        :rtype: Callable[[list[str]], tuple]
         """
-        row = {}
-        for k, v in __history_import_map__.items():
-            if k in history:
-                # handle matching keys
-                row[k] = history[k].strip()
-            else:
-                # handle non-matching keys
-                row[k] = ''
-                for match in v:
-                    if match in history:
-                        row[k] = history[match].strip()
-                        break
-        for k in ["election_date"]:
-            if len(row[k]) < 10:
-                row[k] = None
-            else:
-                row[k] = datetime.datetime.strptime(row[k], "%m/%d/%Y").strftime('%Y-%m-%d')
-        return tuple(row.values())
+        return State.compile_parser(
+            header,
+            __history_import_map__,
+            [("election_date", State.format_date)]
+        )
 
     @staticmethod
-    def parse_voter_into_tuple(voter: dict[str, str | None]) -> tuple[str | None, ...]:
+    def compile_voter_parser(header: list[str], export_date: str) -> Callable[[list[str]], tuple]:
         """
-        Build a temporary dictionary from raw voter import dictionary
+        Build a row parser for a voter file with the provided header
 
-        :param dict voter: A raw dictionary of voter data
-        :return: A tuple of SQL ready prepared parameters
-        :rtype: tuple[str | None, ...]
+        :param list[str] header: The column names of the voter file
+        :param str export_date: Export date string in YYYY-MM-DD format (not stored for North Carolina)
+        :return: A function converting a raw row of voter data into a tuple of SQL ready prepared parameters
+        :rtype: Callable[[list[str]], tuple]
         """
-        row = {}
-        for k, v in __voter_import_map__.items():
-            if k in voter:
-                # handle matching keys
-                row[k] = voter[k].strip()
-            else:
-                # handle non-matching keys
-                row[k] = ''
-                for match in v:
-                    if match in voter:
-                        row[k] = voter[match].strip()
-                        break
-        for k in ["registration_date"]:
-            if len(row[k]) < 10:
-                row[k] = None
-            else:
-                row[k] = datetime.datetime.strptime(row[k], "%m/%d/%Y").strftime('%Y-%m-%d')
-        return tuple(row.values())
+        return State.compile_parser(
+            header,
+            __voter_import_map__,
+            [("registration_date", State.format_date)]
+        )
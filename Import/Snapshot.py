@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+
+# Keeps the parsed rows of each imported Zip file member as an Arrow IPC file, keyed by the checksum of the Zip file,
+# so later imports of the same file read the rows back instead of decompressing and parsing them again. pyarrow is
+# optional and only imported when snapshots are used
+
+import os
+from typing import Iterator
+
+from Warehouse.version import __version__
+
+
+def require() -> None:
+    """
+    require Checks that pyarrow can be imported before an import relies on it
+
+    :return: None
+    """
+    try:
+        import pyarrow
+    except ImportError:
+        raise ValueError(f"Usage: Snapshots need the pyarrow package, install it with pip install pyarrow")
+
+
+def snapshot_path(directory: str, archive_sha: str, member: str) -> str:
+    """
+    snapshot_path Returns the path of the snapshot of a Zip file member
+
+    :param str directory: The directory holding the snapshots
+    :param str archive_sha: The SHA-256 checksum of the Zip file
+    :param str member: The name of the archive member
+    :return: The path of its Arrow IPC file
+    :rtype: str
+    """
+    return os.path.join(directory, archive_sha, member.replace("/", "_").replace("\\", "_") + ".arrow")
+
+
+def snapshot_metadata(state: str, t: str) -> dict[bytes, bytes]:
+    """
+    snapshot_metadata Returns the schema metadata identifying the parser that wrote a snapshot. Snapshots written
+    by another state, type or version are parsed again, as the parser may have changed
+
+    :param str state: The state name
+    :param str t: String representing the type of file being imported
+    :return: The schema metadata
+    :rtype: dict[bytes, bytes]
+    """
+    return {b"state": state.encode(), b"type": t.encode(), b"version": __version__.encode()}
+
+
+def open_snapshot(path: str, metadata: dict[bytes, bytes]):
+    """
+    open_snapshot Memory maps the snapshot of a member, so its columns are read without copying the file
+
+    :param str path: The path of the snapshot
+    :param dict[bytes, bytes] metadata: The schema metadata the snapshot must have been written with
+    :return: The Arrow IPC file reader, None when there is no usable snapshot
+    """
+    import pyarrow
+    if not os.path.exists(path):
+        return None
+    reader = pyarrow.ipc.open_file(pyarrow.memory_map(path, "r"))
+    if reader.schema.metadata != metadata:
+        return None
+    return reader
+
+
+def mixed_type():
+    """
+    mixed_type Returns the Arrow type of columns holding both integers and text, such as a voter id defaulted to 0
+
+    :return: A dense union of an integer and a text child
+    """
+    import pyarrow
+    return pyarrow.dense_union([pyarrow.field("int", pyarrow.int64()), pyarrow.field("str", pyarrow.string())])
+
+
+def column_type(column: tuple):
+    """
+    column_type Returns the Arrow type keeping the Python type of every value of a parsed column
+
+    :param tuple column: The values of the column in a batch
+    :return: The Arrow type
+    """
+    import pyarrow
+    kinds = {type(value) for value in column if value is not None}
+    if kinds == {int}:
+        return pyarrow.int64()
+    if kinds == {int, str}:
+        return mixed_type()
+    return pyarrow.string()
+
+
+def column_array(column: tuple, arrow_type):
+    """
+    column_array Converts the values of a parsed column to an Arrow array of its type. Values of another Python type
+    raise an ArrowTypeError rather than being converted, so snapshots replay the exact values parsed
+
+    :param tuple column: The values of the column in a batch
+    :param arrow_type: The Arrow type of the column
+    :return: The Arrow array
+    """
+    import pyarrow
+    if arrow_type != mixed_type():
+        return pyarrow.array(column, type=arrow_type)
+    kinds = [0 if type(value) is int else 1 for value in column]
+    counts = [0, 0]
+    offsets = []
+    for kind in kinds:
+        offsets.append(counts[kind])
+        counts[kind] += 1
+    return pyarrow.UnionArray.from_dense(
+        pyarrow.array(kinds, type=pyarrow.int8()),
+        pyarrow.array(offsets, type=pyarrow.int32()),
+        [
+            pyarrow.array([value for value in column if type(value) is int], type=pyarrow.int64()),
+            pyarrow.array([value for value in column if type(value) is not int], type=pyarrow.string())
+        ],
+        ["int", "str"]
+    )
+
+
+def column_values(array) -> list:
+    """
+    column_values Returns the values of an Arrow column as Python values. Integer columns without nulls are read
+    straight from the memory mapped buffer, without an Arrow scalar per value
+
+    :param array: The Arrow array
+    :return: The values
+    :rtype: list
+    """
+    import pyarrow
+    if pyarrow.types.is_int64(array.type) and array.null_count == 0:
+        return memoryview(array.buffers()[1]).cast("q")[array.offset:array.offset + len(array)].tolist()
+    return array.to_pylist()
+
+
+def read_rows(reader) -> Iterator[list[tuple]]:
+    """
+    read_rows Returns the rows of each record batch of a snapshot as prepared tuples, one record batch at a time
+
+    :param reader: The Arrow IPC file reader
+    :return: An iterator of lists of tuples of SQL ready prepared parameters
+    :rtype: Iterator[list[tuple]]
+    """
+    for i in range(reader.num_record_batches):
+        yield list(zip(*map(column_values, reader.get_batch(i).columns)))
+
+
+class SnapshotWriter:
+    """
+    Import.Snapshot.SnapshotWriter class writes the parsed batches of a member to a temporary file, renamed to its
+    snapshot once the whole member is written. Columns whose values are all integers are stored as integers, those
+    holding both integers and text as a union of the two, the others as text
+    """
+
+    def __init__(self, path: str, fields: list[str], metadata: dict[bytes, bytes]) -> None:
+        """
+        __init__ Prepares the snapshot of a member, created with the first batch
+
+        :param str path: The path of the snapshot
+        :param list[str] fields: The names of the parsed fields, extra values being named by position
+        :param dict[bytes, bytes] metadata: The schema metadata identifying the parser
+        :return: None
+        """
+        self.path = path
+        self.fields = fields
+        self.metadata = metadata
+        self.writer = None
+        self.schema = None
+        self.failed = False
+
+    def write(self, data: list[tuple]) -> None:
+        """
+        write Appends a parsed batch to the snapshot as an Arrow record batch. A batch whose values do not fit the
+        column types set by the first batch discards the snapshot, without interrupting the import
+
+        :param list[tuple] data: A list of tuples of SQL ready prepared parameters
+        :return: None
+        """
+        import pyarrow
+        if self.failed or len(data) == 0:
+            return
+        columns = list(zip(*data))
+        try:
+            if self.writer is None:
+                names = self.fields + [f"column_{i}" for i in range(len(self.fields), len(columns))]
+                self.schema = pyarrow.schema([
+                    pyarrow.field(name, column_type(column)) for name, column in zip(names, columns)
+                ], metadata=self.metadata)
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self.writer = pyarrow.ipc.new_file(f"{self.path}.tmp", self.schema)
+            arrays = [column_array(column, field.type) for column, field in zip(columns, self.schema)]
+            self.writer.write_batch(pyarrow.record_batch(arrays, schema=self.schema))
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError, ValueError) as error:
+            print(f"Not keeping a snapshot of {os.path.basename(self.path)}: {error!r}")
+            self.discard()
+
+    def close(self) -> None:
+        """
+        close Finishes the snapshot and puts it in place
+
+        :return: None
+        """
+        if self.writer is not None and not self.failed:
+            self.writer.close()
+            self.writer = None
+            os.replace(f"{self.path}.tmp", self.path)
+
+    def discard(self) -> None:
+        """
+        discard Removes a snapshot that was not finished
+
+        :return: None
+        """
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+            os.remove(f"{self.path}.tmp")
+        self.failed = True
@@ -2,11 +2,106 @@
 
 # Abstract class for handling Raw data import methods for State data
 
+import contextlib
+import csv
+import datetime
+import functools
+import hashlib
+import io
+import itertools
+import operator
+import os
+import queue
+import threading
+import time
+import zipfile
 from abc import ABC, abstractmethod
-from types import TracebackType
-from typing import Optional, Type
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from types import ModuleType, TracebackType
+from typing import IO, Callable, Iterator, Optional, Type
 
+import Import.Batching
+import Import.Fingerprints
+import Import.Metrics
+import Import.Snapshot
 import Warehouse.State
+import Warehouse.StateSQL
+
+# Row parsers compiled inside pool worker processes, keyed by importer class, type, header and export date
+__worker_parsers__ = {}
+
+
+def parse_lines(
+    importer: type,
+    t: str,
+    header: tuple[str, ...],
+    export_date: str,
+    lines: list[str]
+) -> list[tuple]:
+    """
+    parse_lines Parses a chunk of raw lines into prepared tuples inside a pool worker process
+
+    :param type importer: The Import.State subclass that owns the parser
+    :param str t: String representing the type of file being imported
+    :param tuple[str, ...] header: The column names of the source file
+    :param str export_date: Export date string in YYYY-MM-DD format
+    :param list[str] lines: Raw text lines from the source file
+    :return: A list of tuples of SQL ready prepared parameters
+    :rtype: list[tuple]
+    """
+    key = (importer, t, header, export_date)
+    if key not in __worker_parsers__:
+        __worker_parsers__[key] = getattr(importer, importer.valid_import_types[t]["parse"])(
+            list(header),
+            export_date
+        )
+    parse = __worker_parsers__[key]
+    return [parse(row) for row in csv.reader(lines, **importer.csv_options) if row]
+
+
+def import_member_process(
+    importer: type,
+    warehouse: type,
+    config_file: str,
+    load_mode: str,
+    file: str,
+    member: str,
+    t: str,
+    table: str,
+    archive_sha: str,
+    committed: int,
+    metrics: bool = False,
+    snapshots: str | None = None
+) -> tuple[str, int, list[dict]]:
+    """
+    import_member_process Imports one Zip file member inside a pool worker process with its own connection
+
+    :param type importer: The Import.State subclass importing the member
+    :param type warehouse: The Warehouse.State subclass storing the records
+    :param str config_file: Path to the YAML config file
+    :param str load_mode: How batches are sent to the database
+    :param str file: The full path to the Zip file
+    :param str member: The name of the archive member to import
+    :param str t: String representing the type of file being imported
+    :param str table: The name of the table receiving the records
+    :param str archive_sha: The SHA-256 checksum of the Zip file
+    :param int committed: The number of rows an earlier import already committed
+    :param bool metrics: Whether to measure the stages of the import
+    :param str | None snapshots: An optional directory keeping a snapshot of the parsed rows of the member
+    :return: The member name, the number of records imported and the measurements of the member
+    :rtype: tuple[str, int, list[dict]]
+    """
+    with warehouse(config_file, load_mode=load_mode) as db:
+        state = importer(db)
+        state.metrics = [] if metrics else None
+        state.snapshots = snapshots
+        with zipfile.ZipFile(file, mode="r") as archive:
+            records_imported = state.import_member(
+                archive, archive.getinfo(member), t, table, archive_sha, committed
+            )
+        db.set_progress(archive_sha, member, committed + records_imported, True)
+    return member, records_imported, state.metrics or []
 
 
 class State(ABC):
@@ -18,6 +113,18 @@ class State(ABC):
     def valid_import_types(self):
         pass
 
+    @property
+    @abstractmethod
+    def state_sql(self) -> ModuleType:
+        """
+        Warehouse SQL module providing the statements named in valid_import_types
+        """
+        pass
+
+    # Options for decoding zip members into text and splitting text lines into columns
+    text_options = {"newline": '', "encoding": 'utf-8', "errors": 'ignore'}
+    csv_options = {"delimiter": "\t"}
+
     def __init__(self, db: Warehouse.State) -> None:
         """
         __init__ Sets the instance of Warehouse.Florida to a class variable named 'db'.
@@ -26,6 +133,18 @@ def __init__(self, db: Warehouse.State) -> None:
         :return: None
         """
         self.db = db
+        # Stored record fingerprints, marking the records seen so far, set while running a delta import
+        self.fingerprints = None
+        # Counties whose fingerprints were cleared by an import writing their records without fingerprints
+        self.cleared_counties = set()
+        # Measurements of each imported member, collected while an import is measured
+        self.metrics = None
+        # Rows read from each member at most, 0 to read every row
+        self.row_limit = 0
+        # Sizers of the batches of each type of file, kept for every member of an import
+        self.sizers = {}
+        # Directory keeping the parsed rows of each member, None to parse every member
+        self.snapshots = None
 
     def __enter__(self):
         """
@@ -47,18 +166,693 @@ def __exit__(
         :param Optional[Type[BaseException]] exc_type: Execution Type
         :param Optional[BaseException] exc_val: Execution Value
         :param Optional[TracebackType] exc_tb: Execution
-        :return: Always true unless otherwise implemented in the future
+        :return: False, so an exception raised in the with statement reaches the caller
         :rtype: bool
         """
-        return True
+        return False
 
-    @abstractmethod
-    def import_source(self, file: str, t: str) -> None:
+    @staticmethod
+    @functools.lru_cache(maxsize=65536)
+    def format_date(value: str) -> str | None:
+        """
+        format_date Converts a MM/DD/YYYY date into YYYY-MM-DD, mapping suppressed or invalid dates to None
+
+        Files repeat a small set of dates over millions of rows, so conversions are kept in a bounded LRU cache.
+
+        :param str value: The raw date string
+        :return: The SQL ready date or None
+        :rtype: str | None
+        """
+        if len(value) < 10:
+            return None
+        return datetime.datetime.strptime(value, "%m/%d/%Y").strftime('%Y-%m-%d')
+
+    @staticmethod
+    def compile_parser(
+        header: list[str],
+        import_map: dict[str, list[str]],
+        transforms: list[tuple[str, Callable]] | None = None,
+        suffix: tuple = ()
+    ) -> Callable[[list[str]], tuple]:
+        """
+        compile_parser Resolves an import map against a file header once and returns a row parser
+
+        Each target field of the import map is resolved to a source column index, using the field name itself
+        first and then its aliases in order. Fields with no matching column are parsed as an empty string.
+
+        :param list[str] header: The column names of the source file
+        :param dict[str, list[str]] import_map: Target field names mapped to their alternate source column names
+        :param list[tuple[str, Callable]] | None transforms: Ordered (target field, function) pairs applied to
+            the stripped values
+        :param tuple suffix: Constant values appended to every parsed tuple
+        :return: A function converting a raw list of column values into a tuple of SQL ready prepared parameters
+        :rtype: Callable[[list[str]], tuple]
+        """
+        columns = {name: index for index, name in enumerate(header)}
+        fields = list(import_map.keys())
+        indices = []
+        for k, v in import_map.items():
+            index = columns.get(k)
+            if index is None:
+                index = next((columns[match] for match in v if match in columns), None)
+            # Unmatched fields read from an empty column appended to the row
+            indices.append(-1 if index is None else index)
+        pad = -1 in indices
+        getter = operator.itemgetter(*indices) if len(indices) > 1 else lambda r: (r[indices[0]],)
+        steps = [(fields.index(k), f) for k, f in (transforms or [])]
+        strip = str.strip
+
+        def parse(row: list[str]) -> tuple:
+            if pad:
+                row.append('')
+            values = list(map(strip, getter(row)))
+            for i, f in steps:
+                values[i] = f(values[i])
+            return tuple(values) + suffix
+        return parse
+
+    def read_header(self, lines: IO[str], t: str) -> list[str]:
+        """
+        read_header Reads the column names from the first non-empty row of a source file
+
+        :param IO[str] lines: The decoded source file
+        :param str t: String representing the type of file being imported
+        :return: The column names of the source file
+        :rtype: list[str]
+        """
+        for row in csv.reader(lines, **self.csv_options):
+            if row:
+                return row
+        return []
+
+    def batch_sizer(self, t: str, workers: int = 1) -> Import.Batching.BatchSizer:
+        """
+        batch_sizer Returns the sizer of the batches of a type of file, created from the batch section of the config
+        file on first use. Sizing by row width reads the largest statement the server accepts, unless batches are
+        bulk loaded from files
+
+        :param str t: String representing the type of file being imported
+        :param int workers: The number of worker processes parsing rows
+        :return: The sizer
+        :rtype: Import.Batching.BatchSizer
+        """
+        if t not in self.sizers:
+            limits = self.db.batch_limits
+            load = self.db.load_mode == "bulk" and "load" in self.valid_import_types[t]
+            adaptive = any(setting in limits for setting in Import.Batching.__adaptive_settings__)
+            # The batch being parsed, those waiting to be written, those being written and the chunks of workers
+            buffered = 1 + limits.get("queue_depth", 0) + self.db.pool_size + (2 * workers if workers > 1 else 0)
+            self.sizers[t] = Import.Batching.BatchSizer.from_config(
+                limits,
+                t,
+                self.valid_import_types[t].get("batch_size", Import.Batching.__max_batch_rows__),
+                self.db.get_statement_limit() if adaptive and not load else None,
+                buffered
+            )
+        return self.sizers[t]
+
+    def read_batches(self, lines: IO[str], parse: Callable[[list[str]], tuple], t: str) -> Iterator[list[tuple]]:
+        """
+        read_batches Parses the remaining rows of a source file into batches of prepared tuples
+
+        :param IO[str] lines: The decoded source file positioned after the header
+        :param Callable[[list[str]], tuple] parse: The compiled row parser
+        :param str t: String representing the type of file being imported
+        :return: An iterator of lists of tuples of SQL ready prepared parameters
+        :rtype: Iterator[list[tuple]]
+        """
+        sizer = self.batch_sizer(t)
+        data = []
+        for row in csv.reader(lines, **self.csv_options):
+            if not row:
+                continue
+            data.append(parse(row))
+            if len(data) >= sizer.rows:
+                yield data
+                data = []
+        if len(data) > 0:
+            yield data
+
+    def read_batches_parallel(
+        self,
+        lines: IO[str],
+        header: list[str],
+        export_date: str,
+        t: str,
+        executor: Executor,
+        workers: int
+    ) -> Iterator[list[tuple]]:
+        """
+        read_batches_parallel Parses chunks of raw lines in a process pool and yields the batches in file order
+
+        Lines are split on line boundaries, so quoted values spanning several lines are not supported.
+
+        :param IO[str] lines: The decoded source file positioned after the header
+        :param list[str] header: The column names of the source file
+        :param str export_date: Export date string in YYYY-MM-DD format
+        :param str t: String representing the type of file being imported
+        :param Executor executor: The process pool parsing the chunks
+        :param int workers: The number of worker processes in the pool
+        :return: An iterator of lists of tuples of SQL ready prepared parameters
+        :rtype: Iterator[list[tuple]]
+        """
+        sizer = self.batch_sizer(t, workers)
+        pending = deque()
+        chunks = iter(lambda: list(itertools.islice(lines, sizer.rows)), [])
+        for chunk in chunks:
+            pending.append(executor.submit(parse_lines, type(self), t, tuple(header), export_date, chunk))
+            # Keeping a bounded number of chunks in flight so memory stays flat on large files
+            if len(pending) >= workers * 2:
+                data = pending.popleft().result()
+                if len(data) > 0:
+                    yield data
+        while pending:
+            data = pending.popleft().result()
+            if len(data) > 0:
+                yield data
+
+    def read_snapshot_batches(self, reader, t: str, skip: int = 0) -> Iterator[list[tuple]]:
+        """
+        read_snapshot_batches Reads the rows of a member from its snapshot into batches of prepared tuples
+
+        :param reader: The Arrow IPC file reader of the snapshot
+        :param str t: String representing the type of file being imported
+        :param int skip: The number of rows an earlier import already committed
+        :return: An iterator of lists of tuples of SQL ready prepared parameters
+        :rtype: Iterator[list[tuple]]
+        """
+        sizer = self.batch_sizer(t)
+        data = []
+        for rows in Import.Snapshot.read_rows(reader):
+            if skip > 0:
+                skipped = min(skip, len(rows))
+                rows = rows[skipped:]
+                skip -= skipped
+            data.extend(rows)
+            while len(data) >= sizer.rows:
+                yield data[:sizer.rows]
+                data = data[sizer.rows:]
+        if len(data) > 0:
+            yield data
+
+    @staticmethod
+    def prefetch_batches(batches: Iterator[list[tuple]], depth: int) -> Iterator[list[tuple]]:
+        """
+        prefetch_batches Parses batches on a background thread into a bounded queue drained by the caller
+
+        The caller writes each batch to the datastore while the parser thread prepares the next ones, so
+        parsing and database round-trips overlap. Errors raised while parsing are re-raised to the caller.
+
+        :param Iterator[list[tuple]] batches: The batches to produce on the parser thread
+        :param int depth: The maximum number of parsed batches waiting to be written
+        :return: An iterator of lists of tuples of SQL ready prepared parameters
+        :rtype: Iterator[list[tuple]]
+        """
+        ready = queue.Queue(maxsize=depth)
+        stop = threading.Event()
+        done = object()
+        errors = []
+
+        def put(item) -> bool:
+            # Giving up when the writer has stopped so the parser thread never blocks on a full queue
+            while not stop.is_set():
+                try:
+                    ready.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce() -> None:
+            try:
+                for data in batches:
+                    if not put(data):
+                        return
+            except BaseException as error:
+                errors.append(error)
+            finally:
+                put(done)
+
+        parser = threading.Thread(target=produce, name="import-parser", daemon=True)
+        parser.start()
+        try:
+            while (data := ready.get()) is not done:
+                yield data
+            if errors:
+                raise errors[0]
+        finally:
+            stop.set()
+            parser.join()
+
+    @staticmethod
+    def fingerprint(values: tuple) -> int:
+        """
+        fingerprint Returns a 63-bit content hash of prepared values, small enough for every database driver
+
+        :param tuple values: The prepared values of a record
+        :return: The fingerprint as a non-negative integer
+        :rtype: int
+        """
+        return int.from_bytes(hashlib.blake2b(repr(values).encode(), digest_size=8).digest(), "big") >> 1
+
+    def drop_unchanged(self, t: str, data: list[tuple]) -> tuple[list[tuple], list[tuple]]:
+        """
+        drop_unchanged Removes records whose fingerprint matches the stored one from a batch
+
+        Only the fields of the import map are fingerprinted, so appended values such as Florida's export date
+        do not make every record look changed.
+
+        :param str t: String representing the type of file being imported
+        :param list[tuple] data: A list of tuples of SQL ready prepared parameters
+        :return: The new or changed records and the fingerprint rows to store for them
+        :rtype: tuple[list[tuple], list[tuple]]
+        """
+        fields = list(self.valid_import_types[t]["fields"])
+        county, voter = (fields.index(k) for k in self.valid_import_types[t]["key"])
+        width = len(fields)
+        changed = []
+        fingerprints = []
+        for row in data:
+            key = (row[county], int(row[voter] or 0))
+            fingerprint = self.fingerprint(row[:width])
+            if self.fingerprints.see(key) != fingerprint:
+                changed.append(row)
+                fingerprints.append(key + (fingerprint,))
+        return changed, fingerprints
+
+    def clear_fingerprints(self, t: str, data: list[tuple]) -> None:
+        """
+        clear_fingerprints Deletes the stored fingerprints of the counties of a batch written without a delta import,
+        once per county and before the batch is written, so a later delta import does not trust them
+
+        :param str t: String representing the type of file being imported
+        :param list[tuple] data: A list of tuples of SQL ready prepared parameters
+        :return: None
+        """
+        county = list(self.valid_import_types[t]["fields"]).index(self.valid_import_types[t]["key"][0])
+        counties = {row[county] for row in data} - self.cleared_counties
+        if len(counties) > 0:
+            self.db.clear_fingerprints(sorted(counties))
+            self.cleared_counties.update(counties)
+
+    def delete_missing(self, t: str) -> int:
+        """
+        delete_missing Deletes stored records of the imported counties that were missing from the import
+
+        :param str t: String representing the type of file being imported
+        :return: The number of records deleted
+        :rtype: int
+        """
+        missing = self.fingerprints.missing()
+        if len(missing) > 0:
+            print(f"Deleting {len(missing)} records missing from the import..")
+            self.db.delete_voters(t, missing)
+        return len(missing)
+
+    def write_batch(
+        self,
+        t: str,
+        data: list[tuple],
+        table: str,
+        checkpoint: tuple[str, tuple] | None = None
+    ) -> None:
+        """
+        write_batch Sends a batch of prepared tuples to the datastore using its load mode
+
+        :param str t: String representing the type of file being imported
+        :param list[tuple] data: A list of tuples of SQL ready prepared parameters
+        :param str table: The name of the table receiving the batch
+        :param tuple[str, tuple] | None checkpoint: An optional SQL Command and values committed with the batch, or
+            once every earlier batch is committed when the warehouse writes batches on a pool of connections
+        :return: None
+        """
+        fields = list(self.valid_import_types[t].get("fields", []))
+        self.db.add_partitions(t, table, fields, data)
+        data = self.db.intern_dimensions(t, fields, data)
+        load = self.db.load_mode == "bulk" and "load" in self.valid_import_types[t]
+        if load:
+            prepared_sql = getattr(self.state_sql, self.valid_import_types[t]["load"])(table)
+        else:
+            prepared_sql = self.db.write_sql(t, getattr(self.state_sql, self.valid_import_types[t]["sql"])(table))
+        if self.db.pool_size > 1:
+            self.db.submit_prepared_list(prepared_sql, data, checkpoint, load)
+        elif load:
+            self.db.load_prepared_list(prepared_sql, data, checkpoint)
+        else:
+            self.db.executemany_prepared_sql(prepared_sql, data, checkpoint)
+
+    @staticmethod
+    def archive_checksum(file: str) -> str:
+        """
+        archive_checksum Returns the SHA-256 checksum identifying a Zip file in the import checkpoints
+
+        :param str file: The full path to the Zip file
+        :return: The hexadecimal checksum
+        :rtype: str
+        """
+        with open(file, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+    def skip_rows(self, lines: IO[str], rows: int) -> None:
+        """
+        skip_rows Reads past rows of a source file that an earlier import already committed
+
+        :param IO[str] lines: The decoded source file positioned after the header
+        :param int rows: The number of non-empty rows to skip
+        :return: None
+        """
+        if rows > 0:
+            print(f"Skipping {rows} records committed by an earlier import..")
+            for row in csv.reader(lines, **self.csv_options):
+                if row:
+                    rows -= 1
+                    if rows == 0:
+                        break
+
+    def import_member(
+        self,
+        archive: zipfile.ZipFile,
+        info: zipfile.ZipInfo,
+        t: str,
+        table: str,
+        archive_sha: str,
+        committed: int = 0,
+        executor: Executor | None = None,
+        workers: int = 1
+    ) -> int:
+        """
+        import_member Reads in a single file of a Zip archive and sends it to the datastore in batches.
+
+        The number of rows read is checkpointed in the same transaction as each batch, or once every earlier batch is
+        committed when batches are written on a pool of connections. When keeping snapshots, a member with a
+        snapshot is read from it instead of the Zip file, and the snapshot of a member imported from its first row
+        is written as it is parsed.
+
+        :param zipfile.ZipFile archive: The open Zip archive
+        :param zipfile.ZipInfo info: The archive member to import
+        :param str t: String representing the type of file being imported
+        :param str table: The name of the table receiving the records
+        :param str archive_sha: The SHA-256 checksum of the Zip file
+        :param int committed: The number of rows an earlier import already committed
+        :param Executor | None executor: An optional process pool for parsing
+        :param int workers: The number of worker processes in the pool
+        :return: The number of records imported
+        :rtype: int
+        """
+        records_imported = 0
+        rows_read = committed
+        export_date = datetime.datetime(*info.date_time).strftime("%Y-%m-%d")
+        metrics = Import.Metrics.MemberMetrics(
+            type(self).__name__, t, os.path.basename(str(archive.filename)), info.filename, self.metrics is not None
+        )
+        metrics.parsed_here = executor is None
+        sizer = self.batch_sizer(t, workers if executor is not None else 1)
+        commit_seconds = self.db.commit_seconds
+        turnout = None
+        if "turnout" in self.valid_import_types[t]:
+            fields = list(self.valid_import_types[t]["fields"])
+            turnout = operator.itemgetter(*(fields.index(k) for k in self.valid_import_types[t]["turnout"]))
+        snapshot = None
+        writer = None
+        if self.snapshots is not None:
+            path = Import.Snapshot.snapshot_path(self.snapshots, archive_sha, info.filename)
+            snapshot_metadata = Import.Snapshot.snapshot_metadata(type(self).__name__, t)
+            snapshot = Import.Snapshot.open_snapshot(path, snapshot_metadata)
+            if snapshot is None and committed == 0:
+                writer = Import.Snapshot.SnapshotWriter(
+                    path, list(self.valid_import_types[t].get("fields", [])), snapshot_metadata
+                )
+        with contextlib.ExitStack() as stack:
+            if snapshot is not None:
+                print(f"Reading {info.filename} from its snapshot..")
+                batches = self.read_snapshot_batches(snapshot, t, committed)
+            else:
+                f = stack.enter_context(archive.open(info.filename, "r"))
+                lines = io.TextIOWrapper(metrics.stream(f), **self.text_options)
+                header = self.read_header(lines, t)
+                self.skip_rows(lines, committed)
+                if self.row_limit > 0:
+                    lines = itertools.islice(lines, self.row_limit)
+                if executor is None:
+                    batches = self.read_batches(
+                        metrics.lines(lines),
+                        metrics.parser(getattr(self, self.valid_import_types[t]["parse"])(header, export_date)),
+                        t
+                    )
+                else:
+                    batches = self.read_batches_parallel(
+                        metrics.lines(lines), header, export_date, t, executor, workers
+                    )
+            if writer is not None:
+                # Removing the partial snapshot of a member whose import fails
+                stack.callback(writer.discard)
+            batches = metrics.batches(batches)
+            if self.db.batch_limits.get("queue_depth", 0) > 0:
+                batches = self.prefetch_batches(batches, self.db.batch_limits["queue_depth"])
+            with contextlib.closing(batches):
+                for data in batches:
+                    start = time.perf_counter()
+                    sizer.observe_rows(data)
+                    if writer is not None:
+                        writer.write(data)
+                    rows_read += len(data)
+                    checkpoint = (Warehouse.StateSQL.set_progress(), (archive_sha, info.filename, rows_read, 0))
+                    fingerprints = []
+                    if self.fingerprints is not None:
+                        parsed = len(data)
+                        data, fingerprints = self.drop_unchanged(t, data)
+                        if parsed > len(data):
+                            print(f"Skipping {parsed - len(data)} unchanged records from {info.filename}..")
+                    elif "key" in self.valid_import_types[t]:
+                        self.clear_fingerprints(t, data)
+                    if len(data) > 0:
+                        print(f"Importing batch of {len(data)} records from {info.filename}..")
+                        if turnout is not None:
+                            # Merged before the batch is committed, so a resumed import merges it again
+                            self.db.set_turnout(map(turnout, data), table != self.db.import_tables[t]["table"])
+                        written = time.perf_counter()
+                        self.write_batch(t, data, table, checkpoint)
+                        if self.db.pool_size == 1:
+                            # Pooled batches are written on other threads, where their latency is not measured
+                            sizer.observe_write(len(data), time.perf_counter() - written)
+                        records_imported += len(data)
+                    if len(fingerprints) > 0:
+                        self.db.executemany_prepared_sql(Warehouse.StateSQL.set_fingerprint(), fingerprints)
+                    metrics.timings["write"] += time.perf_counter() - start
+            if writer is not None:
+                writer.close()
+        start = time.perf_counter()
+        if self.db.pool_size > 1:
+            self.db.wait_batches()
+        metrics.timings["write"] += time.perf_counter() - start
+        metrics.timings["commit"] = self.db.commit_seconds - commit_seconds
+        if self.metrics is not None:
+            record = metrics.finish()
+            self.metrics.append(record)
+            print(
+                f"{record['rows']} rows in {record['seconds']:.2f}s, {record['rows_per_second']:,.0f} rows/s, "
+                + ", ".join(f"{k} {v:.2f}s" for k, v in record["stages"].items())
+            )
+        return records_imported
+
+    def import_members_parallel(
+        self,
+        file: str,
+        t: str,
+        table: str,
+        archive_sha: str,
+        progress: dict[str, tuple[int, bool]],
+        member_workers: int
+    ) -> int:
+        """
+        import_members_parallel Imports the members of a Zip file in a pool of processes and totals their counts
+
+        :param str file: The full path to the Zip file
+        :param str t: String representing the type of file being imported
+        :param str table: The name of the table receiving the records
+        :param str archive_sha: The SHA-256 checksum of the Zip file
+        :param dict[str, tuple[int, bool]] progress: Checkpoints of an earlier import keyed by member
+        :param int member_workers: The number of worker processes
+        :return: The number of records imported
+        :rtype: int
+        """
+        with zipfile.ZipFile(file, mode="r") as archive:
+            members = [info.filename for info in archive.infolist() if not progress.get(info.filename, (0, False))[1]]
+        print(f"Importing {len(members)} files from {file} with {member_workers} workers..")
+        print("-" * 20)
+        total = 0
+        with ProcessPoolExecutor(max_workers=member_workers) as pool:
+            futures = [
+                pool.submit(
+                    import_member_process,
+                    type(self),
+                    type(self.db),
+                    self.db.config_file,
+                    self.db.load_mode,
+                    file,
+                    member,
+                    t,
+                    table,
+                    archive_sha,
+                    progress.get(member, (0, False))[0],
+                    self.metrics is not None,
+                    self.snapshots
+                )
+                for member in members
+            ]
+            try:
+                for future in as_completed(futures):
+                    member, records_imported, metrics = future.result()
+                    total += records_imported
+                    if self.metrics is not None:
+                        self.metrics.extend(metrics)
+                    print(f"{member}: {records_imported} records imported")
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+        print("-" * 20)
+        print(f"{total} total records imported from {len(members)} files")
+        print("-" * 20)
+        return total
+
+    def import_source(
+        self,
+        file: str,
+        t: str,
+        workers: int = 1,
+        staging: bool = False,
+        delta: bool = False,
+        resume: bool = False,
+        member_workers: int = 1,
+        fast_load: bool = False,
+        metrics: str | None = None,
+        row_limit: int = 0,
+        snapshots: str | None = None
+    ) -> None:
         """
         import_source Reads in a Voter or History File in Zip format and sends it to the datastore.
 
-        :param t: String representing the type of zip file to import
-        :param file: The full path to the Zip file
+        :param str t: String representing the type of zip file to import
+        :param str file: The full path to the Zip file
+        :param int workers: The number of processes parsing rows, 1 parses in this process
+        :param bool staging: Load into an index-free staging table swapped in for the live table once complete,
+            for full refreshes where the Zip file replaces every record of the table
+        :param bool delta: Only send new and changed records, then delete the records of the imported counties
+            missing from the Zip file, for full snapshots of those counties
+        :param bool resume: Skip the members and rows of the Zip file committed by an earlier, interrupted import
+        :param int member_workers: The number of processes importing Zip file members side by side, each with
+            its own database connection
+        :param bool fast_load: When the table is empty, load it without its secondary indexes and build them once
+            the Zip file is imported, for a first full load
+        :param str | None metrics: A file receiving the time spent in each stage of importing every member, as a
+            Prometheus textfile when it ends in .prom and as JSON lines otherwise
+        :param int row_limit: Read at most this many lines of each member, for profiling. Checkpoints of the
+            import are cleared once it completes, as the Zip file was not fully imported
+        :param str | None snapshots: A directory keeping an Arrow IPC snapshot of the parsed rows of each member,
+            keyed by the checksum of the Zip file. Members with a snapshot are read from it instead of being parsed
         :return: None
         """
-        pass
+        if t not in self.valid_import_types.keys():
+            raise ValueError(f"Usage: Type 't' {t} is not valid")
+        if delta and "key" not in self.valid_import_types[t]:
+            raise ValueError(f"Usage: Type 't' {t} does not support delta imports")
+        if delta and staging:
+            raise ValueError(f"Usage: Delta imports can not be combined with staging")
+        if delta and resume:
+            # Rerunning a delta import already skips the records committed before the interruption
+            raise ValueError(f"Usage: Delta imports can not be resumed, rerun them instead")
+        if member_workers > 1 and (delta or workers > 1):
+            raise ValueError(f"Usage: Member workers can not be combined with delta imports or parse workers")
+        if member_workers > 1 and not self.db.poolable:
+            # Each worker process opens the database of the config file again, which would be a new empty one
+            raise ValueError(f"Usage: Member workers are not available for this database")
+        if delta and self.db.pool_size > 1:
+            # Fingerprints are committed with each batch, before a pooled batch is known to be committed
+            raise ValueError(f"Usage: Delta imports can not be combined with a connection pool")
+        if row_limit > 0 and (staging or delta or member_workers > 1):
+            # A partial file must not replace the live table or have the records missing from it deleted
+            raise ValueError(f"Usage: Row limits can not be combined with staging, delta imports or member workers")
+        if row_limit > 0 and snapshots is not None:
+            # A snapshot of the first rows would be read back as the whole member
+            raise ValueError(f"Usage: Row limits can not be combined with snapshots")
+        if snapshots is not None:
+            Import.Snapshot.require()
+        if fast_load and (staging or resume):
+            # An interrupted fast load leaves a table with records but without its indexes, staging resumes instead
+            raise ValueError(f"Usage: Fast loads can not be combined with staging or resumed, use staging instead")
+        self.db.init_schema()
+        archive_sha = self.archive_checksum(file)
+        if resume:
+            progress = self.db.get_progress(archive_sha)
+        else:
+            # Starting over, so checkpoints of an earlier import of the same archive no longer apply
+            self.db.clear_progress(archive_sha)
+            progress = {}
+        if progress.get("", (0, False))[1]:
+            print(f"{file} was already imported")
+            return
+        table = self.db.begin_staging(t, resume) if staging else self.db.import_tables[t]["table"]
+        if staging and "key" in self.valid_import_types[t]:
+            # The staged table replaces every county, including those missing from the Zip file
+            self.db.clear_fingerprints()
+        if staging and "turnout" in self.valid_import_types[t]:
+            # The staged histories replace every record, so their turnout is built again alongside them
+            self.db.begin_turnout_staging(resume)
+        if fast_load:
+            fast_load = self.db.begin_fast_load(t)
+        if delta:
+            self.fingerprints = Import.Fingerprints.FingerprintIndex(self.db.get_fingerprints())
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        self.metrics = [] if metrics is not None else None
+        self.row_limit = row_limit
+        self.snapshots = snapshots
+        try:
+            if member_workers > 1:
+                self.import_members_parallel(file, t, table, archive_sha, progress, member_workers)
+            else:
+                with zipfile.ZipFile(file, mode="r") as archive:
+                    for info in archive.infolist():
+                        print(f"Filename: {info.filename}")
+                        print(f"Modified: {datetime.datetime(*info.date_time)}")
+                        print(f"Normal size: {info.file_size} bytes")
+                        print(f"Compressed size: {info.compress_size} bytes")
+                        print("-" * 20)
+                        committed, completed = progress.get(info.filename, (0, False))
+                        if completed:
+                            print(f"Skipping {info.filename}, imported by an earlier import")
+                            print("-" * 20)
+                            continue
+                        records_imported = self.import_member(
+                            archive, info, t, table, archive_sha, committed, executor, workers
+                        )
+                        self.db.set_progress(archive_sha, info.filename, committed + records_imported, True)
+                        print(f"{records_imported} total records imported")
+                        print("-" * 20)
+            if staging:
+                self.db.finish_staging(t)
+                if "turnout" in self.valid_import_types[t]:
+                    self.db.finish_turnout_staging()
+            if fast_load:
+                self.db.finish_fast_load(t)
+            if delta:
+                self.delete_missing(t)
+            if row_limit > 0:
+                self.db.clear_progress(archive_sha)
+            else:
+                # The empty member marks the whole archive as imported
+                self.db.set_progress(archive_sha, "", 0, True)
+        except Exception as error:
+            print('Caught this error: ' + repr(error))
+            raise
+        finally:
+            self.fingerprints = None
+            self.cleared_counties = set()
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+            if metrics is not None and len(self.metrics) > 0:
+                Import.Metrics.write_metrics(metrics, self.metrics)
+            self.metrics = None
+            self.row_limit = 0
+            self.sizers = {}
+            self.snapshots = None
@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+
+# Database drivers, each opening connections and translating the MariaDB SQL of the *SQL modules into its dialect.
+# Each imports its database library on first use, so only the configured one is loaded
+
+import contextlib
+import functools
+import re
+from abc import ABC, abstractmethod
+
+
+class Driver(ABC):
+    """
+    Warehouse.Drivers.Driver abstract class connects to a database and translates SQL for it
+    """
+
+    # Whether LOAD DATA LOCAL INFILE is available for the "bulk" load mode
+    bulk_load = False
+
+    # Whether tables can be partitioned by the partitioning section of the config file
+    partitioning = False
+
+    # Whether the server limits the size of a statement by its max_allowed_packet
+    packet_limit = False
+
+    @staticmethod
+    @abstractmethod
+    def connect(database: dict, local_infile: bool = False):
+        """
+        connect Opens a DB-API connection
+
+        :param dict database: The database section of the config file
+        :param bool local_infile: Whether LOAD DATA LOCAL INFILE is needed
+        :return: The connection
+        """
+        pass
+
+    @staticmethod
+    def poolable(database: dict) -> bool:
+        """
+        poolable Returns whether several connections to the database see the same data, so they can be pooled
+
+        :param dict database: The database section of the config file
+        :return: Whether the connections can be pooled
+        :rtype: bool
+        """
+        return True
+
+    @staticmethod
+    @abstractmethod
+    def translate(sql: str) -> tuple[str, ...]:
+        """
+        translate Translates a MariaDB SQL string into the statements of the dialect
+
+        :param str sql: A SQL String from a *SQL module
+        :return: The statements to run in its place, none when the dialect has no equivalent
+        :rtype: tuple[str, ...]
+        """
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def cursor(db, stream: bool = False):
+        """
+        cursor Returns a cursor usable as a context manager, with rows readable by column name unless streamed
+
+        :param db: The connection
+        :param bool stream: Fetch rows as tuples, one at a time, instead of buffering the result
+        :return: The cursor
+        """
+        pass
+
+    @staticmethod
+    def limit_statements(cursor, length: int) -> None:
+        """
+        limit_statements Sets the bytes a cursor packs into each statement when it sends many rows at once
+
+        :param cursor: The cursor
+        :param int length: The bytes of the largest statement the server accepts
+        :return: None
+        """
+        pass
+
+
+class MariaDB(Driver):
+    """
+    Warehouse.Drivers.MariaDB class connects to MariaDB or MySQL with PyMySQL
+    """
+
+    bulk_load = True
+    partitioning = True
+    packet_limit = True
+
+    @staticmethod
+    def connect(database: dict, local_infile: bool = False):
+        import pymysql.cursors
+        return pymysql.connect(
+            host=database["host"],
+            port=database["port"],
+            user=database["user"],
+            password=database["password"],
+            database=database["schema"],
+            cursorclass=pymysql.cursors.DictCursor,
+            local_infile=local_infile
+        )
+
+    @staticmethod
+    def translate(sql: str) -> tuple[str, ...]:
+        return (sql,)
+
+    @staticmethod
+    def cursor(db, stream: bool = False):
+        import pymysql.cursors
+        return db.cursor(pymysql.cursors.SSCursor) if stream else db.cursor()
+
+    @staticmethod
+    def limit_statements(cursor, length: int) -> None:
+        # PyMySQL packs the rows of executemany into INSERT statements of at most 1 MB unless told otherwise
+        cursor.max_stmt_length = length
+
+
+# Table options and column attributes SQLite has no use for
+__sqlite_removals__ = re.compile(
+    r"\s+(?:CHARACTER SET \w+|COLLATE \w+|unsigned|ON UPDATE CURRENT_TIMESTAMP)|\s*ENGINE=[^;]*",
+    re.IGNORECASE
+)
+__sqlite_create_table__ = re.compile(r"CREATE TABLE IF NOT EXISTS `(\w+)`", re.IGNORECASE)
+__sqlite_inline_key__ = re.compile(r",\s*KEY `(\w+)` \(([^)]*)\)")
+__sqlite_add_indexes__ = re.compile(r"ALTER TABLE `(\w+)` (ADD INDEX .*);", re.IGNORECASE | re.DOTALL)
+__sqlite_add_index__ = re.compile(r"ADD INDEX `(\w+)` \(([^)]*)\)")
+__sqlite_rename__ = re.compile(r"`(\w+)` TO `(\w+)`")
+__sqlite_auto_increment__ = re.compile(r"`(\w+)` \w+(?:\(\d+\))?[^,(]*AUTO_INCREMENT")
+__sqlite_unique_key__ = re.compile(r"UNIQUE KEY `\w+`")
+__sqlite_on_duplicate__ = re.compile(r"\s*ON DUPLICATE KEY UPDATE (.*);$", re.IGNORECASE | re.DOTALL)
+__sqlite_update_value__ = re.compile(r"`(\w+)` = VALUES\(`\w+`\)")
+__sqlite_columns__ = re.compile(r"FROM information_schema\.`COLUMNS`", re.IGNORECASE)
+__sqlite_values__ = re.compile(r"VALUES\((`\w+`)\)")
+__sqlite_refresh__ = re.compile(r"`(\w+)` = IF\(.*?, VALUES\(`\1`\), `\1`\)", re.DOTALL)
+
+
+def sqlite_concat(*values):
+    """
+    sqlite_concat Joins binary strings, or text when every value is text, as CONCAT does in MariaDB
+
+    :param values: The strings to join
+    :return: The joined string, None when a value is NULL
+    """
+    if any(value is None for value in values):
+        return None
+    if all(isinstance(value, str) for value in values):
+        return "".join(values)
+    return b"".join(value if isinstance(value, bytes) else str(value).encode() for value in values)
+
+
+def sqlite_rpad(value, length: int, pad):
+    """
+    sqlite_rpad Pads or cuts a string on the right to a length, as RPAD does in MariaDB
+
+    :param value: The string
+    :param int length: The length of the result
+    :param pad: The string repeated on the right
+    :return: The padded string, None when an argument is NULL or the length is negative
+    """
+    if value is None or length is None or pad is None or length < 0:
+        return None
+    return (value + pad * length)[:length]
+
+
+def sqlite_ascii(value) -> int | None:
+    """
+    sqlite_ascii Returns the value of the first byte of a string, 0 for an empty string, as ASCII does in MariaDB
+
+    :param value: The string
+    :return: The value of the byte, None when the string is NULL
+    :rtype: int | None
+    """
+    if value is None:
+        return None
+    value = value.encode() if isinstance(value, str) else bytes(value)
+    return value[0] if len(value) > 0 else 0
+
+
+def sqlite_char(value: int) -> bytes | None:
+    """
+    sqlite_char Returns the byte of a value, as CHAR does in MariaDB for values below 256
+
+    :param int value: The value of the byte
+    :return: The binary string of the byte, None when the value is NULL
+    :rtype: bytes | None
+    """
+    return None if value is None else bytes([value % 256])
+
+
+# MariaDB functions the *SQL modules use on binary strings that SQLite lacks or defines otherwise, by name and
+# number of arguments
+__sqlite_functions__ = {
+    ("CONCAT", -1): sqlite_concat,
+    ("RPAD", 3): sqlite_rpad,
+    ("ASCII", 1): sqlite_ascii,
+    ("CHAR", 1): sqlite_char
+}
+
+
+class SQLite(Driver):
+    """
+    Warehouse.Drivers.SQLite class connects to a SQLite file, or an in-memory database for ":memory:", named by
+    the schema of the config file
+    """
+
+    @staticmethod
+    def connect(database: dict, local_infile: bool = False):
+        import sqlite3
+        # Member workers write to the same file side by side, each waiting its turn for the write lock. Pooled
+        # connections are used by one writer thread at a time, though not always the thread that opened them
+        db = sqlite3.connect(database["schema"], timeout=database.get("timeout", 60), check_same_thread=False)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        for (name, arguments), function in __sqlite_functions__.items():
+            db.create_function(name, arguments, function, deterministic=True)
+        return db
+
+    @staticmethod
+    def poolable(database: dict) -> bool:
+        # Every connection to ":memory:" opens a database of its own
+        return database["schema"] != ":memory:"
+
+    @staticmethod
+    def index(table: str, name: str, columns: str) -> str:
+        """
+        index Returns SQL string creating a missing secondary index, named after its table as SQLite index names
+        are global
+
+        :param str table: The name of the table
+        :param str name: The name of the index within the table
+        :param str columns: The quoted, comma separated columns
+        :return: SQL String
+        :rtype: str
+        """
+        return f"CREATE INDEX IF NOT EXISTS `{table}_{name}` ON `{table}` ({columns});"
+
+    @staticmethod
+    def translate(sql: str) -> tuple[str, ...]:
+        return SQLite.translate_statement(sql)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def translate_statement(sql: str) -> tuple[str, ...]:
+        """
+        translate_statement Translates a SQL string, memoized as the same batch statements are sent repeatedly
+
+        :param str sql: A SQL String from a *SQL module
+        :return: The statements to run in its place
+        :rtype: tuple[str, ...]
+        """
+        statement = sql.strip()
+        add_indexes = __sqlite_add_indexes__.match(statement)
+        if add_indexes is not None:
+            # Indexes keep their names when a table is renamed, so those of a staging table are named after the
+            # table it replaces, whose indexes are retired with it
+            table = add_indexes.group(1)
+            target = table.removesuffix("_staging")
+            return tuple(
+                statement
+                for name, columns in __sqlite_add_index__.findall(add_indexes.group(2))
+                for statement in [
+                    f"DROP INDEX IF EXISTS `{target}_{name}`;",
+                    f"CREATE INDEX `{target}_{name}` ON `{table}` ({columns});"
+                ]
+            )
+        if statement.upper().startswith("CREATE DATABASE"):
+            # The config file schema names the database file itself
+            return ()
+        if __sqlite_columns__.search(statement) is not None:
+            # The columns of the table named by the prepared value, in the order they were declared
+            return ("SELECT `name` FROM pragma_table_info(?) ORDER BY `cid`;",)
+        if statement.upper().startswith("RENAME TABLE"):
+            return tuple(
+                f"ALTER TABLE `{old}` RENAME TO `{new}`;" for old, new in __sqlite_rename__.findall(statement)
+            )
+        statement = __sqlite_removals__.sub("", statement).replace("%s", "?")
+        statement = re.sub(r"^INSERT IGNORE", "INSERT OR IGNORE", statement, flags=re.IGNORECASE)
+        on_duplicate = __sqlite_on_duplicate__.search(statement)
+        if on_duplicate is not None:
+            updates = on_duplicate.group(1)
+            refreshed = [f"`{column}`" for column in __sqlite_refresh__.findall(updates)]
+            plain = __sqlite_refresh__.sub("", updates)
+            if __sqlite_update_value__.sub("", plain).strip(" ,\n") == "":
+                # Updating only the records whose values changed, as MariaDB leaves unchanged records unwritten,
+                # and their refreshed columns along with them
+                columns = [f"`{column}`" for column in __sqlite_update_value__.findall(plain)]
+                excluded = [f"excluded.{column}" for column in columns]
+                statement = statement[:on_duplicate.start()] + (
+                    "\n    ON CONFLICT DO UPDATE SET "
+                    + ", ".join(f"{c} = excluded.{c}" for c in refreshed + columns)
+                    + f"\n    WHERE ({', '.join(columns)}) IS NOT ({', '.join(excluded)});"
+                )
+            else:
+                statement = statement[:on_duplicate.start()] + (
+                    "\n    ON CONFLICT DO UPDATE SET " + __sqlite_values__.sub(r"excluded.\1", updates) + ";"
+                )
+        create_table = __sqlite_create_table__.match(statement)
+        if create_table is not None:
+            auto_increment = __sqlite_auto_increment__.search(statement)
+            if auto_increment is not None:
+                # Only an INTEGER PRIMARY KEY column assigns its own values
+                column = auto_increment.group(1)
+                statement = __sqlite_auto_increment__.sub(f"`{column}` INTEGER PRIMARY KEY AUTOINCREMENT", statement)
+                statement = re.sub(rf",\s*PRIMARY KEY \(`{column}`\)", "", statement)
+            statement = __sqlite_unique_key__.sub("UNIQUE", statement)
+            keys = __sqlite_inline_key__.findall(statement)
+            return (__sqlite_inline_key__.sub("", statement),) + tuple(
+                SQLite.index(create_table.group(1), name, columns) for name, columns in keys
+            )
+        return (statement,)
+
+    @staticmethod
+    def cursor(db, stream: bool = False):
+        return contextlib.closing(db.cursor())
+
+
+__drivers__ = {
+    "mariadb": MariaDB,
+    "sqlite": SQLite
+}
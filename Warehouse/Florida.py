@@ -13,6 +13,24 @@ class Florida(State):
     """
     country_designation = "UnitedStates"
     state_designation = "Florida"
+    state_sql = Warehouse.FloridaSQL
+    import_tables = {
+        "voters": {
+            "table": "Voters",
+            "create": "create_voters_table",
+            "indexes": "voters_indexes",
+            "key": ["voter_id"],
+            "refreshed": ["export_date"]
+        },
+        "histories": {
+            "table": "Histories",
+            "create": "create_histories_table",
+            "indexes": "histories_indexes",
+            "partition": "election_date",
+            "key": ["county_code", "voter_id", "election_date", "election_type", "history_code"],
+            "refreshed": ["export_date"]
+        }
+    }
 
     def init_schema(self) -> None:
         """
@@ -24,7 +42,7 @@ def init_schema(self) -> None:
             for sql in [
                 Warehouse.FloridaSQL.create_database(self.config["database"]["schema"]),
                 Warehouse.FloridaSQL.create_voters_table(),
-                Warehouse.FloridaSQL.create_histories_table()
+                self.create_table_sql("histories")
             ]:
                 self.execute_sql(sql)
         except Exception as error:
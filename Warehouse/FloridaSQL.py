@@ -2,6 +2,9 @@
 
 # Handles Database SQL methods for Florida data
 
+import Warehouse.StateSQL as StateSQL
+
+
 def create_database(database: str) -> str:
     """
     create_database Returns SQL string to create the schema
@@ -13,40 +16,56 @@ def create_database(database: str) -> str:
            f"utf8mb4_unicode_ci */;"
 
 
-def create_histories_table() -> str:
+def create_histories_table(table: str = "Histories", indexes: bool = True, partitions: str = '') -> str:
     """
     create_histories_table Returns SQL string to create the Voter Histories table
 
+    :param str table: The name of the table
+    :param bool indexes: Whether to declare the secondary indexes
+    :param str partitions: An optional PARTITION BY clause from StateSQL.partition_by_year
     :return: SQL String
     :rtype: str
     """
-    return """CREATE TABLE IF NOT EXISTS `Histories` (
+    keys = StateSQL.index_definitions(histories_indexes()) if indexes else ''
+    return f"""CREATE TABLE IF NOT EXISTS `{table}` (
           `county_code` char(3) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
           `voter_id` bigint(18) unsigned NOT NULL DEFAULT 0,
           `election_date` date NOT NULL,
           `election_type` char(3) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
           `history_code` char(1) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
           `export_date` date NOT NULL,
-          PRIMARY KEY (`county_code`,`voter_id`,`election_date`,`election_type`,`history_code`),
-          KEY `county_code` (`county_code`),
-          KEY `voter_id` (`voter_id`),
-          KEY `election_date` (`election_date`),
-          KEY `election_type` (`election_type`),
-          KEY `history_code` (`history_code`)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8 COLLATE=utf8_unicode_ci;
+          PRIMARY KEY (`county_code`,`voter_id`,`election_date`,`election_type`,`history_code`){keys}
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8 COLLATE=utf8_unicode_ci{partitions};
     """
 
 
-def set_history() -> str:
+def histories_indexes() -> dict[str, list[str]]:
+    """
+    histories_indexes Returns the secondary indexes of the Voter Histories table
+
+    :return: Index names mapped to their columns
+    :rtype: dict[str, list[str]]
+    """
+    return {
+        "county_code": ["county_code"],
+        "voter_id": ["voter_id"],
+        "election_date": ["election_date"],
+        "election_type": ["election_type"],
+        "history_code": ["history_code"]
+    }
+
+
+def set_history(table: str = "Histories") -> str:
     """
     set_voter Returns SQL string to replace the Histories records
 
+    :param str table: The name of the table
     :return: SQL String
     :rtype: str
     """
-    return """REPLACE
+    return f"""REPLACE
         INTO
-        Histories
+        `{table}`
     (county_code,
         voter_id,
         election_date,
@@ -61,16 +80,17 @@ def set_history() -> str:
         %s);"""
 
 
-def set_voter() -> str:
+def set_voter(table: str = "Voters") -> str:
     """
     set_voter Returns SQL string to replace the Voter records
 
+    :param str table: The name of the table
     :return: SQL String
     :rtype str
     """
-    return """REPLACE
+    return f"""REPLACE
         INTO
-        Voters
+        `{table}`
     (county_code,
         voter_id,
         name_last,
@@ -151,14 +171,17 @@ def set_voter() -> str:
         %s);"""
 
 
-def create_voters_table() -> str:
+def create_voters_table(table: str = "Voters", indexes: bool = True) -> str:
     """
     create_voters_table Returns SQL string to create the Voter table
 
+    :param str table: The name of the table
+    :param bool indexes: Whether to declare the secondary indexes
     :return: SQL String
     :rtype: str
     """
-    return """CREATE TABLE IF NOT EXISTS `Voters` (
+    keys = StateSQL.index_definitions(voters_indexes()) if indexes else ''
+    return f"""CREATE TABLE IF NOT EXISTS `{table}` (
           `voter_id` bigint(18) unsigned NOT NULL,
           `county_code` varchar(3) CHARACTER SET utf8 COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
           `name_last` varchar(30) CHARACTER SET utf8 COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
@@ -198,16 +221,149 @@ def create_voters_table() -> str:
           `daytime_phone_extension` varchar(4) CHARACTER SET utf8 COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
           `email_address` varchar(100) CHARACTER SET utf8 COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
           `export_date` date NOT NULL,
-          PRIMARY KEY (`voter_id`),
-          KEY `voter_id_index` (`voter_id`),
-          KEY `county_code_index` (`county_code`),
-          KEY `name_last_index` (`name_last`),
-          KEY `name_first_index` (`name_first`),
-          KEY `name_middle_index` (`name_middle`),
-          KEY `residence_city_index` (`residence_city`),
-          KEY `residence_zipcode_index` (`residence_zipcode`),
-          KEY `mailing_city_index` (`mailing_city`),
-          KEY `mailing_zipcode_index` (`mailing_zipcode`),
-          KEY `export_date_index` (`export_date`)
+          PRIMARY KEY (`voter_id`){keys}
         ) ENGINE=InnoDB DEFAULT CHARSET=utf8;    
     """
+
+
+def voters_indexes() -> dict[str, list[str]]:
+    """
+    voters_indexes Returns the secondary indexes of the Voter table
+
+    :return: Index names mapped to their columns
+    :rtype: dict[str, list[str]]
+    """
+    return {
+        "county_code_index": ["county_code"],
+        "name_last_index": ["name_last"],
+        "name_first_index": ["name_first"],
+        "name_middle_index": ["name_middle"],
+        "residence_city_index": ["residence_city"],
+        "residence_zipcode_index": ["residence_zipcode"],
+        "mailing_city_index": ["mailing_city"],
+        "mailing_zipcode_index": ["mailing_zipcode"],
+        "export_date_index": ["export_date"]
+    }
+
+
+def load_history(table: str = "Histories") -> str:
+    """
+    load_history Returns SQL string to bulk load a tab separated file into the Histories records
+
+    :param str table: The name of the table
+    :return: SQL String
+    :rtype: str
+    """
+    return f"""LOAD DATA LOCAL INFILE %s
+        REPLACE
+        INTO TABLE
+        `{table}`
+        CHARACTER SET utf8mb4
+        FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+        LINES TERMINATED BY '\\n'
+    (county_code,
+        voter_id,
+        election_date,
+        election_type,
+        history_code,
+        export_date);"""
+
+
+def load_voter(table: str = "Voters") -> str:
+    """
+    load_voter Returns SQL string to bulk load a tab separated file into the Voter records
+
+    :param str table: The name of the table
+    :return: SQL String
+    :rtype: str
+    """
+    return f"""LOAD DATA LOCAL INFILE %s
+        REPLACE
+        INTO TABLE
+        `{table}`
+        CHARACTER SET utf8mb4
+        FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+        LINES TERMINATED BY '\\n'
+    (county_code,
+        voter_id,
+        name_last,
+        name_suffix,
+        name_first,
+        name_middle,
+        suppress_address,
+        residence_address_line_1,
+        residence_address_line_2,
+        residence_city,
+        residence_state,
+        residence_zipcode,
+        mailing_address_line_1,
+        mailing_address_line_2,
+        mailing_address_line_3,
+        mailing_city,
+        mailing_state,
+        mailing_zipcode,
+        mailing_country,
+        gender,
+        race,
+        birth_date,
+        registration_date,
+        party_affiliation,
+        precinct,
+        precinct_group,
+        precinct_split,
+        precinct_suffix,
+        voter_status,
+        congressional_district,
+        house_district,
+        senate_district,
+        county_commission_district,
+        school_board_district,
+        daytime_area_code,
+        daytime_phone_number,
+        daytime_phone_extension,
+        email_address,
+        export_date);"""
+
+
+def walking_list_columns() -> list[str]:
+    """
+    walking_list_columns Returns the Voters columns of a walking list
+
+    :return: Column names
+    :rtype: list[str]
+    """
+    return [
+        "voter_id", "county_code", "precinct", "name_last", "name_first", "name_middle", "name_suffix",
+        "residence_address_line_1", "residence_address_line_2", "residence_city", "residence_state",
+        "residence_zipcode", "party_affiliation", "gender", "birth_date", "daytime_area_code", "daytime_phone_number"
+    ]
+
+
+def walking_list_filters() -> dict[str, str]:
+    """
+    walking_list_filters Returns the prepared conditions a walking list can be filtered by
+
+    :return: Filter names mapped to their condition on the Voters table, aliased v
+    :rtype: dict[str, str]
+    """
+    return {
+        "county": "v.county_code = %s",
+        "precinct": "v.precinct = %s",
+        "party": "v.party_affiliation = %s",
+        "voted_since": StateSQL.voted_since()
+    }
+
+
+def export_walking_list(filters: list[str]) -> str:
+    """
+    export_walking_list Returns SQL string to read a walking list, sorted for walking each precinct street by street
+
+    :param list[str] filters: The names of the filters applied, in the order of their prepared values
+    :return: SQL String
+    :rtype: str
+    """
+    return StateSQL.export_walking_list(
+        walking_list_columns(),
+        [walking_list_filters()[f] for f in filters],
+        ["county_code", "precinct", "residence_zipcode", "residence_address_line_1"]
+    )
@@ -11,6 +11,16 @@ class Georgia(State):
 
     country_designation = "UnitedStates"
     state_designation = "Georgia"
+    state_sql = Warehouse.GeorgiaSQL
+    import_tables = {
+        "histories": {
+            "table": "Histories",
+            "create": "create_histories_table",
+            "indexes": "histories_indexes",
+            "partition": "election_date",
+            "key": ["county_code", "voter_id", "election_date", "election_type", "party"]
+        }
+    }
 
     def init_schema(self) -> None:
         """
@@ -23,14 +33,12 @@ def init_schema(self) -> None:
                 Warehouse.GeorgiaSQL.create_database(self.config["database"]["schema"]),
                 # Warehouse.GeorgiaSQL.create_voters_table(),
                 Warehouse.GeorgiaSQL.create_counties_table(),
-                Warehouse.GeorgiaSQL.create_histories_table()
+                self.create_table_sql("histories")
             ]:
                 self.execute_sql(sql)
-            for k, v in __counties__.items():
-                self.execute_prepared_sql(
-                    Warehouse.GeorgiaSQL.set_county(),
-                    tuple([k, v])
-                )
+            # One multi-row statement and transaction for every county
+            self.executemany_prepared_sql(Warehouse.GeorgiaSQL.set_county(), list(__counties__.items()))
+            self.commit()
         except Exception as error:
             print('Caught this error: ' + repr(error))
             raise
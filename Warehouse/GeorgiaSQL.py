@@ -2,6 +2,9 @@
 
 # Handles Database SQL methods for Georgia data
 
+import Warehouse.StateSQL as StateSQL
+
+
 def create_database(database: str) -> str:
     """
     create_database Returns SQL string to create the schema
@@ -30,14 +33,18 @@ def create_counties_table() -> str:
     """
 
 
-def create_histories_table() -> str:
+def create_histories_table(table: str = "Histories", indexes: bool = True, partitions: str = '') -> str:
     """
     create_histories_table Returns SQL string to create the Voter Histories table
 
+    :param str table: The name of the table
+    :param bool indexes: Whether to declare the secondary indexes
+    :param str partitions: An optional PARTITION BY clause from StateSQL.partition_by_year
     :return: SQL String
     :rtype: str
     """
-    return """CREATE TABLE IF NOT EXISTS `Histories` (
+    keys = StateSQL.index_definitions(histories_indexes()) if indexes else ''
+    return f"""CREATE TABLE IF NOT EXISTS `{table}` (
           `county_code` char(3) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
           `voter_id` bigint(18) unsigned NOT NULL DEFAULT 0,
           `election_date` date NOT NULL,
@@ -47,24 +54,38 @@ def create_histories_table() -> str:
           `absentee` TINYINT(1) NOT NULL DEFAULT 0,
           `provisional` TINYINT(1) NOT NULL DEFAULT 0,
           `supplemental` TINYINT(1) NOT NULL DEFAULT 0,
-          PRIMARY KEY (`county_code`,`voter_id`,`election_date`,`election_type`,`party`),
-          KEY `county_code` (`county_code`),
-          KEY `voter_id` (`voter_id`),
-          KEY `election_date` (`election_date`),
-          KEY `election_type` (`election_type`),
-          KEY `party` (`party`)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8 COLLATE=utf8_unicode_ci;
+          PRIMARY KEY (`county_code`,`voter_id`,`election_date`,`election_type`,`party`){keys}
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8 COLLATE=utf8_unicode_ci{partitions};
     """
 
 
-def create_voters_table() -> str:
+def histories_indexes() -> dict[str, list[str]]:
+    """
+    histories_indexes Returns the secondary indexes of the Voter Histories table
+
+    :return: Index names mapped to their columns
+    :rtype: dict[str, list[str]]
+    """
+    return {
+        "county_code": ["county_code"],
+        "voter_id": ["voter_id"],
+        "election_date": ["election_date"],
+        "election_type": ["election_type"],
+        "party": ["party"]
+    }
+
+
+def create_voters_table(table: str = "Voters", indexes: bool = True) -> str:
     """
     create_voters_table Returns SQL string to create the Voter table
 
+    :param str table: The name of the table
+    :param bool indexes: Whether to declare the secondary indexes
     :return: SQL String
     :rtype: str
     """
-    return """CREATE TABLE IF NOT EXISTS `Voters` (
+    keys = StateSQL.index_definitions(voters_indexes()) if indexes else ''
+    return f"""CREATE TABLE IF NOT EXISTS `{table}` (
           `voter_id` bigint(18) unsigned NOT NULL,
           `county_code` varchar(3) CHARACTER SET utf8 COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
           `name_last` varchar(30) CHARACTER SET utf8 COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
@@ -104,21 +125,31 @@ def create_voters_table() -> str:
           `daytime_phone_extension` varchar(4) CHARACTER SET utf8 COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
           `email_address` varchar(100) CHARACTER SET utf8 COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
           `export_date` date NOT NULL,
-          PRIMARY KEY (`voter_id`),
-          KEY `voter_id_index` (`voter_id`),
-          KEY `county_code_index` (`county_code`),
-          KEY `name_last_index` (`name_last`),
-          KEY `name_first_index` (`name_first`),
-          KEY `name_middle_index` (`name_middle`),
-          KEY `residence_city_index` (`residence_city`),
-          KEY `residence_zipcode_index` (`residence_zipcode`),
-          KEY `mailing_city_index` (`mailing_city`),
-          KEY `mailing_zipcode_index` (`mailing_zipcode`),
-          KEY `export_date_index` (`export_date`)
+          PRIMARY KEY (`voter_id`){keys}
         ) ENGINE=InnoDB DEFAULT CHARSET=utf8;    
     """
 
 
+def voters_indexes() -> dict[str, list[str]]:
+    """
+    voters_indexes Returns the secondary indexes of the Voter table
+
+    :return: Index names mapped to their columns
+    :rtype: dict[str, list[str]]
+    """
+    return {
+        "county_code_index": ["county_code"],
+        "name_last_index": ["name_last"],
+        "name_first_index": ["name_first"],
+        "name_middle_index": ["name_middle"],
+        "residence_city_index": ["residence_city"],
+        "residence_zipcode_index": ["residence_zipcode"],
+        "mailing_city_index": ["mailing_city"],
+        "mailing_zipcode_index": ["mailing_zipcode"],
+        "export_date_index": ["export_date"]
+    }
+
+
 def set_county() -> str:
     """
     set_voter Returns SQL string to replace the Histories records
@@ -135,16 +166,17 @@ def set_county() -> str:
         %s);"""
 
 
-def set_history() -> str:
+def set_history(table: str = "Histories") -> str:
     """
     set_voter Returns SQL string to replace the Histories records
 
+    :param str table: The name of the table
     :return: SQL String
     :rtype: str
     """
-    return """REPLACE
+    return f"""REPLACE
         INTO
-        Histories
+        `{table}`
     (county_code,
         voter_id,
         election_date,
@@ -163,3 +195,29 @@ def set_history() -> str:
         %s,
         %s,
         %s);"""
+
+
+def load_history(table: str = "Histories") -> str:
+    """
+    load_history Returns SQL string to bulk load a tab separated file into the Histories records
+
+    :param str table: The name of the table
+    :return: SQL String
+    :rtype: str
+    """
+    return f"""LOAD DATA LOCAL INFILE %s
+        REPLACE
+        INTO TABLE
+        `{table}`
+        CHARACTER SET utf8mb4
+        FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+        LINES TERMINATED BY '\\n'
+    (county_code,
+        voter_id,
+        election_date,
+        election_type,
+        party,
+        ballot_style,
+        absentee,
+        provisional,
+        supplemental);"""
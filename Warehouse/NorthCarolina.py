@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import Warehouse.NorthCarolinaSQL
+import Warehouse.StateSQL
 from Warehouse.State import State
 from Import.NorthCarolinaCodes import __counties__
 
@@ -13,6 +14,27 @@ class NorthCarolina(State):
 
     country_designation = "UnitedStates"
     state_designation = "NorthCarolina"
+    state_sql = Warehouse.NorthCarolinaSQL
+    import_tables = {
+        "voters": {
+            "table": "Voters",
+            "create": "create_voters_table",
+            "indexes": "voters_indexes",
+            "key": ["voter_id", "county_code"]
+        },
+        "histories": {
+            "table": "Histories",
+            "create": "create_histories_table",
+            "indexes": "histories_indexes",
+            "columns": "histories_columns",
+            "key": ["county_code", "voter_id", "election_id", "party_id"],
+            "dimensions": {
+                "election_id": ("elections", ["election_date", "election_type"]),
+                "party_id": ("parties", ["party_code", "party_name"]),
+                "precinct_id": ("precincts", ["county_code", "precinct_code", "precinct_name"])
+            }
+        }
+    }
 
     def init_schema(self) -> None:
         """
@@ -24,15 +46,35 @@ def init_schema(self) -> None:
             for sql in [
                 Warehouse.NorthCarolinaSQL.create_database(self.config["database"]["schema"]),
                 Warehouse.NorthCarolinaSQL.create_voters_table(),
-                Warehouse.NorthCarolinaSQL.create_counties_table(),
-                Warehouse.NorthCarolinaSQL.create_histories_table()
+                Warehouse.NorthCarolinaSQL.create_counties_table()
             ]:
                 self.execute_sql(sql)
-            for k, v in __counties__.items():
-                self.execute_prepared_sql(
-                    Warehouse.NorthCarolinaSQL.set_county(),
-                    tuple([k, v])
-                )
+            # Before declaring the indexes of Histories, which name columns of the current layout
+            self.upgrade_schema()
+            self.execute_sql(Warehouse.NorthCarolinaSQL.create_histories_table())
+            # One multi-row statement and transaction for every county
+            self.executemany_prepared_sql(Warehouse.NorthCarolinaSQL.set_county(), list(__counties__.items()))
+            self.commit()
         except Exception as error:
             print('Caught this error: ' + repr(error))
             raise
+
+    def upgrade_schema(self) -> None:
+        """
+        upgrade_schema Moves a Histories table stored with the election, party and precinct values of releases before
+        the dimension tables onto their surrogate keys, in a staging table swapped in for it. A database without
+        Histories has nothing to move, the table is created with its indexes by init_schema
+
+        :return: None
+        """
+        columns = self.get_columns("Histories")
+        if len(columns) == 0 or "election_id" in columns:
+            return
+        print("Moving Histories onto the Elections, Parties and Precincts tables..")
+        for dimension in ["elections", "parties", "precincts"]:
+            self.execute_sql(getattr(Warehouse.StateSQL, self.dimension_tables[dimension]["create"])())
+        for sql in Warehouse.NorthCarolinaSQL.migrate_histories_dimensions():
+            self.execute_sql(sql)
+        self.execute_sql(Warehouse.NorthCarolinaSQL.migrate_histories(self.begin_staging("histories")))
+        self.finish_staging("histories")
+        self.dimensions = {}
@@ -2,6 +2,8 @@
 
 # Handles Database SQL methods for Georgia data
 
+import Warehouse.StateSQL as StateSQL
+
 
 def create_database(database: str) -> str:
     """
@@ -47,62 +49,150 @@ def set_county() -> str:
         %s);"""
 
 
-def create_histories_table() -> str:
+def create_histories_table(table: str = "Histories", indexes: bool = True) -> str:
     """
-    create_histories_table Returns SQL string to create the Voter Histories table
+    create_histories_table Returns SQL string to create the Voter Histories table, with elections, parties and
+    precincts stored as keys of their dimension tables and county names read from Counties
 
+    :param str table: The name of the table
+    :param bool indexes: Whether to declare the secondary indexes
     :return: SQL String
     :rtype: str
     """
-    return """CREATE TABLE IF NOT EXISTS `Histories` (
+    keys = StateSQL.index_definitions(histories_indexes()) if indexes else ''
+    return f"""CREATE TABLE IF NOT EXISTS `{table}` (
           `county_code` char(3) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
-          `county_name` char(20) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
           `voter_id` bigint(18) unsigned NOT NULL DEFAULT 0,
-          `election_date` date NOT NULL,
-          `election_type` varchar(230) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
+          `election_id` smallint(5) unsigned NOT NULL DEFAULT 0,
           `voting_method` varchar(60) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
-          `party_code` char(3) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
-          `party_name` varchar(60) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
-          `precinct_code` varchar(6) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
-          `precinct_name` varchar(60) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
+          `party_id` smallint(5) unsigned NOT NULL DEFAULT 0,
+          `precinct_id` mediumint(8) unsigned NOT NULL DEFAULT 0,
           `ncid` varchar(12) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
           `voted_county_code` char(3) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
-          `voted_county_name` char(60) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
           `voter_tabulated_district_code` char(6) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
           `voter_tabulated_district_name` char(60) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
-          PRIMARY KEY (`county_code`,`voter_id`,`election_date`,`election_type`,`party_code`),
-          KEY `county_code` (`county_code`),
-          KEY `voter_id` (`voter_id`),
-          KEY `election_date` (`election_date`),
-          KEY `election_type` (`election_type`),
-          KEY `party_code` (`party_code`)
+          PRIMARY KEY (`county_code`,`voter_id`,`election_id`,`party_id`){keys}
         ) ENGINE=InnoDB DEFAULT CHARSET=utf8 COLLATE=utf8_unicode_ci;
     """
 
 
-def set_history() -> str:
+def migrate_histories_dimensions() -> list[str]:
+    """
+    migrate_histories_dimensions Returns SQL strings adding the elections, parties and precincts of a Histories
+    table stored with the layout of releases before the dimension tables
+
+    :return: SQL Strings
+    :rtype: list[str]
+    """
+    return [
+        """INSERT IGNORE INTO `Elections` (election_date, election_type)
+        SELECT DISTINCT election_date, election_type FROM `Histories`
+        WHERE election_date IS NOT NULL AND election_type IS NOT NULL;""",
+        """INSERT IGNORE INTO `Parties` (party_code, party_name)
+        SELECT DISTINCT party_code, party_name FROM `Histories`
+        WHERE party_code IS NOT NULL AND party_name IS NOT NULL;""",
+        """INSERT IGNORE INTO `Precincts` (county_code, precinct_code, precinct_name)
+        SELECT DISTINCT county_code, precinct_code, precinct_name FROM `Histories`
+        WHERE county_code IS NOT NULL AND precinct_code IS NOT NULL AND precinct_name IS NOT NULL;"""
+    ]
+
+
+def migrate_histories(table: str) -> str:
+    """
+    migrate_histories Returns SQL string copying a Histories table stored with the layout of releases before the
+    dimension tables into a table with the current layout. Rows missing a value of a natural key get id 0, as
+    imports do
+
+    :param str table: The name of the table with the current layout
+    :return: SQL String
+    :rtype: str
+    """
+    return f"""INSERT IGNORE INTO `{table}`
+    (county_code,
+        voter_id,
+        election_id,
+        voting_method,
+        party_id,
+        precinct_id,
+        ncid,
+        voted_county_code,
+        voter_tabulated_district_code,
+        voter_tabulated_district_name)
+    SELECT
+        h.county_code,
+        h.voter_id,
+        COALESCE(e.election_id, 0),
+        h.voting_method,
+        COALESCE(p.party_id, 0),
+        COALESCE(r.precinct_id, 0),
+        h.ncid,
+        h.voted_county_code,
+        h.voter_tabulated_district_code,
+        h.voter_tabulated_district_name
+    FROM
+        `Histories` h
+        LEFT JOIN `Elections` e ON e.election_date = h.election_date AND e.election_type = h.election_type
+        LEFT JOIN `Parties` p ON p.party_code = h.party_code AND p.party_name = h.party_name
+        LEFT JOIN `Precincts` r ON r.county_code = h.county_code AND r.precinct_code = h.precinct_code
+            AND r.precinct_name = h.precinct_name;"""
+
+
+def histories_indexes() -> dict[str, list[str]]:
+    """
+    histories_indexes Returns the secondary indexes of the Voter Histories table
+
+    :return: Index names mapped to their columns
+    :rtype: dict[str, list[str]]
+    """
+    return {
+        "county_code": ["county_code"],
+        "voter_id": ["voter_id"],
+        "election_id": ["election_id"],
+        "party_id": ["party_id"],
+        "precinct_id": ["precinct_id"]
+    }
+
+
+def histories_columns() -> list[str]:
+    """
+    histories_columns Returns the columns of the Voter Histories table written by set_history and load_history
+
+    :return: Column names
+    :rtype: list[str]
+    """
+    return [
+        "county_code",
+        "voter_id",
+        "election_id",
+        "voting_method",
+        "party_id",
+        "precinct_id",
+        "ncid",
+        "voted_county_code",
+        "voter_tabulated_district_code",
+        "voter_tabulated_district_name"
+    ]
+
+
+def set_history(table: str = "Histories") -> str:
     """
     set_voter Returns SQL string to replace the Histories records
 
+    :param str table: The name of the table
     :return: SQL String
     :rtype: str
     """
-    return """REPLACE
+    return f"""REPLACE
         INTO
-        Histories
+        `{table}`
     (county_code,
-        county_name,
         voter_id,
-        election_date,
-        election_type,
+        election_id,
         voting_method,
-        party_code,
-        party_name,
-        precinct_code,
-        precinct_name,
+        party_id,
+        precinct_id,
         ncid,
         voted_county_code,
-        voted_county_name,
         voter_tabulated_district_code,
         voter_tabulated_district_name)
     VALUES(%s,
@@ -114,22 +204,20 @@ def set_history() -> str:
         %s,
         %s,
         %s,
-        %s,
-        %s,
-        %s,
-        %s,
-        %s,
         %s);"""
 
 
-def create_voters_table() -> str:
+def create_voters_table(table: str = "Voters", indexes: bool = True) -> str:
     """
     create_voters_table Returns SQL string to create the Voter table
 
+    :param str table: The name of the table
+    :param bool indexes: Whether to declare the secondary indexes
     :return: SQL String
     :rtype: str
     """
-    return """CREATE TABLE IF NOT EXISTS `Voters` (
+    keys = StateSQL.index_definitions(voters_indexes()) if indexes else ''
+    return f"""CREATE TABLE IF NOT EXISTS `{table}` (
           `voter_id` bigint(18) unsigned NOT NULL DEFAULT 0,
           `county_code` char(3) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
           `county_name` char(20) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
@@ -197,30 +285,41 @@ def create_voters_table() -> str:
           `prosecutorial_district_desc` varchar(60) CHARACTER SET utf8 COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
           `voter_tabulated_district_code` varchar(6) CHARACTER SET utf8 COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
           `voter_tabulated_district_name` varchar(60) CHARACTER SET utf8 COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
-          PRIMARY KEY (`voter_id`,`county_code`),
-          KEY `voter_id` (`voter_id`),
-          KEY `county_code` (`county_code`),
-          KEY `name_last` (`name_last`),
-          KEY `name_first` (`name_first`),
-          KEY `name_middle` (`name_middle`),
-          KEY `residence_city` (`residence_city`),
-          KEY `residence_zipcode` (`residence_zipcode`),
-          KEY `mailing_city` (`mailing_city`),
-          KEY `mailing_zipcode` (`mailing_zipcode`)
+          PRIMARY KEY (`voter_id`,`county_code`){keys}
         ) ENGINE=InnoDB DEFAULT CHARSET=utf8;    
     """
 
 
-def set_voter() -> str:
+def voters_indexes() -> dict[str, list[str]]:
+    """
+    voters_indexes Returns the secondary indexes of the Voter table
+
+    :return: Index names mapped to their columns
+    :rtype: dict[str, list[str]]
+    """
+    return {
+        "county_code": ["county_code"],
+        "name_last": ["name_last"],
+        "name_first": ["name_first"],
+        "name_middle": ["name_middle"],
+        "residence_city": ["residence_city"],
+        "residence_zipcode": ["residence_zipcode"],
+        "mailing_city": ["mailing_city"],
+        "mailing_zipcode": ["mailing_zipcode"]
+    }
+
+
+def set_voter(table: str = "Voters") -> str:
     """
     set_voter Returns SQL string to replace the Histories records
 
+    :param str table: The name of the table
     :return: SQL String
     :rtype: str
     """
-    return """REPLACE
+    return f"""REPLACE
         INTO
-        Voters
+        `{table}`
     (`voter_id`,
         `county_code`,
         `county_name`,
@@ -355,3 +454,170 @@ def set_voter() -> str:
         %s,
         %s,
         %s);"""
+
+
+def load_history(table: str = "Histories") -> str:
+    """
+    load_history Returns SQL string to bulk load a tab separated file into the Histories records
+
+    :param str table: The name of the table
+    :return: SQL String
+    :rtype: str
+    """
+    return f"""LOAD DATA LOCAL INFILE %s
+        REPLACE
+        INTO TABLE
+        `{table}`
+        CHARACTER SET utf8mb4
+        FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+        LINES TERMINATED BY '\\n'
+    (county_code,
+        voter_id,
+        election_id,
+        voting_method,
+        party_id,
+        precinct_id,
+        ncid,
+        voted_county_code,
+        voter_tabulated_district_code,
+        voter_tabulated_district_name);"""
+
+
+def load_voter(table: str = "Voters") -> str:
+    """
+    load_voter Returns SQL string to bulk load a tab separated file into the Voter records
+
+    :param str table: The name of the table
+    :return: SQL String
+    :rtype: str
+    """
+    return f"""LOAD DATA LOCAL INFILE %s
+        REPLACE
+        INTO TABLE
+        `{table}`
+        CHARACTER SET utf8mb4
+        FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+        LINES TERMINATED BY '\\n'
+    (`voter_id`,
+        `county_code`,
+        `county_name`,
+        `ncid`,
+        `name_last`,
+        `name_first`,
+        `name_middle`,
+        `name_suffix`,
+        `voter_status`,
+        `voter_status_desc`,
+        `voter_status_reason_code`,
+        `voter_status_reason_desc`,
+        `residence_address`,
+        `residence_city`,
+        `residence_state`,
+        `residence_zipcode`,
+        `mailing_address_line_1`,
+        `mailing_address_line_2`,
+        `mailing_address_line_3`,
+        `mailing_address_line_4`,
+        `mailing_city`,
+        `mailing_state`,
+        `mailing_zipcode`,
+        `daytime_phone`,
+        `confidential`,
+        `registration_date`,
+        `race_code`,
+        `ethnic_code`,
+        `party_code`,
+        `gender_code`,
+        `birth_year`,
+        `age_at_year_end`,
+        `birth_state`,
+        `drivers_lic`,
+        `precinct`,
+        `precinct_desc`,
+        `municipality`,
+        `municipality_desc`,
+        `ward`,
+        `ward_desc`,
+        `congressional_district`,
+        `superior_court_jurisdiction`,
+        `judicial_district`,
+        `senate_district`,
+        `house_district`,
+        `county_commission_district`,
+        `county_commission_district_desc`,
+        `township_jurisdiction`,
+        `township_jurisdiction_desc`,
+        `school_district`,
+        `school_district_desc`,
+        `fire_district`,
+        `fire_district_desc`,
+        `water_district`,
+        `water_district_desc`,
+        `sewer_district`,
+        `sewer_district_desc`,
+        `sanitation_district`,
+        `sanitation_district_desc`,
+        `rescue_district`,
+        `rescue_district_desc`,
+        `municipal_district`,
+        `municipal_district_desc`,
+        `prosecutorial_district`,
+        `prosecutorial_district_desc`,
+        `voter_tabulated_district_code`,
+        `voter_tabulated_district_name`);"""
+
+
+def walking_list_columns() -> list[str]:
+    """
+    walking_list_columns Returns the Voters columns of a walking list
+
+    :return: Column names
+    :rtype: list[str]
+    """
+    return [
+        "voter_id", "county_code", "precinct", "name_last", "name_first", "name_middle", "name_suffix",
+        "residence_address", "residence_city", "residence_state", "residence_zipcode", "party_code", "gender_code",
+        "birth_year", "daytime_phone"
+    ]
+
+
+def walking_list_filters() -> dict[str, str]:
+    """
+    walking_list_filters Returns the prepared conditions a walking list can be filtered by
+
+    :return: Filter names mapped to their condition on the Voters table, aliased v
+    :rtype: dict[str, str]
+    """
+    return {
+        "county": "v.county_code = %s",
+        "precinct": "v.precinct = %s",
+        "party": "v.party_code = %s",
+        "voted_since": StateSQL.voted_since(*histories_elections())
+    }
+
+
+def export_walking_list(filters: list[str]) -> str:
+    """
+    export_walking_list Returns SQL string to read a walking list, sorted for walking each precinct street by street
+
+    :param list[str] filters: The names of the filters applied, in the order of their prepared values
+    :return: SQL String
+    :rtype: str
+    """
+    return StateSQL.export_walking_list(
+        walking_list_columns(),
+        [walking_list_filters()[f] for f in filters],
+        ["county_code", "precinct", "residence_zipcode", "residence_address"],
+        *histories_elections()
+    )
+
+
+def histories_elections() -> tuple[str, str]:
+    """
+    histories_elections Returns the Voter Histories table, aliased h, joined to Elections and its election date
+    column
+
+    :return: The joined tables and the election date column
+    :rtype: tuple[str, str]
+    """
+    return "Histories h JOIN Elections e ON e.election_id = h.election_id", "e.election_date"
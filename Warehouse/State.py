@@ -1,14 +1,31 @@
 # -*- coding: utf-8 -*-
+import collections
+import concurrent.futures
+import contextlib
+import csv
+import os
+import queue
+import tempfile
+import threading
+import time
 from types import TracebackType
-from typing import Optional, Type
+from typing import IO, Iterable, Iterator, Optional, Type
 
 # Abstract Class Handles Database methods for State data
 
-import pymysql
-import pymysql.cursors
 import yaml
 from abc import ABC, abstractmethod
 
+import Warehouse.StateSQL
+from Warehouse.Drivers import __drivers__
+
+
+# Escapes values for the default FIELDS ESCAPED BY '\\' rules of LOAD DATA INFILE
+__load_data_escapes__ = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r", "\0": "\\0"})
+
+# Bytes of max_allowed_packet left for the packet header, as PyMySQL compares only the statement with its limit
+__packet_headroom__ = 4096
+
 
 class State(ABC):
     """
@@ -20,6 +37,23 @@ class State(ABC):
     def init_schema(self) -> None:
         pass
 
+    @property
+    @abstractmethod
+    def state_sql(self):
+        """
+        SQL module providing the table statements named in import_tables
+        """
+        pass
+
+    @property
+    @abstractmethod
+    def import_tables(self):
+        """
+        Import types mapped to their table name, the SQL functions creating the table and listing its indexes and,
+        for tables that can be partitioned, the date column their partitions are ranged by
+        """
+        pass
+
     @property
     @abstractmethod
     def country_designation(self):
@@ -33,13 +67,68 @@ def state_designation(self):
         """
         pass
 
-    def __init__(self, config_file: str) -> None:
+    # Ways of sending batches to the database, "executemany" is always available as the fallback
+    load_modes = ["executemany", "bulk"]
+
+    # Ways of writing the records of each type named by the write section of the config file, "replace" by default
+    write_modes = ["replace", "upsert"]
+
+    # Settings of the commit section of the config file, by default every batch is committed on its own
+    commit_settings = ["rows", "seconds", "member"]
+
+    # Bytes of a turnout bitset, a bit for every smallint unsigned election id
+    turnout_bytes = 8192
+
+    # Rows fetched from the unbuffered export cursor per read
+    export_fetch_size = 10000
+
+    # Dimension tables with their surrogate key, natural key and the StateSQL functions creating, reading and adding
+    # their rows
+    dimension_tables = {
+        "elections": {
+            "id": "election_id",
+            "key": ["election_date", "election_type"],
+            "create": "create_elections_table",
+            "get_all": "get_elections",
+            "get": "get_election",
+            "set": "set_election"
+        },
+        "parties": {
+            "id": "party_id",
+            "key": ["party_code", "party_name"],
+            "create": "create_parties_table",
+            "get_all": "get_parties",
+            "get": "get_party",
+            "set": "set_party"
+        },
+        "precincts": {
+            "id": "precinct_id",
+            "key": ["county_code", "precinct_code", "precinct_name"],
+            "create": "create_precincts_table",
+            "get_all": "get_precincts",
+            "get": "get_precinct",
+            "set": "set_precinct"
+        }
+    }
+
+    def __init__(self, config_file: str, load_mode: str = "executemany") -> None:
         """
         __init__ Sets the config dictionary of database credentials into variable named 'db'.
 
         :param str config_file: Path to the YAML config file
+        :param str load_mode: How batches are sent, "executemany" or "bulk" for LOAD DATA LOCAL INFILE
         :return: None
         """
+        if load_mode not in self.load_modes:
+            raise ValueError(f"Usage: Load mode {load_mode} is not valid")
+        self.load_mode = load_mode
+        self.config_file = config_file
+        # Surrogate keys of each dimension table keyed by their natural keys, loaded on first use
+        self.dimensions = {}
+        # Turnout tables created so far, the live one and its staging copy
+        self.turnout_tables = set()
+        # Partitions of each partitioned table keyed by the value each is less than, loaded on first use
+        self.partitions = {}
 
         try:
             with open(config_file) as file:
@@ -48,6 +137,100 @@ def __init__(self, config_file: str) -> None:
             print('Caught this error: ' + repr(error))
             raise
 
+        driver = self.config["database"].get("driver", "mariadb")
+        if driver not in __drivers__:
+            raise ValueError(f"Usage: Database driver {driver} is not valid")
+        self.driver = __drivers__[driver]
+        if load_mode == "bulk" and not self.driver.bulk_load:
+            raise ValueError(f"Usage: Load mode {load_mode} is not available for database driver {driver}")
+        self.partitioning = self.config.get("partitioning", {})
+        self.pool_size = int(self.config["database"].get("pool_size", 1))
+        # Whether other connections, including those of member worker processes, see the same database
+        self.poolable = self.driver.poolable(self.config["database"])
+        if self.pool_size < 1 or (self.pool_size > 1 and not self.poolable):
+            raise ValueError(f"Usage: Pool size {self.pool_size} is not available for this database")
+        # Idle pooled connections, every connection opened for the pool and the batches sent on them, oldest first
+        self.pool = queue.LifoQueue()
+        self.pooled = []
+        self.pool_slots = threading.BoundedSemaphore(self.pool_size)
+        self.writer = None
+        self.pending = collections.deque()
+        for t in self.partitioning:
+            if "partition" not in self.import_tables.get(t, {}) or not self.driver.partitioning:
+                raise ValueError(f"Usage: Type {t} can not be partitioned with database driver {driver}")
+        self.write_mode = self.config.get("write", {})
+        for t, mode in self.write_mode.items():
+            if mode not in self.write_modes or (mode == "upsert" and "key" not in self.import_tables.get(t, {})):
+                raise ValueError(f"Usage: Write mode {mode} is not valid for type {t}")
+            if mode == "upsert" and load_mode == "bulk":
+                # LOAD DATA INFILE can only REPLACE or IGNORE records already stored
+                raise ValueError(f"Usage: Write mode {mode} can not be combined with load mode {load_mode}")
+        self.commit_cadence = self.config.get("commit", {})
+        for setting in self.commit_cadence:
+            if setting not in self.commit_settings:
+                raise ValueError(f"Usage: Commit setting {setting} is not valid")
+        # Rows written on the main connection since its last commit, and the seconds spent committing
+        self.uncommitted_rows = 0
+        self.last_commit = time.monotonic()
+        self.commit_seconds = 0.0
+        # Bytes of the largest statement the server accepts, read on first use, 0 when it sets no limit
+        self.statement_limit = None
+
+    def get_statement_limit(self) -> int | None:
+        """
+        get_statement_limit Returns the bytes of the largest statement the server accepts, from its
+        max_allowed_packet. Statements sending many rows at once are packed up to it from then on
+
+        :return: The bytes, None when the database sets no limit
+        :rtype: int | None
+        """
+        if self.statement_limit is None and not self.driver.packet_limit:
+            self.statement_limit = 0
+        elif self.statement_limit is None:
+            with self.driver.cursor(self.db) as cursor:
+                try:
+                    cursor.execute(Warehouse.StateSQL.get_max_packet())
+                    max_packet = int(cursor.fetchone()["max_allowed_packet"])
+                except Exception as error:
+                    print('Caught this error: ' + repr(error))
+                    raise
+            self.statement_limit = max(max_packet - __packet_headroom__, max_packet // 2)
+        return self.statement_limit or None
+
+    def commit(self) -> None:
+        """
+        commit Commits the transaction of the main connection
+
+        :return: None
+        """
+        start = time.perf_counter()
+        self.db.commit()
+        self.commit_seconds += time.perf_counter() - start
+        self.uncommitted_rows = 0
+        self.last_commit = time.monotonic()
+
+    def commit_batch(self, db, rows: int) -> None:
+        """
+        commit_batch Commits a batch written on the main connection once the commit section of the config file
+        calls for it, every N rows, every N seconds or only with the checkpoint of each imported member. Checkpoints
+        share the transaction of their batch, so an interrupted import resumes after the last batch committed
+
+        :param db: The connection the batch was written on, pooled connections commit every batch
+        :param int rows: The number of rows in the batch
+        :return: None
+        """
+        if db is not self.db:
+            db.commit()
+            return
+        self.uncommitted_rows += rows
+        cadence = self.commit_cadence
+        if (
+            len(cadence) == 0
+            or ("rows" in cadence and self.uncommitted_rows >= cadence["rows"])
+            or ("seconds" in cadence and time.monotonic() - self.last_commit >= cadence["seconds"])
+        ):
+            self.commit()
+
     def execute_sql(self, sql: str) -> None:
         """
         execute_prepared_sql Executes a SQL Command with provided prepared values
@@ -55,14 +238,15 @@ def execute_sql(self, sql: str) -> None:
         :param str sql: A SQL Command
         :return: None
         """
-        with self.db.cursor() as cursor:
+        with self.driver.cursor(self.db) as cursor:
             # print(sql)
             try:
-                cursor.execute(sql)
+                for statement in self.driver.translate(sql):
+                    cursor.execute(statement)
             except Exception as error:
                 print('Caught this error: ' + repr(error))
                 raise
-        self.db.commit()
+        self.commit()
 
     def execute_prepared_sql(self, prepared_sql: str, prepared_tuple: tuple) -> None:
         """
@@ -72,31 +256,685 @@ def execute_prepared_sql(self, prepared_sql: str, prepared_tuple: tuple) -> None
         :param tuple prepared_tuple: A tuple of values to run against provided prepared SQL
         :return: None
         """
-        with self.db.cursor() as cursor:
+        with self.driver.cursor(self.db) as cursor:
             # print(prepared_sql)
             try:
-                cursor.execute(prepared_sql, prepared_tuple)
+                for statement in self.driver.translate(prepared_sql):
+                    cursor.execute(statement, prepared_tuple)
             except Exception as error:
                 print('Caught this error: ' + repr(error))
                 raise
-        self.db.commit()
+        self.commit()
 
-    def executemany_prepared_sql(self, prepared_sql: str, prepared_list: list) -> None:
+    def executemany_prepared_sql(
+        self,
+        prepared_sql: str,
+        prepared_list: list,
+        checkpoint: tuple[str, tuple] | None = None,
+        db=None
+    ) -> None:
         """
         execute_prepared_sql Executes a SQL Command with provided prepared values
 
         :param str prepared_sql: A SQL Command with prepared values
         :param list prepared_list: A list of tuples to run against provided prepared SQL
+        :param tuple[str, tuple] | None checkpoint: An optional SQL Command and values committed in the same
+            transaction
+        :param db: A pooled connection committing the batch, defaults to the main connection
         :return: None
         """
-        with self.db.cursor() as cursor:
+        db = self.db if db is None else db
+        with self.driver.cursor(db) as cursor:
             # print(prepared_sql)
             try:
-                cursor.executemany(prepared_sql, prepared_list)
+                if self.statement_limit:
+                    self.driver.limit_statements(cursor, self.statement_limit)
+                for statement in self.driver.translate(prepared_sql):
+                    cursor.executemany(statement, prepared_list)
+                if checkpoint is not None:
+                    for statement in self.driver.translate(checkpoint[0]):
+                        cursor.execute(statement, checkpoint[1])
             except Exception as error:
                 print('Caught this error: ' + repr(error))
                 raise
-        self.db.commit()
+        self.commit_batch(db, len(prepared_list))
+
+    @contextlib.contextmanager
+    def pooled_connection(self):
+        """
+        pooled_connection Borrows a connection of the pool for one transaction, opening it on first use, and waits
+        while every connection of the pool is borrowed
+
+        :return: Context manager yielding the connection, rolled back when the transaction fails
+        """
+        with self.pool_slots:
+            try:
+                db = self.pool.get_nowait()
+            except queue.Empty:
+                db = self.driver.connect(self.config["database"], local_infile=self.load_mode == "bulk")
+                self.pooled.append(db)
+            try:
+                yield db
+            except BaseException:
+                db.rollback()
+                raise
+            finally:
+                self.pool.put(db)
+
+    def write_pooled(self, prepared_sql: str, prepared_list: list, load: bool = False) -> None:
+        """
+        write_pooled Sends a batch on a pooled connection and commits it there
+
+        :param str prepared_sql: A SQL Command with prepared values, or a LOAD DATA LOCAL INFILE command
+        :param list prepared_list: A list of tuples of prepared values
+        :param bool load: Whether prepared_sql is a LOAD DATA LOCAL INFILE command
+        :return: None
+        """
+        with self.pooled_connection() as db:
+            if load:
+                self.load_prepared_list(prepared_sql, prepared_list, db=db)
+            else:
+                self.executemany_prepared_sql(prepared_sql, prepared_list, db=db)
+
+    def submit_prepared_list(
+        self,
+        prepared_sql: str,
+        prepared_list: list,
+        checkpoint: tuple[str, tuple] | None = None,
+        load: bool = False
+    ) -> None:
+        """
+        submit_prepared_list Sends a batch from a writer thread on a pooled connection, in its own transaction, so up
+        to pool_size batches are written at once. Checkpoints are committed on the main connection in the order
+        their batches were submitted, once every earlier batch is committed. Rows the commit section left
+        uncommitted on the main connection are committed first, as their locks would hold up the pooled connections
+
+        :param str prepared_sql: A SQL Command with prepared values, or a LOAD DATA LOCAL INFILE command
+        :param list prepared_list: A list of tuples of prepared values
+        :param tuple[str, tuple] | None checkpoint: An optional SQL Command and values committed after the batch
+        :param bool load: Whether prepared_sql is a LOAD DATA LOCAL INFILE command
+        :return: None
+        """
+        if self.uncommitted_rows > 0:
+            self.commit()
+        if self.writer is None:
+            self.writer = concurrent.futures.ThreadPoolExecutor(max_workers=self.pool_size)
+        while len(self.pending) >= self.pool_size or (len(self.pending) > 0 and self.pending[0][0].done()):
+            self.finish_oldest_batch()
+        self.pending.append((self.writer.submit(self.write_pooled, prepared_sql, prepared_list, load), checkpoint))
+
+    def finish_oldest_batch(self) -> None:
+        """
+        finish_oldest_batch Waits for the oldest batch sent on the pool and commits its checkpoint. When it failed,
+        the batches sent after it are waited for and the error is raised
+
+        :return: None
+        """
+        future, checkpoint = self.pending.popleft()
+        try:
+            future.result()
+        except Exception as error:
+            print('Caught this error: ' + repr(error))
+            concurrent.futures.wait([pending for pending, _ in self.pending])
+            self.pending.clear()
+            raise
+        if checkpoint is not None:
+            self.execute_prepared_sql(*checkpoint)
+
+    def wait_batches(self) -> None:
+        """
+        wait_batches Waits for every batch sent on the pool and commits their checkpoints
+
+        :return: None
+        """
+        while len(self.pending) > 0:
+            self.finish_oldest_batch()
+
+    @staticmethod
+    def write_load_file(file, prepared_list: list) -> None:
+        """
+        write_load_file Writes prepared tuples as tab separated lines readable by LOAD DATA INFILE
+
+        :param file: A writable text file
+        :param list prepared_list: A list of tuples of prepared values
+        :return: None
+        """
+        for row in prepared_list:
+            file.write("\t".join(
+                "\\N" if value is None else str(value).translate(__load_data_escapes__) for value in row
+            ))
+            file.write("\n")
+
+    def load_prepared_list(
+        self,
+        load_sql: str,
+        prepared_list: list,
+        checkpoint: tuple[str, tuple] | None = None,
+        db=None
+    ) -> None:
+        """
+        load_prepared_list Streams prepared tuples to a temporary file and bulk loads it with LOAD DATA LOCAL INFILE
+
+        :param str load_sql: A LOAD DATA LOCAL INFILE command with the file name as its prepared value
+        :param list prepared_list: A list of tuples to load
+        :param tuple[str, tuple] | None checkpoint: An optional SQL Command and values committed in the same
+            transaction
+        :param db: A pooled connection committing the batch, defaults to the main connection
+        :return: None
+        """
+        db = self.db if db is None else db
+        with tempfile.NamedTemporaryFile(
+            mode="w",
+            encoding="utf-8",
+            newline="\n",
+            suffix=".tsv",
+            delete=False
+        ) as file:
+            self.write_load_file(file, prepared_list)
+        try:
+            with self.driver.cursor(db) as cursor:
+                try:
+                    cursor.execute(load_sql, (file.name,))
+                    if checkpoint is not None:
+                        cursor.execute(*checkpoint)
+                except Exception as error:
+                    print('Caught this error: ' + repr(error))
+                    raise
+            self.commit_batch(db, len(prepared_list))
+        finally:
+            os.unlink(file.name)
+
+    def get_fingerprints(self) -> Iterator[tuple[str, int, int]]:
+        """
+        get_fingerprints Streams the fingerprint of every voter record in key order, creating the fingerprint table
+        if needed
+
+        :return: An iterator of the county code, voter id and fingerprint of each record
+        :rtype: Iterator[tuple[str, int, int]]
+        """
+        self.execute_sql(Warehouse.StateSQL.create_fingerprints_table())
+        with self.driver.cursor(self.db, stream=True) as cursor:
+            try:
+                cursor.execute(*self.driver.translate(Warehouse.StateSQL.get_fingerprints()))
+                for county_code, voter_id, fingerprint in cursor:
+                    yield county_code, voter_id, fingerprint
+            except Exception as error:
+                print('Caught this error: ' + repr(error))
+                raise
+
+    def get_progress(self, archive_sha: str) -> dict[str, tuple[int, bool]]:
+        """
+        get_progress Reads the checkpoints of an archive, creating the checkpoint table if needed
+
+        :param str archive_sha: The SHA-256 checksum of the archive
+        :return: Rows committed and completion keyed by archive member
+        :rtype: dict[str, tuple[int, bool]]
+        """
+        self.execute_sql(Warehouse.StateSQL.create_progress_table())
+        with self.driver.cursor(self.db) as cursor:
+            try:
+                cursor.execute(*self.driver.translate(Warehouse.StateSQL.get_progress()), (archive_sha,))
+                return {
+                    row["member"]: (row["rows_committed"], bool(row["completed"])) for row in cursor.fetchall()
+                }
+            except Exception as error:
+                print('Caught this error: ' + repr(error))
+                raise
+
+    def clear_progress(self, archive_sha: str) -> None:
+        """
+        clear_progress Deletes the checkpoints of an archive, creating the checkpoint table if needed
+
+        :param str archive_sha: The SHA-256 checksum of the archive
+        :return: None
+        """
+        self.execute_sql(Warehouse.StateSQL.create_progress_table())
+        self.execute_prepared_sql(Warehouse.StateSQL.delete_progress(), (archive_sha,))
+
+    def set_progress(self, archive_sha: str, member: str, rows_committed: int, completed: bool) -> None:
+        """
+        set_progress Records the checkpoint of an archive member
+
+        :param str archive_sha: The SHA-256 checksum of the archive
+        :param str member: The archive member, an empty string for the whole archive
+        :param int rows_committed: The number of rows of the member committed
+        :param bool completed: Whether the member is fully imported
+        :return: None
+        """
+        self.execute_prepared_sql(
+            Warehouse.StateSQL.set_progress(),
+            (archive_sha, member, rows_committed, int(completed))
+        )
+
+    def get_dimension_id(self, dimension: str, key: tuple) -> int:
+        """
+        get_dimension_id Returns the surrogate key of a dimension row from the in-process cache, adding the row if it
+        is new. The whole dimension table is read on first use. Keys with a missing value, such as a blank election
+        date, have no row and map to 0, the default of the surrogate key columns, as they are part of primary keys
+        that can not be NULL.
+
+        :param str dimension: The dimension name, one of dimension_tables
+        :param tuple key: The values of the natural key columns of the row
+        :return: The surrogate key, 0 for a key with a missing value
+        :rtype: int
+        """
+        if None in key:
+            return 0
+        if dimension not in self.dimensions:
+            table = self.dimension_tables[dimension]
+            self.execute_sql(getattr(Warehouse.StateSQL, table["create"])())
+            with self.driver.cursor(self.db) as cursor:
+                try:
+                    cursor.execute(*self.driver.translate(getattr(Warehouse.StateSQL, table["get_all"])()))
+                    self.dimensions[dimension] = {
+                        tuple(str(row[column]) for column in table["key"]): row[table["id"]]
+                        for row in cursor.fetchall()
+                    }
+                except Exception as error:
+                    print('Caught this error: ' + repr(error))
+                    raise
+        ids = self.dimensions[dimension]
+        if key not in ids:
+            table = self.dimension_tables[dimension]
+            self.execute_prepared_sql(getattr(Warehouse.StateSQL, table["set"])(), key)
+            with self.driver.cursor(self.db) as cursor:
+                try:
+                    cursor.execute(*self.driver.translate(getattr(Warehouse.StateSQL, table["get"])()), key)
+                    row = cursor.fetchone()
+                    if row is None:
+                        raise ValueError(f"Dimension {dimension} has no row for {key} after adding it")
+                    ids[key] = row[table["id"]]
+                except Exception as error:
+                    print('Caught this error: ' + repr(error))
+                    raise
+        return ids[key]
+
+    def get_election_id(self, election_date: str, election_type: str) -> int:
+        """
+        get_election_id Returns the id of an election, adding the election if it is new
+
+        :param str election_date: The election date in YYYY-MM-DD format
+        :param str election_type: The election type
+        :return: The election id
+        :rtype: int
+        """
+        return self.get_dimension_id("elections", (election_date, election_type))
+
+    def intern_dimensions(self, t: str, fields: list[str], data: list[tuple]) -> list[tuple]:
+        """
+        intern_dimensions Replaces the dimension values of a batch of imported records with their surrogate keys,
+        laying the records out as the columns of the import table
+
+        :param str t: String representing the type of records being imported
+        :param list[str] fields: The field names of the imported records
+        :param list[tuple] data: A list of tuples of SQL ready prepared parameters
+        :return: The records with surrogate keys, unchanged for tables without dimensions
+        :rtype: list[tuple]
+        """
+        table = self.import_tables[t]
+        if "dimensions" not in table:
+            return data
+        plan = []
+        for column in getattr(self.state_sql, table["columns"])():
+            if column in table["dimensions"]:
+                dimension, keys = table["dimensions"][column]
+                plan.append((dimension, [fields.index(key) for key in keys]))
+            else:
+                plan.append((None, fields.index(column)))
+        get_dimension_id = self.get_dimension_id
+        return [
+            tuple(
+                row[position] if dimension is None else
+                get_dimension_id(dimension, tuple(row[i] for i in position))
+                for dimension, position in plan
+            )
+            for row in data
+        ]
+
+    @staticmethod
+    def voted(turnout: bytes, election_id: int) -> bool:
+        """
+        voted Returns whether a turnout bitset has an election set
+
+        :param bytes turnout: The turnout bitset of a voter
+        :param int election_id: The id of the election
+        :return: Whether the voter voted in the election
+        :rtype: bool
+        """
+        return bool(int.from_bytes(turnout, "little") >> election_id & 1)
+
+    @staticmethod
+    def turnout_table(staging: bool = False) -> str:
+        """
+        turnout_table Returns the name of the turnout table, or of the staging copy filled while Histories is staged
+
+        :param bool staging: Whether Histories is imported into its staging table
+        :return: The name of the table
+        :rtype: str
+        """
+        return "VoterTurnout_staging" if staging else "VoterTurnout"
+
+    def set_turnout(self, votes: Iterable[tuple], staging: bool = False) -> None:
+        """
+        set_turnout Sets the elections of a batch of histories in the turnout bitsets of their voters. Each byte is
+        ORed into the stored bitset by the database, so imports writing the same voters side by side keep every bit,
+        and setting a bit twice changes nothing, so a batch may be merged again after an interrupted import.
+
+        :param Iterable[tuple] votes: County code, voter id, election date and election type of each history
+        :param bool staging: Merge into the staging copy of the turnout table, swapped in along with Histories
+        :return: None
+        """
+        table = self.turnout_table(staging)
+        if table not in self.turnout_tables:
+            self.execute_sql(Warehouse.StateSQL.create_turnout_table(table, self.turnout_bytes))
+            self.turnout_tables.add(table)
+        masks = {}
+        for county_code, voter_id, election_date, election_type in votes:
+            if election_date is None:
+                continue
+            election_id = self.get_election_id(election_date, election_type)
+            if election_id // 8 >= self.turnout_bytes:
+                raise ValueError(
+                    f"Election {election_date} {election_type} has id {election_id}, which does not fit the "
+                    f"{self.turnout_bytes} byte turnout bitsets"
+                )
+            key = (county_code, int(voter_id or 0), election_id // 8)
+            masks[key] = masks.get(key, 0) | 1 << election_id % 8
+        if len(masks) == 0:
+            return
+        self.executemany_prepared_sql(
+            Warehouse.StateSQL.set_turnout(table),
+            [(county_code, voter_id, bytes(byte) + bytes([mask]))
+             for (county_code, voter_id, byte), mask in masks.items()]
+        )
+
+    def begin_turnout_staging(self, resume: bool = False) -> None:
+        """
+        begin_turnout_staging Creates an empty staging copy of the turnout table, so the bitsets are built again
+        from the histories being staged instead of keeping the elections of records they replace
+
+        :param bool resume: Keep the bitsets of an existing staging table from an interrupted import
+        :return: None
+        """
+        staging = self.turnout_table(True)
+        if not resume:
+            self.execute_sql(Warehouse.StateSQL.drop_table(staging))
+        self.execute_sql(Warehouse.StateSQL.create_turnout_table(staging, self.turnout_bytes))
+        self.turnout_tables.add(staging)
+
+    def finish_turnout_staging(self) -> None:
+        """
+        finish_turnout_staging Swaps the staging copy of the turnout table in for the live table
+
+        :return: None
+        """
+        table = self.turnout_table()
+        staging = self.turnout_table(True)
+        retired = f"{table}_retired"
+        self.execute_sql(Warehouse.StateSQL.create_turnout_table(table, self.turnout_bytes))
+        self.execute_sql(Warehouse.StateSQL.drop_table(retired))
+        self.execute_sql(Warehouse.StateSQL.swap_tables(table, staging, retired))
+        self.execute_sql(Warehouse.StateSQL.drop_table(retired))
+        self.turnout_tables = {table}
+
+    def clear_fingerprints(self, counties: list[str] | None = None) -> None:
+        """
+        clear_fingerprints Deletes the stored fingerprints of counties whose voter records are written without them,
+        so a later delta import sends their records again instead of comparing them with stale fingerprints
+
+        :param list[str] | None counties: The county codes, None for every county
+        :return: None
+        """
+        self.execute_sql(Warehouse.StateSQL.create_fingerprints_table())
+        if counties is None:
+            self.execute_sql(Warehouse.StateSQL.delete_fingerprints(county=False))
+        else:
+            self.executemany_prepared_sql(Warehouse.StateSQL.delete_fingerprints(), [(c,) for c in counties])
+
+    def delete_voters(self, t: str, keys: list[tuple[str, int]]) -> None:
+        """
+        delete_voters Deletes voter records and their fingerprints
+
+        :param str t: String representing the type of records being imported
+        :param list[tuple[str, int]] keys: County code and voter id of each record to delete
+        :return: None
+        """
+        for i in range(0, len(keys), self.batch_limits[t]):
+            batch = keys[i:i + self.batch_limits[t]]
+            self.executemany_prepared_sql(Warehouse.StateSQL.delete_voter(self.import_tables[t]["table"]), batch)
+            self.executemany_prepared_sql(Warehouse.StateSQL.delete_fingerprint(), batch)
+
+    def write_sql(self, t: str, prepared_sql: str) -> str:
+        """
+        write_sql Returns the statement writing the records of a type in its write mode
+
+        :param str t: String representing the type of records
+        :param str prepared_sql: The REPLACE INTO statement of the type
+        :return: SQL String
+        :rtype: str
+        """
+        if self.write_mode.get(t, "replace") == "upsert":
+            return Warehouse.StateSQL.upsert(
+                prepared_sql, self.import_tables[t]["key"], self.import_tables[t].get("refreshed")
+            )
+        return prepared_sql
+
+    def get_columns(self, table: str) -> list[str]:
+        """
+        get_columns Returns the column names of a table
+
+        :param str table: The name of the table
+        :return: The column names, empty when the table does not exist
+        :rtype: list[str]
+        """
+        with self.driver.cursor(self.db) as cursor:
+            try:
+                cursor.execute(*self.driver.translate(Warehouse.StateSQL.get_columns()), (table,))
+                return [row["name"] for row in cursor.fetchall()]
+            except Exception as error:
+                print('Caught this error: ' + repr(error))
+                raise
+
+    def upgrade_schema(self) -> None:
+        """
+        upgrade_schema Moves tables stored with the layout of an earlier release onto the current one. Called by
+        init_schema and before exporting, so a database created by an earlier release keeps working
+
+        :return: None
+        """
+        pass
+
+    def create_table_sql(self, t: str, table: str | None = None, indexes: bool = True) -> str:
+        """
+        create_table_sql Returns SQL string to create an import table, partitioned when the config file asks for it
+
+        :param str t: String representing the type of records being imported
+        :param str | None table: The name of the table, defaults to the import table itself
+        :param bool indexes: Whether to declare the secondary indexes
+        :return: SQL String
+        :rtype: str
+        """
+        definition = self.import_tables[t]
+        options = {}
+        if t in self.partitioning:
+            options["partitions"] = Warehouse.StateSQL.partition_by_year(
+                definition["partition"],
+                self.partitioning[t].get("first_year", 2000),
+                self.partitioning[t].get("counties", 0)
+            )
+        return getattr(self.state_sql, definition["create"])(table or definition["table"], indexes=indexes, **options)
+
+    def get_partitions(self, table: str) -> dict[int, str]:
+        """
+        get_partitions Returns the partitions of a table keyed by the year each is less than
+
+        :param str table: The name of the table
+        :return: Partition names keyed by their bound, empty for a table that is not partitioned
+        :rtype: dict[int, str]
+        """
+        with self.driver.cursor(self.db) as cursor:
+            try:
+                cursor.execute(*self.driver.translate(Warehouse.StateSQL.get_partitions()), (table,))
+                return {int(row["bound"]): row["name"] for row in cursor.fetchall()}
+            except Exception as error:
+                print('Caught this error: ' + repr(error))
+                raise
+
+    def add_partitions(self, t: str, table: str, fields: list[str], data: list[tuple]) -> None:
+        """
+        add_partitions Adds the partitions of the years of a batch of imported records missing from a partitioned
+        table, before the batch is written
+
+        :param str t: String representing the type of records being imported
+        :param str table: The name of the table receiving the batch
+        :param list[str] fields: The field names of the imported records
+        :param list[tuple] data: A list of tuples of SQL ready prepared parameters
+        :return: None
+        """
+        if t not in self.partitioning:
+            return
+        if table not in self.partitions:
+            self.partitions[table] = self.get_partitions(table)
+            if len(self.partitions[table]) == 0:
+                print(f"{table} is not partitioned, import a full file with staging to partition it")
+        partitions = self.partitions[table]
+        if len(partitions) == 0:
+            return
+        position = fields.index(self.import_tables[t]["partition"])
+        first_year = self.partitioning[t].get("first_year", 2000)
+        for year in sorted({int(str(row[position])[:4]) for row in data if row[position]}):
+            if year < first_year or year + 1 in partitions:
+                continue
+            # Each partition holds a single year, so dropping the partition of a year drops no other year
+            lower = max([bound for bound in partitions if bound <= year], default=first_year)
+            later = [bound for bound in partitions if bound > year + 1]
+            if len(later) == 0:
+                years = range(lower, year + 1)
+                sql = Warehouse.StateSQL.add_year_partitions(table, lower, year)
+            else:
+                years = range(lower, min(later))
+                sql = Warehouse.StateSQL.split_year_partitions(table, partitions[min(later)], lower, min(later))
+            print(f"Adding partitions {', '.join(f'p{y}' for y in years)} to {table}..")
+            try:
+                self.execute_sql(sql)
+            except Exception:
+                # Member workers add the partitions of the same years side by side
+                partitions.update(self.get_partitions(table))
+                if year + 1 not in partitions:
+                    raise
+            partitions.update({y + 1: f"p{y}" for y in years})
+
+    def begin_staging(self, t: str, resume: bool = False) -> str:
+        """
+        begin_staging Creates an empty staging copy of an import table without its secondary indexes
+
+        :param str t: String representing the type of records being imported
+        :param bool resume: Keep the records of an existing staging table from an interrupted import
+        :return: The name of the staging table
+        :rtype: str
+        """
+        table = self.import_tables[t]
+        staging = f"{table['table']}_staging"
+        if not resume:
+            self.execute_sql(Warehouse.StateSQL.drop_table(staging))
+        self.execute_sql(self.create_table_sql(t, staging, indexes=False))
+        self.partitions.pop(staging, None)
+        return staging
+
+    def build_indexes(self, t: str, table: str) -> None:
+        """
+        build_indexes Builds every secondary index of an import table in a single pass and reports the time taken
+
+        :param str t: String representing the type of records being imported
+        :param str table: The name of the table, the import table itself or its staging copy
+        :return: None
+        """
+        indexes = getattr(self.state_sql, self.import_tables[t]["indexes"])()
+        print(f"Building {len(indexes)} indexes on {table}..")
+        start = time.perf_counter()
+        self.execute_sql(Warehouse.StateSQL.add_indexes(table, indexes))
+        print(f"Built {len(indexes)} indexes on {table} in {time.perf_counter() - start:.1f} seconds")
+
+    def begin_fast_load(self, t: str) -> bool:
+        """
+        begin_fast_load Recreates an empty import table without its secondary indexes, so a first full load only
+        maintains its primary key
+
+        :param str t: String representing the type of records being imported
+        :return: Whether the table was empty and recreated, a table with records keeps its indexes
+        :rtype: bool
+        """
+        table = self.import_tables[t]
+        with self.driver.cursor(self.db) as cursor:
+            try:
+                cursor.execute(*self.driver.translate(Warehouse.StateSQL.get_any_row(table["table"])))
+                found = cursor.fetchone() is not None
+            except Exception as error:
+                print('Caught this error: ' + repr(error))
+                raise
+        if found:
+            print(f"{table['table']} already has records, importing into it with its indexes..")
+            return False
+        self.execute_sql(Warehouse.StateSQL.drop_table(table["table"]))
+        self.execute_sql(self.create_table_sql(t, indexes=False))
+        self.partitions.pop(table["table"], None)
+        return True
+
+    def finish_fast_load(self, t: str) -> None:
+        """
+        finish_fast_load Builds the secondary indexes of an import table left out by begin_fast_load
+
+        :param str t: String representing the type of records being imported
+        :return: None
+        """
+        self.build_indexes(t, self.import_tables[t]["table"])
+
+    def finish_staging(self, t: str) -> None:
+        """
+        finish_staging Builds the secondary indexes of a staging table once and swaps it in for the live table
+
+        :param str t: String representing the type of records being imported
+        :return: None
+        """
+        table = self.import_tables[t]
+        staging = f"{table['table']}_staging"
+        retired = f"{table['table']}_retired"
+        self.build_indexes(t, staging)
+        print(f"Swapping {staging} in for {table['table']}..")
+        self.execute_sql(Warehouse.StateSQL.drop_table(retired))
+        self.execute_sql(Warehouse.StateSQL.swap_tables(table["table"], staging, retired))
+        self.execute_sql(Warehouse.StateSQL.drop_table(retired))
+        self.partitions.pop(table["table"], None)
+
+    def export_walking_list(self, file: IO[str], filters: dict[str, str]) -> int:
+        """
+        export_walking_list Streams a walking list to a CSV file as its rows arrive, in constant memory
+
+        :param IO[str] file: A writable text file opened with newline=''
+        :param dict[str, str] filters: Filter values keyed by filter name, None for filters not applied
+        :return: The number of voters exported
+        :rtype: int
+        """
+        exported = 0
+        self.upgrade_schema()
+        with self.driver.cursor(self.db, stream=True) as cursor:
+            try:
+                if not hasattr(self.state_sql, "export_walking_list"):
+                    raise ValueError(f"Usage: Walking lists are not available for {type(self).state_designation}")
+                names = [name for name in self.state_sql.walking_list_filters() if filters.get(name) is not None]
+                cursor.execute(
+                    *self.driver.translate(self.state_sql.export_walking_list(names)),
+                    tuple(filters[name] for name in names)
+                )
+                writer = csv.writer(file)
+                writer.writerow([column[0] for column in cursor.description])
+                while rows := cursor.fetchmany(self.export_fetch_size):
+                    writer.writerows(rows)
+                    exported += len(rows)
+            except Exception as error:
+                print('Caught this error: ' + repr(error))
+                raise
+        return exported
 
     def __enter__(self):
         """
@@ -106,14 +944,7 @@ def __enter__(self):
         :rtype: Warehouse.State
         """
         try:
-            self.db = pymysql.connect(
-                host=self.config["database"]["host"],
-                port=self.config["database"]["port"],
-                user=self.config["database"]["user"],
-                password=self.config["database"]["password"],
-                database=self.config["database"]["schema"],
-                cursorclass=pymysql.cursors.DictCursor
-            )
+            self.db = self.driver.connect(self.config["database"], local_infile=self.load_mode == "bulk")
             if "batch" in self.config:
                 self.batch_limits = self.config["batch"]
             else:
@@ -138,12 +969,21 @@ def __exit__(
         :param Optional[Type[BaseException]] exc_type: Execution Type
         :param Optional[BaseException] exc_val: Execution Value
         :param Optional[TracebackType] exc_tb: Execution
-        :return: Always true unless otherwise implemented in the future
+        :return: False, so an exception raised in the with statement reaches the caller
         :rtype: bool
         """
         try:
+            if self.writer is not None:
+                self.writer.shutdown(cancel_futures=True)
+                self.writer = None
+            self.pending.clear()
+            for db in self.pooled:
+                db.close()
+            self.pooled = []
+            if exc_type is None:
+                self.commit()
             self.db.close()
         except Exception as error:
             print('Caught this error: ' + repr(error))
             raise
-        return True
+        return False
@@ -0,0 +1,679 @@
+# -*- coding: utf-8 -*-
+
+# Handles Database SQL methods shared by all states
+
+import re
+
+
+def index_definitions(indexes: dict[str, list[str]]) -> str:
+    """
+    index_definitions Returns the secondary KEY clauses of a CREATE TABLE statement
+
+    :param dict[str, list[str]] indexes: Index names mapped to their columns
+    :return: SQL String, each clause preceded by a comma
+    :rtype: str
+    """
+    return "".join(
+        f",\n          KEY `{name}` ({','.join(f'`{column}`' for column in columns)})"
+        for name, columns in indexes.items()
+    )
+
+
+def add_indexes(table: str, indexes: dict[str, list[str]]) -> str:
+    """
+    add_indexes Returns SQL string to build all secondary indexes of a table in a single pass
+
+    :param str table: The name of the table
+    :param dict[str, list[str]] indexes: Index names mapped to their columns
+    :return: SQL String
+    :rtype: str
+    """
+    return f"ALTER TABLE `{table}` " + ", ".join(
+        f"ADD INDEX `{name}` ({','.join(f'`{column}`' for column in columns)})"
+        for name, columns in indexes.items()
+    ) + ";"
+
+
+def drop_table(table: str) -> str:
+    """
+    drop_table Returns SQL string to drop a table
+
+    :param str table: The name of the table
+    :return: SQL String
+    :rtype: str
+    """
+    return f"DROP TABLE IF EXISTS `{table}`;"
+
+
+def partition_by_year(column: str, first_year: int, counties: int = 0) -> str:
+    """
+    partition_by_year Returns the PARTITION BY clause of a CREATE TABLE statement ranging a table by the year of a
+    date column. Its only partition holds the years before the first year, later years are added as they arrive
+
+    :param str column: The date column, part of every unique key of the table
+    :param int first_year: The first year with a partition of its own
+    :param int counties: The number of subpartitions hashed by county code, 0 for none
+    :return: SQL String
+    :rtype: str
+    """
+    subpartitions = f"\n        SUBPARTITION BY KEY (`county_code`) SUBPARTITIONS {counties}" if counties > 0 else ""
+    return (
+        f"\n        PARTITION BY RANGE (YEAR(`{column}`)){subpartitions}"
+        f"\n        (PARTITION `p_before` VALUES LESS THAN ({first_year}))"
+    )
+
+
+def get_partitions() -> str:
+    """
+    get_partitions Returns SQL string to read the partitions of a table with the value each is less than
+
+    :return: SQL String
+    :rtype: str
+    """
+    return """SELECT DISTINCT `PARTITION_NAME` AS `name`, `PARTITION_DESCRIPTION` AS `bound`
+        FROM information_schema.`PARTITIONS`
+        WHERE `TABLE_SCHEMA` = DATABASE() AND `TABLE_NAME` = %s AND `PARTITION_NAME` IS NOT NULL;
+    """
+
+
+def upsert(replace_sql: str, key: list[str], refreshed: list[str] | None = None) -> str:
+    """
+    upsert Returns SQL string inserting the records of a REPLACE statement, updating only the columns outside the key
+    of records already stored. Unlike REPLACE, a stored record is not deleted and inserted again, so its unchanged
+    index entries are left alone and a record whose values are unchanged is not written at all. Refreshed columns,
+    such as the export date appended to every record, are only updated along with another column, so a new export
+    of an unchanged record does not count as a change
+
+    :param str replace_sql: A REPLACE INTO statement naming its columns
+    :param list[str] key: The columns of the primary key of the table
+    :param list[str] | None refreshed: The columns updated only when another column outside the key changed
+    :return: SQL String
+    :rtype: str
+    """
+    columns = [column.strip(" `\n") for column in re.search(r"\(([^)]*)\)", replace_sql).group(1).split(",")]
+    refreshed = [column for column in columns if column in (refreshed or [])]
+    updates = [column for column in columns if column not in key and column not in refreshed]
+    if len(updates) == 0:
+        # A record with nothing outside its key is unchanged whenever its key is already stored
+        return re.sub(r"^\s*REPLACE\s+INTO", "INSERT IGNORE INTO", replace_sql)
+    # Assignments run in order and see the columns already updated, so the refreshed columns compare first
+    changed = " OR ".join(f"NOT (`{column}` <=> VALUES(`{column}`))" for column in updates)
+    return re.sub(r"^\s*REPLACE\s+INTO", "INSERT INTO", replace_sql).rstrip().removesuffix(";") + """
+    ON DUPLICATE KEY UPDATE """ + """,
+        """.join(
+        [f"`{column}` = IF({changed}, VALUES(`{column}`), `{column}`)" for column in refreshed]
+        + [f"`{column}` = VALUES(`{column}`)" for column in updates]
+    ) + ";"
+
+
+def get_max_packet() -> str:
+    """
+    get_max_packet Returns SQL string to read the largest packet the server accepts
+
+    :return: SQL String
+    :rtype: str
+    """
+    return """SELECT @@max_allowed_packet AS `max_allowed_packet`;"""
+
+
+def year_partitions(first_year: int, bound: int) -> str:
+    """
+    year_partitions Returns the partition definitions of the years from the first year up to a bound, one per year
+
+    :param int first_year: The first year
+    :param int bound: The year the last partition is less than
+    :return: SQL String
+    :rtype: str
+    """
+    return """,
+        """.join(f"PARTITION `p{year}` VALUES LESS THAN ({year + 1})" for year in range(first_year, bound))
+
+
+def add_year_partitions(table: str, first_year: int, year: int) -> str:
+    """
+    add_year_partitions Returns SQL string to add the partitions of a year later than every partition of a table and
+    of the years before it from the first year not partitioned yet, so each partition holds a single year
+
+    :param str table: The name of the table
+    :param int first_year: The year every partition of the table is less than
+    :param int year: The year
+    :return: SQL String
+    :rtype: str
+    """
+    return f"""ALTER TABLE `{table}` ADD PARTITION (
+        {year_partitions(first_year, year + 1)}
+        );
+    """
+
+
+def split_year_partitions(table: str, partition: str, first_year: int, bound: int) -> str:
+    """
+    split_year_partitions Returns SQL string to split a partition holding several years into a partition per year
+
+    :param str table: The name of the table
+    :param str partition: The name of the partition
+    :param int first_year: The first year of the partition, the bound of the partition before it
+    :param int bound: The year the partition is less than
+    :return: SQL String
+    :rtype: str
+    """
+    return f"""ALTER TABLE `{table}` REORGANIZE PARTITION `{partition}` INTO (
+        {year_partitions(first_year, bound)}
+        );
+    """
+
+
+def get_any_row(table: str) -> str:
+    """
+    get_any_row Returns SQL string reading at most one row of a table, none when it is empty
+
+    :param str table: The name of the table
+    :return: SQL String
+    :rtype: str
+    """
+    return f"SELECT 1 AS `found` FROM `{table}` LIMIT 1;"
+
+
+def get_columns() -> str:
+    """
+    get_columns Returns SQL string to read the column names of a table, none when the table does not exist
+
+    :return: SQL String
+    :rtype: str
+    """
+    return """SELECT `COLUMN_NAME` AS `name`
+        FROM information_schema.`COLUMNS`
+        WHERE `TABLE_SCHEMA` = DATABASE() AND `TABLE_NAME` = %s
+        ORDER BY `ORDINAL_POSITION`;
+    """
+
+
+def swap_tables(table: str, staging: str, retired: str) -> str:
+    """
+    swap_tables Returns SQL string to atomically replace a table with its staging copy
+
+    :param str table: The name of the live table
+    :param str staging: The name of the staging table
+    :param str retired: The name the live table is moved to
+    :return: SQL String
+    :rtype: str
+    """
+    return f"RENAME TABLE `{table}` TO `{retired}`, `{staging}` TO `{table}`;"
+
+
+def create_fingerprints_table() -> str:
+    """
+    create_fingerprints_table Returns SQL string to create the table of voter record fingerprints
+
+    :return: SQL String
+    :rtype: str
+    """
+    return """CREATE TABLE IF NOT EXISTS `VoterFingerprints` (
+          `county_code` varchar(3) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
+          `voter_id` bigint(18) unsigned NOT NULL DEFAULT 0,
+          `fingerprint` bigint(20) unsigned NOT NULL DEFAULT 0,
+          PRIMARY KEY (`county_code`,`voter_id`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8 COLLATE=utf8_unicode_ci;
+    """
+
+
+def get_fingerprints() -> str:
+    """
+    get_fingerprints Returns SQL string to read every voter record fingerprint in primary key order
+
+    :return: SQL String
+    :rtype: str
+    """
+    return """SELECT
+        county_code,
+        voter_id,
+        fingerprint
+    FROM
+        VoterFingerprints
+    ORDER BY
+        county_code,
+        voter_id;"""
+
+
+def set_fingerprint() -> str:
+    """
+    set_fingerprint Returns SQL string to replace the fingerprint of a voter record
+
+    :return: SQL String
+    :rtype: str
+    """
+    return """REPLACE
+        INTO
+        VoterFingerprints
+    (county_code,
+        voter_id,
+        fingerprint)
+    VALUES(%s,
+        %s,
+        %s);"""
+
+
+def delete_fingerprints(county: bool = True) -> str:
+    """
+    delete_fingerprints Returns SQL string to delete the fingerprints of the voter records of a county, or of every
+    county
+
+    :param bool county: Whether the county code is given as a prepared value
+    :return: SQL String
+    :rtype: str
+    """
+    return """DELETE
+    FROM
+        VoterFingerprints""" + ("""
+    WHERE
+        county_code = %s;""" if county else ";")
+
+
+def delete_fingerprint() -> str:
+    """
+    delete_fingerprint Returns SQL string to delete the fingerprint of a voter record
+
+    :return: SQL String
+    :rtype: str
+    """
+    return """DELETE
+    FROM
+        VoterFingerprints
+    WHERE
+        county_code = %s
+        AND voter_id = %s;"""
+
+
+def delete_voter(table: str = "Voters") -> str:
+    """
+    delete_voter Returns SQL string to delete a voter record
+
+    :param str table: The name of the table
+    :return: SQL String
+    :rtype: str
+    """
+    return f"""DELETE
+    FROM
+        `{table}`
+    WHERE
+        county_code = %s
+        AND voter_id = %s;"""
+
+
+def create_progress_table() -> str:
+    """
+    create_progress_table Returns SQL string to create the table of import checkpoints
+
+    :return: SQL String
+    :rtype: str
+    """
+    return """CREATE TABLE IF NOT EXISTS `ImportProgress` (
+          `archive_sha` char(64) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
+          `member` varchar(255) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
+          `rows_committed` bigint(20) unsigned NOT NULL DEFAULT 0,
+          `completed` TINYINT(1) NOT NULL DEFAULT 0,
+          `updated` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+          PRIMARY KEY (`archive_sha`,`member`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8 COLLATE=utf8_unicode_ci;
+    """
+
+
+def get_progress() -> str:
+    """
+    get_progress Returns SQL string to read the checkpoints of an archive
+
+    :return: SQL String
+    :rtype: str
+    """
+    return """SELECT
+        member,
+        rows_committed,
+        completed
+    FROM
+        ImportProgress
+    WHERE
+        archive_sha = %s;"""
+
+
+def set_progress() -> str:
+    """
+    set_progress Returns SQL string to replace the checkpoint of an archive member
+
+    :return: SQL String
+    :rtype: str
+    """
+    return """REPLACE
+        INTO
+        ImportProgress
+    (archive_sha,
+        member,
+        rows_committed,
+        completed)
+    VALUES(%s,
+        %s,
+        %s,
+        %s);"""
+
+
+def delete_progress() -> str:
+    """
+    delete_progress Returns SQL string to delete the checkpoints of an archive
+
+    :return: SQL String
+    :rtype: str
+    """
+    return """DELETE
+    FROM
+        ImportProgress
+    WHERE
+        archive_sha = %s;"""
+
+
+def export_walking_list(
+    columns: list[str],
+    conditions: list[str],
+    order: list[str],
+    histories: str = "Histories h",
+    election_date: str = "h.election_date"
+) -> str:
+    """
+    export_walking_list Returns SQL string to read voters with the date each last voted, for walking lists
+
+    :param list[str] columns: The Voters columns to read
+    :param list[str] conditions: Prepared conditions on the Voters table, aliased v, all of which must hold
+    :param list[str] order: The Voters columns to sort by
+    :param str histories: The Histories table, aliased h, joined to any table holding its election dates
+    :param str election_date: The election date column of histories
+    :return: SQL String
+    :rtype: str
+    """
+    return f"""SELECT
+        {", ".join(f"v.{column}" for column in columns)},
+        (SELECT
+            MAX({election_date})
+        FROM
+            {histories}
+        WHERE
+            h.county_code = v.county_code
+            AND h.voter_id = v.voter_id) AS last_voted
+    FROM
+        Voters v
+    WHERE
+        {" AND ".join(conditions) if len(conditions) > 0 else "1 = 1"}
+    ORDER BY
+        {", ".join(f"v.{column}" for column in order)};"""
+
+
+def voted_since(histories: str = "Histories h", election_date: str = "h.election_date") -> str:
+    """
+    voted_since Returns the prepared condition that a voter, aliased v, voted on or after a date
+
+    :param str histories: The Histories table, aliased h, joined to any table holding its election dates
+    :param str election_date: The election date column of histories
+    :return: SQL String
+    :rtype: str
+    """
+    return f"""EXISTS (SELECT
+            1
+        FROM
+            {histories}
+        WHERE
+            h.county_code = v.county_code
+            AND h.voter_id = v.voter_id
+            AND {election_date} >= %s)"""
+
+
+def create_elections_table() -> str:
+    """
+    create_elections_table Returns SQL string to create the Elections dimension table
+
+    :return: SQL String
+    :rtype: str
+    """
+    return """CREATE TABLE IF NOT EXISTS `Elections` (
+          `election_id` smallint(5) unsigned NOT NULL AUTO_INCREMENT,
+          `election_date` date NOT NULL,
+          `election_type` varchar(230) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
+          PRIMARY KEY (`election_id`),
+          UNIQUE KEY `election` (`election_date`,`election_type`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8 COLLATE=utf8_unicode_ci;
+    """
+
+
+def get_elections() -> str:
+    """
+    get_elections Returns SQL string to read every election
+
+    :return: SQL String
+    :rtype: str
+    """
+    return """SELECT
+        election_id,
+        election_date,
+        election_type
+    FROM
+        Elections;"""
+
+
+def get_election() -> str:
+    """
+    get_election Returns SQL string to read the id of an election
+
+    :return: SQL String
+    :rtype: str
+    """
+    return """SELECT
+        election_id
+    FROM
+        Elections
+    WHERE
+        election_date = %s
+        AND election_type = %s;"""
+
+
+def set_election() -> str:
+    """
+    set_election Returns SQL string to add an election unless it already exists
+
+    :return: SQL String
+    :rtype: str
+    """
+    return """INSERT IGNORE
+        INTO
+        Elections
+    (election_date,
+        election_type)
+    VALUES(%s,
+        %s);"""
+
+
+def create_turnout_table(table: str = "VoterTurnout", size: int = 8192) -> str:
+    """
+    create_turnout_table Returns SQL string to create the table of voter turnout bitsets, where bit n of byte
+    election_id DIV 8 is set, n being election_id MOD 8, when the voter voted in that election
+
+    :param str table: The name of the table
+    :param int size: The largest bitset in bytes, 8192 holding every smallint unsigned election id
+    :return: SQL String
+    :rtype: str
+    """
+    return f"""CREATE TABLE IF NOT EXISTS `{table}` (
+          `county_code` varchar(3) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
+          `voter_id` bigint(18) unsigned NOT NULL DEFAULT 0,
+          `turnout` varbinary({size}) NOT NULL DEFAULT '',
+          PRIMARY KEY (`county_code`,`voter_id`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8 COLLATE=utf8_unicode_ci;
+    """
+
+
+def set_turnout(table: str = "VoterTurnout") -> str:
+    """
+    set_turnout Returns SQL string to set one byte of the turnout bitset of a voter. The value is the byte at the
+    end of as many zero bytes as precede it, ORed into the stored bitset in the same statement, so importers
+    writing the same voter side by side keep each other's elections
+
+    :param str table: The name of the table
+    :return: SQL String
+    :rtype: str
+    """
+    return f"""INSERT
+        INTO
+        `{table}`
+    (county_code,
+        voter_id,
+        turnout)
+    VALUES(%s,
+        %s,
+        %s)
+    ON DUPLICATE KEY UPDATE `turnout` = CONCAT(
+        RPAD(SUBSTRING(`turnout`, 1, LENGTH(VALUES(`turnout`)) - 1), LENGTH(VALUES(`turnout`)) - 1, X'00'),
+        CHAR(
+            ASCII(SUBSTRING(`turnout`, LENGTH(VALUES(`turnout`)), 1))
+            | ASCII(SUBSTRING(VALUES(`turnout`), LENGTH(VALUES(`turnout`)), 1))
+        ),
+        SUBSTRING(`turnout`, LENGTH(VALUES(`turnout`)) + 1)
+    );"""
+
+
+def voted_in(election_id: int) -> str:
+    """
+    voted_in Returns the condition that the turnout bitset of a VoterTurnout row, aliased t, has an election set
+
+    :param int election_id: The id of the election
+    :return: SQL String
+    :rtype: str
+    """
+    return f"(ASCII(SUBSTRING(t.turnout, {election_id // 8 + 1}, 1)) & {1 << election_id % 8}) > 0"
+
+
+def create_parties_table() -> str:
+    """
+    create_parties_table Returns SQL string to create the Parties dimension table
+
+    :return: SQL String
+    :rtype: str
+    """
+    return """CREATE TABLE IF NOT EXISTS `Parties` (
+          `party_id` smallint(5) unsigned NOT NULL AUTO_INCREMENT,
+          `party_code` char(3) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
+          `party_name` varchar(60) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
+          PRIMARY KEY (`party_id`),
+          UNIQUE KEY `party` (`party_code`,`party_name`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8 COLLATE=utf8_unicode_ci;
+    """
+
+
+def get_parties() -> str:
+    """
+    get_parties Returns SQL string to read every party
+
+    :return: SQL String
+    :rtype: str
+    """
+    return """SELECT
+        party_id,
+        party_code,
+        party_name
+    FROM
+        Parties;"""
+
+
+def get_party() -> str:
+    """
+    get_party Returns SQL string to read the id of a party
+
+    :return: SQL String
+    :rtype: str
+    """
+    return """SELECT
+        party_id
+    FROM
+        Parties
+    WHERE
+        party_code = %s
+        AND party_name = %s;"""
+
+
+def set_party() -> str:
+    """
+    set_party Returns SQL string to add a party unless it already exists
+
+    :return: SQL String
+    :rtype: str
+    """
+    return """INSERT IGNORE
+        INTO
+        Parties
+    (party_code,
+        party_name)
+    VALUES(%s,
+        %s);"""
+
+
+def create_precincts_table() -> str:
+    """
+    create_precincts_table Returns SQL string to create the Precincts dimension table
+
+    :return: SQL String
+    :rtype: str
+    """
+    return """CREATE TABLE IF NOT EXISTS `Precincts` (
+          `precinct_id` mediumint(8) unsigned NOT NULL AUTO_INCREMENT,
+          `county_code` char(3) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
+          `precinct_code` varchar(6) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
+          `precinct_name` varchar(60) COLLATE utf8_unicode_ci NOT NULL DEFAULT '',
+          PRIMARY KEY (`precinct_id`),
+          UNIQUE KEY `precinct` (`county_code`,`precinct_code`,`precinct_name`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8 COLLATE=utf8_unicode_ci;
+    """
+
+
+def get_precincts() -> str:
+    """
+    get_precincts Returns SQL string to read every precinct
+
+    :return: SQL String
+    :rtype: str
+    """
+    return """SELECT
+        precinct_id,
+        county_code,
+        precinct_code,
+        precinct_name
+    FROM
+        Precincts;"""
+
+
+def get_precinct() -> str:
+    """
+    get_precinct Returns SQL string to read the id of a precinct
+
+    :return: SQL String
+    :rtype: str
+    """
+    return """SELECT
+        precinct_id
+    FROM
+        Precincts
+    WHERE
+        county_code = %s
+        AND precinct_code = %s
+        AND precinct_name = %s;"""
+
+
+def set_precinct() -> str:
+    """
+    set_precinct Returns SQL string to add a precinct unless it already exists
+
+    :return: SQL String
+    :rtype: str
+    """
+    return """INSERT IGNORE
+        INTO
+        Precincts
+    (county_code,
+        precinct_code,
+        precinct_name)
+    VALUES(%s,
+        %s,
+        %s);"""
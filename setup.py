@@ -29,5 +29,8 @@
         "sphinx==7.0.1",
         "nose==1.3.7",
         "pyinstaller==5.11.0"
-    ]
+    ],
+    extras_require={
+        "snapshots": ["pyarrow>=12"]
+    }
 )
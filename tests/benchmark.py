@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+
+# Times each import stage against synthetic Zip files, run with: python -m tests.benchmark --rows 100000
+# Times launching the command line tool instead, run with: python -m tests.benchmark --startup 20
+
+import argparse
+import concurrent.futures
+import csv
+import datetime
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from .context import Import
+from .context import Warehouse
+from . import synthetic
+
+import Import.Florida
+import Import.Georgia
+import Import.NorthCarolina
+import Warehouse.Florida
+import Warehouse.Georgia
+import Warehouse.NorthCarolina
+
+# Libraries the command line tool should not load before it knows the action
+__startup_libraries__ = ["yaml", "pymysql", "sqlite3", "Import.State", "Warehouse.State"]
+__startup_commands__ = [["--version"], ["--help"]]
+__script__ = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "voterwarehouse.py")
+
+__cases__ = [
+    ("Florida", "voters"),
+    ("Florida", "histories"),
+    ("Georgia", "histories"),
+    ("NorthCarolina", "voters"),
+    ("NorthCarolina", "histories")
+]
+
+
+class NullWarehouse:
+    """Stands in for a Warehouse.State instance and discards every batch, isolating the import side."""
+
+    load_mode = "executemany"
+    pool_size = 1
+    poolable = True
+    commit_seconds = 0.0
+    import_tables = {"voters": {"table": "Voters"}, "histories": {"table": "Histories"}}
+
+    def __init__(self, batch_limits: dict):
+        self.batch_limits = batch_limits
+
+    def init_schema(self):
+        pass
+
+    def get_statement_limit(self):
+        return None
+
+    def write_sql(self, t, prepared_sql):
+        return prepared_sql
+
+    def executemany_prepared_sql(self, prepared_sql, prepared_list, checkpoint=None):
+        pass
+
+    def clear_progress(self, archive_sha):
+        pass
+
+    def set_progress(self, archive_sha, member, rows_committed, completed):
+        pass
+
+    def clear_fingerprints(self, counties=None):
+        pass
+
+    def delete_voters(self, t, keys):
+        pass
+
+    def set_turnout(self, votes, staging=False):
+        pass
+
+    def intern_dimensions(self, t, fields, data):
+        return data
+
+    def add_partitions(self, t, table, fields, data):
+        pass
+
+
+def peak_rss() -> int | None:
+    """
+    peak_rss Returns the peak resident set size of this process in kilobytes, where the platform reports it
+
+    :return: Peak RSS in kilobytes or None
+    :rtype: int | None
+    """
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def time_stages(importer, file: str, t: str) -> dict[str, float]:
+    """
+    time_stages Times reading, decoding and parsing every member of a Zip file, one stage at a time
+
+    :param importer: The Import.State subclass reading the file
+    :param str file: The full path to the Zip file
+    :param str t: String representing the type of file
+    :return: Seconds spent in each stage
+    :rtype: dict[str, float]
+    """
+    stages = {"decompress": 0.0, "decode": 0.0, "parse": 0.0}
+    state = importer(NullWarehouse({}))
+    with zipfile.ZipFile(file, "r") as archive:
+        for info in archive.infolist():
+            export_date = datetime.datetime(*info.date_time).strftime("%Y-%m-%d")
+            start = time.perf_counter()
+            raw = archive.read(info.filename)
+            stages["decompress"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            lines = io.TextIOWrapper(io.BytesIO(raw), **state.text_options)
+            header = state.read_header(lines, t)
+            rows = [row for row in csv.reader(lines, **state.csv_options) if len(row) > 0]
+            stages["decode"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            parse = getattr(state, state.valid_import_types[t]["parse"])(header, export_date)
+            for row in rows:
+                parse(row)
+            stages["parse"] += time.perf_counter() - start
+    return stages
+
+
+def loaded_modules(arguments: list[str]) -> set[str]:
+    """
+    loaded_modules Returns the modules the command line tool imports when run with some arguments
+
+    :param list[str] arguments: The command line arguments
+    :return: The names of the modules imported
+    :rtype: set[str]
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", __script__] + arguments,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    return {
+        line.rsplit("|", 1)[1].strip() for line in result.stderr.splitlines() if line.startswith("import time:")
+    }
+
+
+def time_startup(command: list[str], runs: int) -> dict:
+    """
+    time_startup Times launching a command until it exits over several runs
+
+    :param list[str] command: The command and its arguments
+    :param int runs: The number of launches
+    :return: The fastest and median seconds of the launches
+    :rtype: dict
+    """
+    timings = []
+    for run in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return {"command": " ".join(command), "runs": runs, "fastest": min(timings), "median": statistics.median(timings)}
+
+
+def run_startup(runs: int, binary: str | None, as_json: bool) -> None:
+    """
+    run_startup Times launching the command line tool, or its built binary, and lists the libraries it loads early
+
+    :param int runs: The number of launches per command
+    :param str | None binary: Path to the built binary, the script is run with this interpreter when not given
+    :param bool as_json: Print one JSON object per command
+    :return: None
+    """
+    for arguments in __startup_commands__:
+        result = time_startup(([binary] if binary else [sys.executable, __script__]) + arguments, runs)
+        modules = loaded_modules(arguments)
+        result["libraries"] = [library for library in __startup_libraries__ if library in modules]
+        if as_json:
+            print(json.dumps(result))
+            continue
+        print(
+            f"{result['command']}: fastest {result['fastest'] * 1000:.1f}ms, median {result['median'] * 1000:.1f}ms "
+            f"over {runs} runs, early libraries: {', '.join(result['libraries']) or 'none'}"
+        )
+
+
+def run_case(state: str, t: str, rows: int, members: int, directory: str, config: str | None, options: dict) -> dict:
+    """
+    run_case Generates one synthetic Zip file and benchmarks its stages and full import
+
+    :param str state: The state name
+    :param str t: String representing the type of file
+    :param int rows: The number of rows to generate
+    :param int members: The number of archive members to generate
+    :param str directory: Directory receiving the generated Zip file
+    :param str | None config: Optional YAML config file, writes go to that database when given
+    :param dict options: Keyword arguments passed on to import_source
+    :return: The measurements of the case
+    :rtype: dict
+    """
+    file = os.path.join(directory, f"{state}_{t}_{rows}.zip")
+    if not os.path.exists(file):
+        synthetic.write_archive(state, t, file, rows, members)
+    importer = getattr(getattr(Import, state), state)
+    result = {
+        "state": state,
+        "type": t,
+        "rows": rows,
+        "bytes": sum(info.file_size for info in zipfile.ZipFile(file).infolist()),
+        "stages": time_stages(importer, file, t)
+    }
+    start = time.perf_counter()
+    if config is None:
+        with importer(NullWarehouse({"voters": 5000, "histories": 5000})) as source:
+            source.import_source(file, t, **options)
+        result["sink"] = "null"
+    else:
+        with getattr(getattr(Warehouse, state), state)(config) as db:
+            with importer(db) as source:
+                source.import_source(file, t, **options)
+        result["sink"] = "database"
+    result["seconds"] = time.perf_counter() - start
+    result["rows_per_second"] = rows / result["seconds"] if result["seconds"] > 0 else None
+    result["bytes_per_second"] = result["bytes"] / result["seconds"] if result["seconds"] > 0 else None
+    result["peak_rss_kb"] = peak_rss()
+    return result
+
+
+def main() -> None:
+    """
+    main Runs each benchmark case in a fresh process, so peak memory is reported per case
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Benchmark imports against synthetic Zip files")
+    parser.add_argument("--rows", type=int, default=100000, help="Rows generated per Zip file")
+    parser.add_argument("--members", type=int, default=4, help="Members generated per Zip file")
+    parser.add_argument("--states", nargs="+", default=None, help="States to benchmark, defaults to all")
+    parser.add_argument("--config", default=None, help="YAML config file, times database writes when given")
+    parser.add_argument("--directory", default=None, help="Keep generated Zip files in this directory")
+    parser.add_argument("--workers", type=int, default=1, help="Parse workers passed to import_source")
+    parser.add_argument("--json", action="store_true", help="Print one JSON object per case")
+    parser.add_argument("--startup", type=int, default=0, help="Time this many launches of the tool instead")
+    parser.add_argument("--binary", default=None, help="Built binary launched by --startup instead of the script")
+    args = parser.parse_args()
+
+    if args.startup > 0:
+        run_startup(args.startup, args.binary, args.json)
+        return
+
+    cases = [case for case in __cases__ if args.states is None or case[0] in args.states]
+    with tempfile.TemporaryDirectory() as scratch:
+        directory = args.directory or scratch
+        for state, t in cases:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+                result = executor.submit(
+                    run_case, state, t, args.rows, args.members, directory, args.config, {"workers": args.workers}
+                ).result()
+            if args.json:
+                print(json.dumps(result))
+                continue
+            stages = ", ".join(f"{k} {v:.3f}s" for k, v in result["stages"].items())
+            print(
+                f"{state} {t}: {result['rows']} rows in {result['seconds']:.3f}s to {result['sink']}, "
+                f"{result['rows_per_second']:,.0f} rows/s, {result['bytes_per_second'] / 1048576:,.1f} MiB/s, "
+                f"peak RSS {result['peak_rss_kb']} KiB ({stages})"
+            )
+
+
+if __name__ == '__main__':
+    main()
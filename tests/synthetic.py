@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+# Writes synthetic voter and voter history Zip files laid out like the ones each state publishes
+
+import datetime
+import io
+import random
+import zipfile
+
+from Import.FloridaCodes import __history_import_map__ as __florida_history_import_map__
+from Import.FloridaCodes import __voter_import_map__ as __florida_voter_import_map__
+from Import.GeorgiaCodes import __counties__ as __georgia_counties__
+from Import.GeorgiaCodes import __election_types__ as __georgia_election_types__
+from Import.GeorgiaCodes import __history_import_map__ as __georgia_history_import_map__
+from Import.GeorgiaCodes import __parties__ as __georgia_parties__
+from Import.NorthCarolinaCodes import __counties__ as __north_carolina_counties__
+from Import.NorthCarolinaCodes import __history_import_map__ as __north_carolina_history_import_map__
+from Import.NorthCarolinaCodes import __voter_import_map__ as __north_carolina_voter_import_map__
+
+__florida_counties__ = [
+    "ALA", "BAK", "BAY", "BRA", "BRE", "BRO", "CAL", "CHA", "CIT", "CLA", "CLL", "CLM", "DAD", "DES", "DIX", "DUV",
+    "ESC", "FLA", "FRA", "GAD", "GIL", "GLA", "GUL", "HAM", "HAR", "HEN", "HER", "HIG", "HIL", "HOL", "IND", "JAC",
+    "JEF", "LAF", "LAK", "LEE", "LEO", "LEV", "LIB", "MAD", "MAN", "MRN", "MRT", "MON", "NAS", "OKA", "OKE", "ORA",
+    "OSC", "PAL", "PAS", "PIN", "POL", "PUT", "SAN", "SAR", "SEM", "STJ", "STL", "SUM", "SUW", "TAY", "UNI", "VOL",
+    "WAK", "WAL", "WAS"
+]
+__last_names__ = ["SMITH", "JOHNSON", "WILLIAMS", "BROWN", "JONES", "GARCIA", "MILLER", "DAVIS", "RODRIGUEZ", "LEE"]
+__first_names__ = ["JAMES", "MARY", "ROBERT", "PATRICIA", "JOHN", "JENNIFER", "MICHAEL", "LINDA", "DAVID", "MARIA"]
+__cities__ = ["SPRINGFIELD", "RIVERSIDE", "FRANKLIN", "GREENVILLE", "BRISTOL", "CLINTON", "FAIRVIEW", "SALEM"]
+__streets__ = ["MAIN ST", "OAK AVE", "PINE RD", "MAPLE DR", "CEDAR LN", "ELM ST", "LAKE BLVD", "HILL CT"]
+__election_dates__ = ["11/08/2016", "11/06/2018", "03/17/2020", "11/03/2020", "08/23/2022", "11/08/2022"]
+
+
+def random_date(generator: random.Random, start_year: int, end_year: int) -> str:
+    """
+    random_date Returns a random MM/DD/YYYY date
+
+    :param random.Random generator: The random number generator
+    :param int start_year: The earliest year
+    :param int end_year: The latest year
+    :return: The date string
+    :rtype: str
+    """
+    day = datetime.date(start_year, 1, 1) + datetime.timedelta(
+        days=generator.randrange((datetime.date(end_year, 12, 31) - datetime.date(start_year, 1, 1)).days)
+    )
+    return day.strftime("%m/%d/%Y")
+
+
+def field_value(generator: random.Random, field: str, county: str, voter_id: int) -> str:
+    """
+    field_value Returns a plausible raw value for a column of a voter or history file
+
+    :param random.Random generator: The random number generator
+    :param str field: The target field name from the import map
+    :param str county: The county code or name of the record
+    :param int voter_id: The voter id of the record
+    :return: The raw value
+    :rtype: str
+    """
+    if field in ["county_code", "voted_county_code"]:
+        return county
+    if field == "voter_id":
+        return str(voter_id)
+    if field == "birth_date":
+        return random_date(generator, 1930, 2004)
+    if field == "registration_date":
+        return random_date(generator, 1970, 2022)
+    if field == "election_date":
+        return generator.choice(__election_dates__)
+    if field == "name_last":
+        return generator.choice(__last_names__)
+    if field in ["name_first", "name_middle"]:
+        return generator.choice(__first_names__)
+    if field.endswith("city"):
+        return generator.choice(__cities__)
+    if field in ["residence_address_line_1", "residence_address", "mailing_address_line_1"]:
+        return f"{generator.randrange(1, 9999)} {generator.choice(__streets__)}"
+    if field.endswith("zipcode"):
+        return f"{generator.randrange(10000, 99999)}"
+    if field.endswith("state"):
+        return "FL"
+    if field in ["race", "birth_year", "age_at_year_end"]:
+        return str(generator.randrange(1, 9))
+    if field in ["gender", "gender_code"]:
+        return generator.choice(["M", "F", "U"])
+    if field == "email_address":
+        return f"voter{voter_id}@example.com" if generator.random() < 0.3 else ""
+    if field == "daytime_phone_number":
+        return f"{generator.randrange(1000000, 9999999)}"
+    if field.endswith("_desc") or field.endswith("_name") or field == "election_type":
+        return generator.choice(["GENERAL", "PRIMARY", "MUNICIPAL", "SPECIAL"])
+    if field in ["suppress_address", "confidential", "drivers_lic", "history_code"]:
+        return generator.choice(["N", "Y"])
+    return generator.choice(["A", "B", "C", "1", "2", "3", ""])
+
+
+def florida_rows(generator: random.Random, t: str, county: str, first_id: int, rows: int) -> list[list[str]]:
+    """
+    florida_rows Returns rows of a Florida county file, which has no header row
+
+    :param random.Random generator: The random number generator
+    :param str t: String representing the type of file
+    :param str county: The county code of the file
+    :param int first_id: The first voter id
+    :param int rows: The number of rows
+    :return: The rows
+    :rtype: list[list[str]]
+    """
+    fields = __florida_voter_import_map__ if t == "voters" else __florida_history_import_map__
+    return [
+        [field_value(generator, field, county, voter_id) for field in fields]
+        for voter_id in range(first_id, first_id + rows)
+    ]
+
+
+def north_carolina_rows(generator: random.Random, t: str, first_id: int, rows: int) -> list[list[str]]:
+    """
+    north_carolina_rows Returns the header and rows of a North Carolina statewide file
+
+    :param random.Random generator: The random number generator
+    :param str t: String representing the type of file
+    :param int first_id: The first voter id
+    :param int rows: The number of rows
+    :return: The header followed by the rows
+    :rtype: list[list[str]]
+    """
+    import_map = __north_carolina_voter_import_map__ if t == "voters" else __north_carolina_history_import_map__
+    header = [v[0] if len(v) > 0 else k for k, v in import_map.items()]
+    counties = [k for k in __north_carolina_counties__.keys() if k != "999"]
+    data = []
+    for voter_id in range(first_id, first_id + rows):
+        county = generator.choice(counties)
+        data.append([field_value(generator, field, county, voter_id) for field in import_map])
+    return [header] + data
+
+
+def georgia_rows(generator: random.Random, first_id: int, rows: int) -> list[list[str]]:
+    """
+    georgia_rows Returns the header and rows of a Georgia history file
+
+    :param random.Random generator: The random number generator
+    :param int first_id: The first voter id
+    :param int rows: The number of rows
+    :return: The header followed by the rows
+    :rtype: list[list[str]]
+    """
+    header = [v[0] for v in __georgia_history_import_map__.values()]
+    counties = [v for v in __georgia_counties__.values() if v != "UNKNOWN"]
+    data = []
+    for voter_id in range(first_id, first_id + rows):
+        data.append([
+            generator.choice(counties),
+            str(voter_id),
+            generator.choice(__election_dates__),
+            generator.choice(list(__georgia_election_types__.values())),
+            generator.choice(list(__georgia_parties__.values()) + [""]),
+            generator.choice(["STD", "ABS", ""]),
+            generator.choice(["Y", "N"]),
+            generator.choice(["Y", "N"]),
+            generator.choice(["Y", "N"])
+        ])
+    return [header] + data
+
+
+def write_archive(state: str, t: str, file: str, rows: int, members: int = 1, seed: int = 0) -> None:
+    """
+    write_archive Writes a synthetic voter or history Zip file in the layout published by a state
+
+    :param str state: The state name, one of Warehouse.ImplementedStates
+    :param str t: String representing the type of file, voters or histories
+    :param str file: The full path of the Zip file to write
+    :param int rows: The total number of rows across all members
+    :param int members: The number of files in the archive, one per county for Florida
+    :param int seed: Seed for reproducible contents
+    :return: None
+    """
+    generator = random.Random(seed)
+    with zipfile.ZipFile(file, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for member in range(members):
+            first_id = 100000000 + member * rows
+            count = rows // members + (1 if member < rows % members else 0)
+            match state:
+                case "Florida":
+                    county = __florida_counties__[member % len(__florida_counties__)]
+                    name = f"{county}_{'H' if t == 'histories' else ''}20230501.txt"
+                    data, delimiter, newline = florida_rows(generator, t, county, first_id, count), "\t", "\r\n"
+                case "Georgia":
+                    name = f"georgia_history_{member + 1}.csv"
+                    data, delimiter, newline = georgia_rows(generator, first_id, count), ",", "\n"
+                case "NorthCarolina":
+                    name = f"ncv{'his' if t == 'histories' else 'oter'}_{member + 1}.txt"
+                    data, delimiter, newline = north_carolina_rows(generator, t, first_id, count), "\t", "\r\n"
+                case _:
+                    raise ValueError(f"Usage: State {state} is not implemented")
+            text = io.StringIO()
+            for row in data:
+                text.write(delimiter.join(row))
+                text.write(newline)
+            archive.writestr(name, text.getvalue())
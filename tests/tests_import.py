@@ -2,7 +2,23 @@
 
 from .context import Import
 
+import importlib.util
+import json
+import os
+import tempfile
 import unittest
+import zipfile
+
+import Import.Batching
+import Import.Fingerprints
+import Import.Florida
+import Import.Georgia
+import Import.NorthCarolina
+import Import.Snapshot
+import Import.State
+from Import.FloridaCodes import __voter_import_map__ as __florida_voter_import_map__
+from Import.NorthCarolinaCodes import __history_import_map__ as __north_carolina_history_import_map__
+from . import synthetic
 
 
 class BasicTestSuite(unittest.TestCase):
@@ -12,6 +28,465 @@ def test_absolute_truth_and_meaning(self):
         assert True
 
 
+class ParserTestSuite(unittest.TestCase):
+    """Compiled row parser test cases."""
+
+    def test_florida_voter_parser(self):
+        header = list(__florida_voter_import_map__.keys())
+        row = {k: '' for k in header}
+        row.update({
+            "county_code": "ALA",
+            "voter_id": " 123456789 ",
+            "name_last": "*",
+            "birth_date": "01/31/1970",
+            "registration_date": "*",
+            "email_address": "Voter@Example.COM"
+        })
+        parsed = Import.Florida.Florida.compile_voter_parser(header, "2023-05-01")(list(row.values()))
+        self.assertEqual(len(parsed), len(header) + 1)
+        self.assertEqual(parsed[header.index("voter_id")], "123456789")
+        self.assertEqual(parsed[header.index("name_last")], "")
+        self.assertEqual(parsed[header.index("birth_date")], "1970-01-31")
+        self.assertIsNone(parsed[header.index("registration_date")])
+        self.assertEqual(parsed[header.index("email_address")], "voter@example.com")
+        self.assertIsNone(parsed[header.index("race")])
+        self.assertEqual(parsed[-1], "2023-05-01")
+
+    def test_dates_are_converted_once(self):
+        format_date = Import.State.State.format_date
+        format_date.cache_clear()
+        self.assertEqual([format_date("11/08/2022") for i in range(3)], ["2022-11-08"] * 3)
+        self.assertEqual(format_date.cache_info().misses, 1)
+        self.assertIsNone(format_date("*"))
+        with self.assertRaises(ValueError):
+            format_date("02/30/2022")
+
+    def test_north_carolina_history_parser_resolves_aliases(self):
+        header = ["voter_reg_num", "county_id", "election_lbl", "election_desc", "ignored"]
+        parse = Import.NorthCarolina.NorthCarolina.compile_history_parser(header, "2023-05-01")
+        parsed = parse(["42", "1", "11/08/2022", "11/08/2022 GENERAL", "x"])
+        fields = list(__north_carolina_history_import_map__.keys())
+        self.assertEqual(len(parsed), len(fields))
+        self.assertEqual(parsed[fields.index("county_code")], "1")
+        self.assertEqual(parsed[fields.index("voter_id")], "42")
+        self.assertEqual(parsed[fields.index("election_date")], "2022-11-08")
+        self.assertEqual(parsed[fields.index("election_type")], "11/08/2022 GENERAL")
+        self.assertEqual(parsed[fields.index("party_code")], "")
+
+    def test_georgia_history_parser(self):
+        header = [
+            "County Name", "Voter Registration Number", "Election Date", "Election Type", "Party",
+            "Ballot Style", "Absentee", "Provisional", "Supplemental"
+        ]
+        parse = Import.Georgia.Georgia.compile_history_parser(header, "2023-05-01")
+        parsed = parse(["BEN HILL", "", "11/08/2022", "GENERAL", "Republican", "STD", "Y", "N", ""])
+        self.assertEqual(parsed, ("009", 0, "2022-11-08", "003", "R", "STD", 1, 0, 0))
+
+    def test_georgia_code_lookups(self):
+        georgia = Import.Georgia.Georgia
+        self.assertEqual(georgia.get_county_code("Ben Hill"), "009")
+        self.assertEqual(georgia.get_county_code("Atlantis"), "999")
+        self.assertEqual(georgia.get_party_code("Non-Partisan"), "NP")
+        self.assertEqual(georgia.get_party_code("non"), "NP")
+        self.assertEqual(georgia.get_party_code("Dem"), "D")
+        self.assertEqual(georgia.get_party_code(" "), "")
+        self.assertEqual(georgia.get_election_type(""), "999")
+        with self.assertRaises(ValueError):
+            georgia.get_party_code("Whig")
+
+
+class RecordingWarehouse:
+    """Stands in for a Warehouse.State instance and records the batches it is sent."""
+
+    def __init__(self, batch_limit: int = 2, **batch):
+        self.batch_limits = {"voters": batch_limit, "histories": batch_limit, **batch}
+        self.load_mode = "executemany"
+        self.pool_size = 1
+        self.poolable = True
+        self.commit_seconds = 0.0
+        self.statement_limit = None
+        self.import_tables = {"voters": {"table": "Voters"}, "histories": {"table": "Histories"}}
+        self.batches = []
+        self.tables = set()
+        self.staged = []
+        self.fingerprints = {}
+        self.deleted = []
+        self.progress = {}
+        self.votes = []
+
+    def init_schema(self):
+        pass
+
+    def executemany_prepared_sql(self, prepared_sql, prepared_list, checkpoint=None):
+        if "VoterFingerprints" in prepared_sql:
+            self.fingerprints.update({(county, voter_id): value for county, voter_id, value in prepared_list})
+            return
+        self.batches.append(list(prepared_list))
+        self.tables.add(prepared_sql.split("`")[1])
+        if checkpoint is not None:
+            archive_sha, member, rows_committed, completed = checkpoint[1]
+            self.progress[member] = (rows_committed, bool(completed))
+
+    def get_progress(self, archive_sha):
+        return dict(self.progress)
+
+    def clear_progress(self, archive_sha):
+        self.progress = {}
+
+    def set_progress(self, archive_sha, member, rows_committed, completed):
+        self.progress[member] = (rows_committed, completed)
+
+    def get_fingerprints(self):
+        return [(county, voter_id) + (value,) for (county, voter_id), value in self.fingerprints.items()]
+
+    def get_statement_limit(self):
+        return self.statement_limit
+
+    def write_sql(self, t, prepared_sql):
+        return prepared_sql
+
+    def set_turnout(self, votes, staging=False):
+        self.votes.extend(votes)
+
+    def intern_dimensions(self, t, fields, data):
+        return data
+
+    def add_partitions(self, t, table, fields, data):
+        pass
+
+    def clear_fingerprints(self, counties=None):
+        self.fingerprints = {k: v for k, v in self.fingerprints.items() if counties and k[0] not in counties}
+
+    def delete_voters(self, t, keys):
+        self.deleted.extend(keys)
+
+    def begin_staging(self, t, resume=False):
+        self.staged.append(("begin", t))
+        return f"{self.import_tables[t]['table']}_staging"
+
+    def finish_staging(self, t):
+        self.staged.append(("finish", t))
+
+    def begin_turnout_staging(self, resume=False):
+        self.staged.append(("begin", "turnout"))
+
+    def finish_turnout_staging(self):
+        self.staged.append(("finish", "turnout"))
+
+    def begin_fast_load(self, t):
+        self.staged.append(("begin_fast_load", t))
+        return True
+
+    def finish_fast_load(self, t):
+        self.staged.append(("finish_fast_load", t))
+
+
+class ConfiguredRecordingWarehouse(RecordingWarehouse):
+    """Opens like a Warehouse.State subclass from a config file, as the member worker processes do."""
+
+    def __init__(self, config_file, load_mode="executemany"):
+        super().__init__()
+        self.config_file = config_file
+        self.load_mode = load_mode
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+class ImportSourceTestSuite(unittest.TestCase):
+    """Import.State.import_source test cases."""
+
+    header = ["county_id", "voter_reg_num", "election_lbl", "election_desc"]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file = os.path.join(self.directory.name, "ncvhis.zip")
+        lines = ["\t".join(self.header)] + [
+            "\t".join(["1", str(voter_id), "11/08/2022", "GENERAL"]) for voter_id in range(7)
+        ]
+        with zipfile.ZipFile(self.file, "w") as archive:
+            archive.writestr("ncvhis1.txt", "\r\n".join(lines) + "\r\n")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def import_rows(self, batch: dict | None = None, **kwargs):
+        db = RecordingWarehouse(**(batch or {}))
+        with Import.NorthCarolina.NorthCarolina(db) as state:
+            state.import_source(self.file, "histories", **kwargs)
+        return db
+
+    def test_serial_import_keeps_every_row(self):
+        db = self.import_rows()
+        self.assertEqual([len(batch) for batch in db.batches], [2, 2, 2, 1])
+        self.assertEqual([row[2] for batch in db.batches for row in batch], [str(i) for i in range(7)])
+
+    def test_parallel_import_matches_serial(self):
+        self.assertEqual(self.import_rows(workers=2).batches, self.import_rows().batches)
+
+    def test_pipelined_import_matches_serial(self):
+        self.assertEqual(self.import_rows({"queue_depth": 1}).batches, self.import_rows().batches)
+
+    def test_staging_import_writes_to_the_staging_table(self):
+        db = self.import_rows(staging=True)
+        self.assertEqual(db.tables, {"Histories_staging"})
+        self.assertEqual(db.staged, [
+            ("begin", "histories"), ("begin", "turnout"), ("finish", "histories"), ("finish", "turnout")
+        ])
+
+    def test_fast_load_builds_indexes_after_the_import(self):
+        db = self.import_rows(fast_load=True)
+        self.assertEqual(db.tables, {"Histories"})
+        self.assertEqual(db.staged, [("begin_fast_load", "histories"), ("finish_fast_load", "histories")])
+        with self.assertRaises(ValueError):
+            Import.NorthCarolina.NorthCarolina(RecordingWarehouse()).import_source(
+                self.file, "histories", fast_load=True, resume=True
+            )
+
+    def test_metrics_are_written_per_member(self):
+        file = os.path.join(self.directory.name, "metrics.jsonl")
+        self.import_rows(metrics=file)
+        with open(file) as f:
+            record = json.loads(f.readline())
+        self.assertEqual((record["member"], record["rows"]), ("ncvhis1.txt", 7))
+        self.assertGreater(record["bytes"], 0)
+        self.assertEqual(list(record["stages"]), ["decompress", "decode", "parse", "db_wait", "commit"])
+        prometheus = os.path.join(self.directory.name, "voterwarehouse.prom")
+        self.import_rows(metrics=prometheus)
+        with open(prometheus) as f:
+            samples = f.read()
+        self.assertIn('voterwarehouse_import_rows{state="NorthCarolina",type="histories",archive="ncvhis.zip",'
+                      'member="ncvhis1.txt"} 7', samples)
+
+    def test_row_limit_reads_the_first_rows_of_each_member(self):
+        db = self.import_rows(row_limit=3)
+        self.assertEqual([row[2] for batch in db.batches for row in batch], ["0", "1", "2"])
+        self.assertEqual(db.progress, {})
+
+    def test_usage_errors_reach_the_caller(self):
+        with self.assertRaises(ValueError):
+            self.import_rows(row_limit=3, staging=True)
+        with self.assertRaises(ValueError):
+            self.import_rows(delta=True)
+
+    def test_member_workers_need_a_shared_database(self):
+        db = RecordingWarehouse()
+        db.poolable = False
+        with Import.NorthCarolina.NorthCarolina(db) as state:
+            with self.assertRaises(ValueError):
+                state.import_source(self.file, "histories", member_workers=2)
+        self.assertEqual(db.batches, [])
+
+    def test_batches_are_sized_by_the_packet_limit(self):
+        row = self.import_rows().batches[0][0]
+        db = RecordingWarehouse(bytes=1 << 20)
+        db.statement_limit = 3 * Import.Batching.BatchSizer.statement_bytes(row)
+        with Import.NorthCarolina.NorthCarolina(db) as state:
+            state.import_source(self.file, "histories")
+        self.assertEqual([len(batch) for batch in db.batches], [2, 3, 2])
+
+    def test_checkpoints_record_committed_rows(self):
+        db = self.import_rows()
+        self.assertEqual(db.progress, {"ncvhis1.txt": (7, True), "": (0, True)})
+
+    def test_resume_skips_committed_rows(self):
+        db = RecordingWarehouse()
+        db.progress = {"ncvhis1.txt": (4, False)}
+        with Import.NorthCarolina.NorthCarolina(db) as state:
+            state.import_source(self.file, "histories", resume=True)
+        self.assertEqual([row[2] for batch in db.batches for row in batch], ["4", "5", "6"])
+        self.assertEqual(db.progress["ncvhis1.txt"], (7, True))
+
+    def test_resume_skips_imported_archives(self):
+        db = RecordingWarehouse()
+        db.progress = {"ncvhis1.txt": (7, True), "": (0, True)}
+        with Import.NorthCarolina.NorthCarolina(db) as state:
+            state.import_source(self.file, "histories", resume=True)
+        self.assertEqual(db.batches, [])
+
+    def test_parallel_members_are_totalled(self):
+        with zipfile.ZipFile(self.file, "a") as archive:
+            archive.writestr("ncvhis2.txt", archive.read("ncvhis1.txt"))
+        state = Import.NorthCarolina.NorthCarolina(ConfiguredRecordingWarehouse("config.yml"))
+        self.assertEqual(state.import_members_parallel(self.file, "histories", "Histories", "sha", {}, 2), 14)
+
+    def test_pipelined_parse_errors_reach_the_writer(self):
+        def batches():
+            yield [("1",)]
+            raise ValueError("bad row")
+        with self.assertRaises(ValueError):
+            list(Import.State.State.prefetch_batches(batches(), 1))
+
+
+class SyntheticArchiveTestSuite(unittest.TestCase):
+    """Synthetic archive generator test cases."""
+
+    def test_synthetic_archives_import(self):
+        cases = [("Florida", "voters"), ("Florida", "histories"), ("Georgia", "histories"),
+                 ("NorthCarolina", "voters"), ("NorthCarolina", "histories")]
+        with tempfile.TemporaryDirectory() as directory:
+            for state, t in cases:
+                file = os.path.join(directory, f"{state}_{t}.zip")
+                synthetic.write_archive(state, t, file, 5, members=2)
+                db = RecordingWarehouse(batch_limit=10)
+                with getattr(getattr(Import, state), state)(db) as importer:
+                    importer.import_source(file, t)
+                rows = [row for batch in db.batches for row in batch]
+                self.assertEqual(len(rows), 5, f"{state} {t}")
+
+
+@unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+class SnapshotTestSuite(unittest.TestCase):
+    """Arrow snapshot test cases."""
+
+    def test_snapshots_replay_the_parsed_rows(self):
+        cases = [("Florida", "voters"), ("Georgia", "histories"), ("NorthCarolina", "histories")]
+        with tempfile.TemporaryDirectory() as directory:
+            snapshots = os.path.join(directory, "snapshots")
+            for state, t in cases:
+                file = os.path.join(directory, f"{state}_{t}.zip")
+                synthetic.write_archive(state, t, file, 30, members=2)
+                importer = getattr(getattr(Import, state), state)
+                parsed = RecordingWarehouse(batch_limit=10)
+                importer(parsed).import_source(file, t, snapshots=snapshots)
+                replayed = RecordingWarehouse(batch_limit=10)
+                reader = importer(replayed)
+                # Failing the import if a member is parsed again instead of being read from its snapshot
+                reader.read_batches = None
+                reader.import_source(file, t, snapshots=snapshots)
+                self.assertEqual(replayed.batches, parsed.batches, f"{state} {t}")
+                sha = Import.State.State.archive_checksum(file)
+                self.assertEqual(len(os.listdir(os.path.join(snapshots, sha))), 2)
+            with self.assertRaises(ValueError):
+                importer(RecordingWarehouse()).import_source(file, t, snapshots=snapshots, row_limit=5)
+
+    def test_snapshots_keep_the_python_types_of_values(self):
+        batches = [
+            [("ALA", 0, "GENERAL", None, 1), ("BAY", "42", "PRIMARY", "IN PERSON", 0)],
+            [("BAY", "43", None, "MAIL", 1)]
+        ]
+        metadata = Import.Snapshot.snapshot_metadata("Georgia", "histories")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sha", "member.arrow")
+            fields = ["county", "voter_id", "type", "method", "absentee"]
+            writer = Import.Snapshot.SnapshotWriter(path, fields, metadata)
+            for batch in batches:
+                writer.write(batch)
+            writer.close()
+            replayed = list(Import.Snapshot.read_rows(Import.Snapshot.open_snapshot(path, metadata)))
+            self.assertEqual(replayed, batches)
+            self.assertEqual([type(value) for value in replayed[0][0]], [str, int, str, type(None), int])
+            # A later batch whose values would change type leaves no snapshot rather than a lossy one
+            writer = Import.Snapshot.SnapshotWriter(path + "2", ["county", "voter_id"], metadata)
+            writer.write([("ALA", "42")])
+            writer.write([("ALA", 0)])
+            writer.close()
+            self.assertEqual(os.listdir(os.path.dirname(path)), ["member.arrow"])
+
+
+class DeltaImportTestSuite(unittest.TestCase):
+    """Fingerprint based delta import test cases."""
+
+    header = ["county_id", "voter_reg_num", "last_name", "registr_dt"]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file = os.path.join(self.directory.name, "ncvoter.zip")
+        self.db = RecordingWarehouse(batch_limit=10)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def import_rows(self, rows, delta=True):
+        lines = ["\t".join(self.header)] + ["\t".join(row) for row in rows]
+        with zipfile.ZipFile(self.file, "w") as archive:
+            archive.writestr("ncvoter1.txt", "\r\n".join(lines) + "\r\n")
+        self.db.batches = []
+        with Import.NorthCarolina.NorthCarolina(self.db) as state:
+            state.import_source(self.file, "voters", delta=delta)
+        return [row[:2] for batch in self.db.batches for row in batch]
+
+    def test_only_changed_records_are_sent(self):
+        rows = [["1", str(voter_id), "SMITH", "01/01/2000"] for voter_id in range(3)]
+        self.assertEqual(self.import_rows(rows), [("0", "1"), ("1", "1"), ("2", "1")])
+        self.assertEqual(self.import_rows(rows), [])
+        rows[1][2] = "JONES"
+        self.assertEqual(self.import_rows(rows[:2]), [("1", "1")])
+        self.assertEqual(self.db.deleted, [("1", 2)])
+
+    def test_full_imports_clear_the_stored_fingerprints(self):
+        rows = [["1", str(voter_id), "SMITH", "01/01/2000"] for voter_id in range(3)]
+        self.import_rows(rows)
+        self.import_rows([["2", "0", "SMITH", "01/01/2000"]])
+        changed = [list(row) for row in rows]
+        changed[1][2] = "JONES"
+        self.assertEqual(len(self.import_rows(changed, delta=False)), 3)
+        # County 2 was not imported, so its fingerprints are kept
+        self.assertEqual(list(self.db.fingerprints), [("2", 0)])
+        self.assertEqual(self.import_rows(rows), [("0", "1"), ("1", "1"), ("2", "1")])
+
+    def test_staging_imports_clear_every_stored_fingerprint(self):
+        rows = [["1", "0", "SMITH", "01/01/2000"], ["2", "0", "SMITH", "01/01/2000"]]
+        self.import_rows(rows)
+        lines = ["\t".join(self.header), "\t".join(rows[0])]
+        with zipfile.ZipFile(self.file, "w") as archive:
+            archive.writestr("ncvoter1.txt", "\r\n".join(lines) + "\r\n")
+        with Import.NorthCarolina.NorthCarolina(self.db) as state:
+            state.import_source(self.file, "voters", staging=True)
+        self.assertEqual(self.db.fingerprints, {})
+
+    def test_fingerprint_index_sorts_and_marks_records(self):
+        index = Import.Fingerprints.FingerprintIndex([("1", 9, 90), ("1", 3, 30), ("2", 5, 50), ("1", 7, 70)])
+        self.assertEqual(len(index), 4)
+        self.assertEqual(list(index.voter_ids["1"]), [3, 7, 9])
+        self.assertEqual(index.see(("1", 9)), 90)
+        self.assertIsNone(index.see(("1", 4)))
+        self.assertIsNone(index.see(("3", 1)))
+        # County 2 was not imported, so its records are kept
+        self.assertEqual(index.missing(), [("1", 3), ("1", 7)])
+
+
+class BatchSizerTestSuite(unittest.TestCase):
+    """Import.Batching.BatchSizer test cases."""
+
+    narrow = [("1", "2022-11-08")] * 1000
+    wide = [tuple("x" * 20 for _ in range(60))] * 1000
+
+    def test_fixed_rows_without_adaptive_settings(self):
+        sizer = Import.Batching.BatchSizer.from_config({"voters": 5000}, "voters")
+        sizer.observe_rows(self.wide)
+        sizer.observe_write(5000, 60.0)
+        self.assertEqual(sizer.rows, 5000)
+
+    def test_wide_rows_get_smaller_batches(self):
+        narrow = Import.Batching.BatchSizer(5000, target_bytes=1 << 20)
+        wide = Import.Batching.BatchSizer(5000, target_bytes=1 << 20)
+        narrow.observe_rows(self.narrow)
+        wide.observe_rows(self.wide)
+        self.assertGreater(narrow.rows, 20 * wide.rows)
+        self.assertLessEqual(wide.rows * Import.Batching.BatchSizer.statement_bytes(self.wide[0]), 1 << 20)
+
+    def test_limits_cap_the_target(self):
+        sizer = Import.Batching.BatchSizer(5000, max_rows=10000, target_bytes=1 << 30)
+        sizer.observe_rows(self.narrow)
+        self.assertEqual(sizer.rows, 10000)
+        sizer = Import.Batching.BatchSizer(5000, memory_bytes=1 << 20, buffered=4)
+        sizer.observe_rows(self.wide)
+        self.assertLessEqual(sizer.rows * 4 * Import.Batching.BatchSizer.memory_bytes(self.wide[0]), 1 << 20)
+
+    def test_write_latency_scales_the_batches(self):
+        sizer = Import.Batching.BatchSizer(5000, target_bytes=1 << 20, seconds=1.0)
+        sizer.observe_rows(self.wide)
+        rows = sizer.rows
+        sizer.observe_write(rows, 4.0)
+        self.assertEqual(sizer.rows, rows // 2)
+        sizer.observe_write(sizer.rows, 0.1)
+        sizer.observe_write(sizer.rows, 0.1)
+        self.assertGreater(sizer.rows, rows)
+
+
 if __name__ == '__main__':
     unittest.main()
-
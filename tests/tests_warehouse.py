@@ -2,8 +2,31 @@
 
 from .context import Warehouse
 
+import io
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+import tempfile
 import unittest
 
+import Warehouse.Drivers
+import Warehouse.Florida
+import Warehouse.FloridaSQL
+import Warehouse.GeorgiaSQL
+import Warehouse.NorthCarolina
+import Warehouse.NorthCarolinaSQL
+import Warehouse.State
+import Warehouse.StateSQL
+from Import.NorthCarolinaCodes import __history_import_map__ as __north_carolina_history_import_map__
+from . import benchmark
+
+
+def columns(sql: str) -> list[str]:
+    """Returns the column list of a REPLACE or LOAD DATA statement."""
+    return [c.strip(" \n`") for c in re.search(r"\(([^()]*)\)", sql).group(1).split(",")]
+
 
 class BasicTestSuite(unittest.TestCase):
     """Basic test cases."""
@@ -12,6 +35,553 @@ def test_absolute_truth_and_meaning(self):
         assert True
 
 
+class BulkLoadTestSuite(unittest.TestCase):
+    """LOAD DATA LOCAL INFILE test cases."""
+
+    def test_load_columns_match_replace_columns(self):
+        for module, names in [
+            (Warehouse.FloridaSQL, ["voter", "history"]),
+            (Warehouse.GeorgiaSQL, ["history"]),
+            (Warehouse.NorthCarolinaSQL, ["voter", "history"])
+        ]:
+            for name in names:
+                self.assertEqual(
+                    columns(getattr(module, f"load_{name}")()),
+                    columns(getattr(module, f"set_{name}")())
+                )
+
+    def test_write_load_file_escapes_values(self):
+        file = io.StringIO()
+        Warehouse.State.State.write_load_file(file, [("a\tb", None, 1, "c\\d\n")])
+        self.assertEqual(file.getvalue(), "a\\tb\t\\N\t1\tc\\\\d\\n\n")
+
+
+class StagingTestSuite(unittest.TestCase):
+    """Staging table test cases."""
+
+    def test_staging_table_has_only_the_primary_key(self):
+        sql = Warehouse.FloridaSQL.create_voters_table("Voters_staging", indexes=False)
+        self.assertIn("`Voters_staging`", sql)
+        self.assertIn("PRIMARY KEY (`voter_id`)\n", sql)
+        self.assertNotIn("KEY `", sql.replace("PRIMARY KEY", ""))
+
+    def test_add_indexes_builds_every_secondary_index(self):
+        indexes = Warehouse.NorthCarolinaSQL.voters_indexes()
+        sql = Warehouse.StateSQL.add_indexes("Voters_staging", indexes)
+        self.assertTrue(sql.startswith("ALTER TABLE `Voters_staging` ADD INDEX `county_code` (`county_code`), "))
+        self.assertEqual(sql.count("ADD INDEX"), len(indexes))
+        self.assertEqual(Warehouse.NorthCarolinaSQL.create_voters_table().count("KEY `"), len(indexes))
+
+
+class PartitionTestSuite(unittest.TestCase):
+    """Partitioned Histories test cases."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.config = os.path.join(self.directory.name, "config.yml")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def warehouse(self, state: str, driver: str) -> Warehouse.State.State:
+        with open(self.config, "w") as file:
+            file.write(f"UnitedStates:\n  {state}:\n    database:\n      driver: {driver}\n      schema: ':memory:'\n"
+                       "    partitioning:\n      histories:\n        first_year: 2016\n        counties: 4\n")
+        return getattr(getattr(Warehouse, state), state)(self.config)
+
+    def test_histories_are_created_partitioned(self):
+        sql = self.warehouse("Florida", "mariadb").create_table_sql("histories", "Histories_staging", indexes=False)
+        self.assertIn("CREATE TABLE IF NOT EXISTS `Histories_staging`", sql)
+        self.assertIn("PARTITION BY RANGE (YEAR(`election_date`))", sql)
+        self.assertIn("SUBPARTITION BY KEY (`county_code`) SUBPARTITIONS 4", sql)
+        self.assertTrue(sql.strip().endswith("(PARTITION `p_before` VALUES LESS THAN (2016));"))
+        with self.assertRaises(ValueError):
+            self.warehouse("Florida", "sqlite")
+        with self.assertRaises(ValueError):
+            self.warehouse("NorthCarolina", "mariadb")
+
+    def test_missing_year_partitions_are_added(self):
+        db = self.warehouse("Florida", "mariadb")
+        executed = []
+        db.execute_sql = executed.append
+        db.get_partitions = lambda table: {2016: "p_before", 2021: "p2020"}
+        fields = ["county_code", "election_date"]
+        data = [("ALA", "2014-11-04"), ("ALA", "2018-11-06"), ("BAY", "2020-11-03"), ("BAY", "2022-11-08")]
+        db.add_partitions("histories", "Histories", fields, data)
+        self.assertEqual(executed, [
+            Warehouse.StateSQL.split_year_partitions("Histories", "p2020", 2016, 2021),
+            Warehouse.StateSQL.add_year_partitions("Histories", 2021, 2022)
+        ])
+        self.assertIn("PARTITION `p2019` VALUES LESS THAN (2020),", executed[0])
+        self.assertIn("PARTITION `p2021` VALUES LESS THAN (2022),", executed[1])
+        db.add_partitions("histories", "Histories", fields, data)
+        self.assertEqual(len(executed), 2)
+
+    def test_every_year_partition_holds_a_single_year(self):
+        db = self.warehouse("Florida", "mariadb")
+        executed = []
+        db.execute_sql = executed.append
+        db.get_partitions = lambda table: {2016: "p_before"}
+        fields = ["county_code", "election_date"]
+        db.add_partitions("histories", "Histories", fields, [("ALA", "2022-11-08")])
+        db.add_partitions("histories", "Histories", fields, [("ALA", "2018-11-06"), ("ALA", "2024-11-05")])
+        self.assertEqual(executed, [
+            Warehouse.StateSQL.add_year_partitions("Histories", 2016, 2022),
+            Warehouse.StateSQL.add_year_partitions("Histories", 2023, 2024)
+        ])
+        self.assertEqual(db.partitions["Histories"], {2016: "p_before"} | {
+            year + 1: f"p{year}" for year in range(2016, 2025)
+        })
+
+
+class StartupTestSuite(unittest.TestCase):
+    """Command line startup test cases."""
+
+    def test_version_loads_no_state_or_database_modules(self):
+        modules = benchmark.loaded_modules(["--version"])
+        self.assertEqual([library for library in benchmark.__startup_libraries__ if library in modules], [])
+
+    def test_sqlite_driver_does_not_load_pymysql(self):
+        loaded = subprocess.run(
+            [sys.executable, "-c", "import sys, Warehouse.Drivers; Warehouse.Drivers.SQLite.connect("
+             "{'schema': ':memory:'}); print('pymysql' in sys.modules)"],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True,
+            text=True
+        ).stdout.strip()
+        self.assertEqual(loaded, "False")
+
+    def test_profile_rows_need_a_profile(self):
+        result = subprocess.run(
+            [sys.executable, benchmark.__script__, "-a", "import", "-f", "voters.zip", "--profile-rows", "5"],
+            capture_output=True,
+            text=True
+        )
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("--profile-rows can only be combined with --profile", result.stderr)
+
+    def test_exports_to_standard_output_print_messages_to_standard_error(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config = os.path.join(directory, "config.yml")
+            with open(config, "w") as file:
+                file.write("UnitedStates:\n  NorthCarolina:\n    database:\n      driver: sqlite\n"
+                           f"      schema: {os.path.join(directory, 'voters.db')}\n")
+            with Warehouse.NorthCarolina.NorthCarolina(config) as db:
+                db.init_schema()
+                # The walking list joins the Elections dimension, created with the first election
+                db.get_election_id("2022-11-08", "GENERAL")
+            command = [sys.executable, benchmark.__script__, "-s", "NorthCarolina", "-a", "export", "-f", "-"]
+            result = subprocess.run(command + ["-c", config], capture_output=True, text=True)
+            self.assertEqual(result.returncode, 0)
+            self.assertTrue(result.stdout.startswith("voter_id,county_code,"))
+            self.assertEqual(len(result.stdout.splitlines()), 1)
+            result = subprocess.run(command + ["-c", os.path.join(directory, "missing.yml")], capture_output=True,
+                                    text=True)
+            self.assertNotEqual(result.returncode, 0)
+            self.assertEqual(result.stdout, "")
+            self.assertIn("Caught this error: FileExistsError", result.stderr)
+
+
+class SQLiteWarehouseTestCase(unittest.TestCase):
+    """
+    Opens an in-memory North Carolina warehouse for each test, closed again once the test is done.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.config = os.path.join(self.directory.name, "config.yml")
+        with open(self.config, "w") as file:
+            file.write("UnitedStates:\n  NorthCarolina:\n    database:\n      driver: sqlite\n"
+                       "      schema: ':memory:'\n")
+        self.db = Warehouse.NorthCarolina.NorthCarolina(self.config).__enter__()
+
+    def tearDown(self):
+        self.db.db.close()
+        self.directory.cleanup()
+
+    def set_histories(self, histories: list[dict]) -> None:
+        fields = list(__north_carolina_history_import_map__.keys())
+        self.db.executemany_prepared_sql(
+            Warehouse.NorthCarolinaSQL.set_history(),
+            self.db.intern_dimensions("histories", fields, [tuple(h.get(f, "") for f in fields) for h in histories])
+        )
+
+
+class SQLiteTestSuite(SQLiteWarehouseTestCase):
+    """SQLite driver test cases."""
+
+    def test_create_table_is_translated(self):
+        sql = Warehouse.Drivers.SQLite.translate(Warehouse.GeorgiaSQL.create_histories_table())
+        db = sqlite3.connect(":memory:")
+        for statement in sql:
+            db.execute(statement)
+        self.assertEqual(len(sql), 1 + len(Warehouse.GeorgiaSQL.histories_indexes()))
+        self.assertNotIn("COLLATE", sql[0])
+        self.assertEqual(sql[1], "CREATE INDEX IF NOT EXISTS `Histories_county_code` ON `Histories` (`county_code`);")
+        self.assertEqual(Warehouse.Drivers.SQLite.translate(Warehouse.GeorgiaSQL.create_database("Voters")), ())
+        self.assertIn("INSERT OR IGNORE", Warehouse.Drivers.SQLite.translate(Warehouse.GeorgiaSQL.set_county())[0])
+        # Surrogate keys keep a single primary key however the CREATE TABLE statement is laid out
+        sql = Warehouse.Drivers.SQLite.translate(
+            "CREATE TABLE IF NOT EXISTS `Parties` (`party_id` int unsigned NOT NULL AUTO_INCREMENT, "
+            "`party_code` char(3) NOT NULL,  PRIMARY KEY (`party_id`)) ENGINE=InnoDB;"
+        )
+        db.execute(sql[0])
+        self.assertEqual(sql[0].count("PRIMARY KEY"), 1)
+
+    def test_staging_indexes_replace_those_of_the_live_table(self):
+        sql = Warehouse.Drivers.SQLite.translate(Warehouse.StateSQL.add_indexes("Voters_staging", {"name": ["a"]}))
+        self.assertEqual(sql, (
+            "DROP INDEX IF EXISTS `Voters_name`;",
+            "CREATE INDEX `Voters_name` ON `Voters_staging` (`a`);"
+        ))
+
+    def test_in_memory_warehouse(self):
+        with self.assertRaises(ValueError):
+            Warehouse.NorthCarolina.NorthCarolina(self.config, load_mode="bulk")
+        # SQLite binds the values of every row separately, so statements have no packet to fit in
+        self.assertIsNone(self.db.get_statement_limit())
+        self.db.init_schema()
+        self.db.clear_progress("sha")
+        self.db.executemany_prepared_sql(
+            Warehouse.NorthCarolinaSQL.set_history(),
+            [("1", "42", 1, "") + (0, 0) + ("",) * 4],
+            (Warehouse.StateSQL.set_progress(), ("sha", "member", 1, 0))
+        )
+        self.assertEqual(self.db.get_progress("sha"), {"member": (1, False)})
+        self.assertEqual(self.db.db.execute("SELECT voter_id FROM Histories").fetchall()[0][0], 42)
+
+    def test_fast_load_defers_indexes_of_empty_tables(self):
+        def indexes():
+            return {row[0] for row in self.db.db.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'Histories' AND sql IS NOT NULL"
+            )}
+        self.db.init_schema()
+        self.assertTrue(self.db.begin_fast_load("histories"))
+        self.assertEqual(indexes(), set())
+        self.set_histories([{"county_code": "1", "voter_id": "42", "election_date": "2022-11-08"}])
+        self.db.finish_fast_load("histories")
+        self.assertEqual(len(indexes()), len(Warehouse.NorthCarolinaSQL.histories_indexes()))
+        self.assertFalse(self.db.begin_fast_load("histories"))
+
+
+class PoolTestSuite(unittest.TestCase):
+    """Connection pool test cases."""
+
+    def test_batches_are_spread_across_the_pool(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config = os.path.join(directory, "config.yml")
+            with open(config, "w") as file:
+                file.write("UnitedStates:\n  NorthCarolina:\n    database:\n      driver: sqlite\n"
+                           f"      schema: {os.path.join(directory, 'voters.db')}\n      pool_size: 3\n")
+            db = Warehouse.NorthCarolina.NorthCarolina(config).__enter__()
+            try:
+                db.init_schema()
+                db.clear_progress("sha")
+                for batch in range(6):
+                    db.submit_prepared_list(
+                        Warehouse.NorthCarolinaSQL.set_history(),
+                        [("1", str(batch * 10 + i), 1, "") + (0, 0) + ("",) * 4 for i in range(10)],
+                        (Warehouse.StateSQL.set_progress(), ("sha", "member", (batch + 1) * 10, 0))
+                    )
+                    self.assertLessEqual(len(db.pending), 3)
+                db.wait_batches()
+                self.assertEqual(db.db.execute("SELECT COUNT(*) FROM Histories").fetchone()[0], 60)
+                self.assertEqual(db.get_progress("sha"), {"member": (60, False)})
+                self.assertLessEqual(len(db.pooled), 3)
+            finally:
+                db.__exit__(None, None, None)
+            with open(config, "w") as file:
+                file.write("UnitedStates:\n  NorthCarolina:\n    database:\n      driver: sqlite\n"
+                           "      schema: ':memory:'\n      pool_size: 3\n")
+            with self.assertRaises(ValueError):
+                Warehouse.NorthCarolina.NorthCarolina(config)
+            with open(config, "w") as file:
+                file.write("UnitedStates:\n  NorthCarolina:\n    database:\n      driver: sqlite\n"
+                           "      schema: ':memory:'\n")
+            self.assertFalse(Warehouse.NorthCarolina.NorthCarolina(config).poolable)
+
+
+class CommitCadenceTestSuite(unittest.TestCase):
+    """Commit cadence test cases."""
+
+    def test_batches_are_committed_every_n_rows(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config = os.path.join(directory, "config.yml")
+            schema = os.path.join(directory, "voters.db")
+            with open(config, "w") as file:
+                file.write("UnitedStates:\n  NorthCarolina:\n    database:\n      driver: sqlite\n"
+                           f"      schema: {schema}\n    commit:\n      rows: 25\n")
+            db = Warehouse.NorthCarolina.NorthCarolina(config).__enter__()
+            reader = sqlite3.connect(schema)
+            try:
+                db.init_schema()
+                self.assertEqual(reader.execute("SELECT COUNT(*) FROM Counties").fetchone()[0], 101)
+                committed = []
+                for batch in range(3):
+                    db.executemany_prepared_sql(
+                        Warehouse.NorthCarolinaSQL.set_history(),
+                        [("1", str(batch * 10 + i), 1, "") + (0, 0) + ("",) * 4 for i in range(10)]
+                    )
+                    committed.append(reader.execute("SELECT COUNT(*) FROM Histories").fetchone()[0])
+                self.assertEqual(committed, [0, 0, 30])
+            finally:
+                reader.close()
+                db.__exit__(None, None, None)
+            with open(config, "w") as file:
+                file.write("UnitedStates:\n  NorthCarolina:\n    database:\n      driver: sqlite\n"
+                           f"      schema: {schema}\n    commit:\n      batches: 2\n")
+            with self.assertRaises(ValueError):
+                Warehouse.NorthCarolina.NorthCarolina(config)
+
+    def test_deferred_rows_are_committed_before_pooled_batches(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config = os.path.join(directory, "config.yml")
+            with open(config, "w") as file:
+                file.write("UnitedStates:\n  NorthCarolina:\n    database:\n      driver: sqlite\n"
+                           f"      schema: {os.path.join(directory, 'voters.db')}\n      pool_size: 2\n"
+                           "      timeout: 1\n    commit:\n      rows: 1000\n")
+            db = Warehouse.NorthCarolina.NorthCarolina(config).__enter__()
+            try:
+                db.init_schema()
+                # Turnout is merged on the main connection, where the commit section defers it
+                db.set_turnout([("1", "42", "2022-11-08", "GENERAL")])
+                self.assertGreater(db.uncommitted_rows, 0)
+                db.submit_prepared_list(
+                    Warehouse.NorthCarolinaSQL.set_history(),
+                    [("1", "42", 1, "") + (0, 0) + ("",) * 4]
+                )
+                db.wait_batches()
+                self.assertEqual(db.db.execute("SELECT COUNT(*) FROM Histories").fetchone()[0], 1)
+            finally:
+                db.__exit__(None, None, None)
+
+
+class UpsertTestSuite(unittest.TestCase):
+    """Upsert write mode test cases."""
+
+    def test_only_changed_records_are_written(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config = os.path.join(directory, "config.yml")
+            with open(config, "w") as file:
+                file.write("UnitedStates:\n  NorthCarolina:\n    database:\n      driver: sqlite\n"
+                           "      schema: ':memory:'\n    write:\n      histories: upsert\n")
+            db = Warehouse.NorthCarolina.NorthCarolina(config).__enter__()
+            try:
+                db.init_schema()
+                sql = db.write_sql("histories", Warehouse.NorthCarolinaSQL.set_history())
+                self.assertIn("ON DUPLICATE KEY UPDATE `voting_method` = VALUES(`voting_method`)", sql)
+                self.assertEqual(db.write_sql("voters", Warehouse.NorthCarolinaSQL.set_voter()),
+                                 Warehouse.NorthCarolinaSQL.set_voter())
+                rows = [("1", str(voter_id), 1, "IN-PERSON", 0, 0) + ("",) * 4 for voter_id in range(3)]
+                db.executemany_prepared_sql(sql, rows)
+                changes = db.db.total_changes
+                rows[1] = ("1", "1", 1, "ABSENTEE", 0, 0) + ("",) * 4
+                db.executemany_prepared_sql(sql, rows)
+                self.assertEqual(db.db.total_changes - changes, 1)
+                self.assertEqual(
+                    [row[0] for row in db.db.execute("SELECT voting_method FROM Histories ORDER BY voter_id")],
+                    ["IN-PERSON", "ABSENTEE", "IN-PERSON"]
+                )
+            finally:
+                db.__exit__(None, None, None)
+            with open(config, "w") as file:
+                file.write("UnitedStates:\n  NorthCarolina:\n    database:\n      driver: sqlite\n"
+                           "      schema: ':memory:'\n    write:\n      histories: merge\n")
+            with self.assertRaises(ValueError):
+                Warehouse.NorthCarolina.NorthCarolina(config)
+
+    def test_records_with_only_key_columns_are_ignored(self):
+        sql = Warehouse.FloridaSQL.set_history()
+        self.assertTrue(Warehouse.StateSQL.upsert(sql, columns(sql)).startswith("INSERT IGNORE INTO"))
+        key = Warehouse.Florida.Florida.import_tables["histories"]["key"]
+        self.assertTrue(Warehouse.StateSQL.upsert(sql, key, ["export_date"]).startswith("INSERT IGNORE INTO"))
+
+    def test_export_dates_are_only_written_with_changed_records(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config = os.path.join(directory, "config.yml")
+            with open(config, "w") as file:
+                file.write("UnitedStates:\n  Florida:\n    database:\n      driver: sqlite\n"
+                           "      schema: ':memory:'\n    write:\n      voters: upsert\n")
+            db = Warehouse.Florida.Florida(config).__enter__()
+            try:
+                db.init_schema()
+                sql = db.write_sql("voters", Warehouse.FloridaSQL.set_voter())
+                self.assertIn("`export_date` = IF(NOT (`county_code` <=> VALUES(`county_code`)) OR ", sql)
+                row = ("ALA", "1") + ("",) * (len(columns(sql)) - 3)
+                db.executemany_prepared_sql(sql, [row + ("2024-01-01",)])
+                changes = db.db.total_changes
+                db.executemany_prepared_sql(sql, [row + ("2024-02-01",)])
+                self.assertEqual(db.db.total_changes, changes)
+                db.executemany_prepared_sql(sql, [("ALA", "1", "SMITH") + row[3:] + ("2024-03-01",)])
+                self.assertEqual(
+                    tuple(db.db.execute("SELECT name_last, export_date FROM Voters").fetchone()),
+                    ("SMITH", "2024-03-01")
+                )
+            finally:
+                db.__exit__(None, None, None)
+
+
+class DimensionTestSuite(SQLiteWarehouseTestCase):
+    """Dimension table test cases."""
+
+    def test_histories_are_interned(self):
+        self.db.init_schema()
+        self.set_histories([
+            {"county_code": "1", "voter_id": "7", "election_date": "2022-11-08", "election_type": "GENERAL",
+             "party_code": "DEM", "party_name": "DEMOCRATIC", "precinct_code": "01", "precinct_name": "NORTH"},
+            {"county_code": "1", "voter_id": "8", "election_date": "2022-11-08", "election_type": "GENERAL",
+             "party_code": "REP", "party_name": "REPUBLICAN", "precinct_code": "01", "precinct_name": "NORTH"}
+        ])
+        self.assertEqual(
+            [tuple(row) for row in self.db.db.execute(
+                "SELECT voter_id, election_id, party_id, precinct_id FROM Histories"
+            )],
+            [(7, 1, 1, 1), (8, 1, 2, 1)]
+        )
+        self.assertEqual(self.db.dimensions["parties"], {("DEM", "DEMOCRATIC"): 1, ("REP", "REPUBLICAN"): 2})
+        self.db.dimensions = {}
+        self.assertEqual(self.db.get_dimension_id("precincts", ("1", "01", "NORTH")), 1)
+        self.assertEqual(self.db.get_election_id("2022-11-08", "GENERAL"), 1)
+
+    def test_blank_dimension_values_have_no_row(self):
+        self.db.init_schema()
+        self.set_histories([{"county_code": "1", "voter_id": "7", "election_date": None, "election_type": "GENERAL"}])
+        self.assertEqual([tuple(row) for row in self.db.db.execute("SELECT voter_id, election_id FROM Histories")],
+                         [(7, 0)])
+        self.assertNotIn("elections", self.db.dimensions)
+
+    def test_histories_of_an_earlier_layout_are_migrated(self):
+        columns = ["county_code", "county_name", "voter_id", "election_date", "election_type", "voting_method",
+                   "party_code", "party_name", "precinct_code", "precinct_name", "ncid", "voted_county_code",
+                   "voted_county_name", "voter_tabulated_district_code", "voter_tabulated_district_name"]
+        self.db.db.execute(f"CREATE TABLE Histories ({', '.join(columns)}, "
+                           "PRIMARY KEY (county_code, voter_id, election_date, election_type, party_code))")
+        self.db.db.executemany(f"INSERT INTO Histories VALUES ({', '.join('?' * len(columns))})", [
+            ("1", "ALAMANCE", 7, "2022-11-08", "GENERAL", "IN-PERSON", "DEM", "DEMOCRATIC", "01", "NORTH",
+             "AA7", "1", "ALAMANCE", "01", "NORTH"),
+            ("1", "ALAMANCE", 8, "2022-11-08", "GENERAL", "MAIL", "REP", "REPUBLICAN", "01", "NORTH",
+             "AA8", "1", "ALAMANCE", "01", "NORTH")
+        ])
+        self.db.init_schema()
+        self.assertNotIn("party_code", self.db.get_columns("Histories"))
+        self.assertEqual(
+            [tuple(row) for row in self.db.db.execute(
+                "SELECT voter_id, election_id, voting_method, party_id, precinct_id, ncid FROM Histories "
+                "ORDER BY voter_id"
+            )],
+            [(7, 1, "IN-PERSON", 1, 1, "AA7"), (8, 1, "MAIL", 2, 1, "AA8")]
+        )
+        self.assertEqual(self.db.get_dimension_id("parties", ("REP", "REPUBLICAN")), 2)
+        # A migrated table is left as it is
+        self.db.init_schema()
+        self.assertEqual(self.db.db.execute("SELECT COUNT(*) FROM Histories").fetchone()[0], 2)
+
+    def test_histories_are_created_with_their_indexes(self):
+        with open(self.config, "w") as file:
+            file.write("UnitedStates:\n  NorthCarolina:\n    database:\n      driver: mariadb\n      schema: Voters\n")
+        db = Warehouse.NorthCarolina.NorthCarolina(self.config)
+        executed = []
+        db.execute_sql = executed.append
+        db.executemany_prepared_sql = lambda sql, data: None
+        db.commit = lambda: None
+        db.get_columns = lambda table: []
+        db.init_schema()
+        self.assertEqual(executed[-1], Warehouse.NorthCarolinaSQL.create_histories_table())
+        self.assertEqual(sum("CREATE TABLE IF NOT EXISTS `Histories`" in sql for sql in executed), 1)
+        self.assertIn("KEY `election_id`", executed[-1])
+        # A Histories table of the earlier layout is moved before the current one is declared
+        executed.clear()
+        db.get_columns = lambda table: ["county_code", "voter_id", "election_date", "election_type"]
+        db.init_schema()
+        self.assertIn(Warehouse.NorthCarolinaSQL.migrate_histories("Histories_staging"), executed)
+        self.assertEqual(executed[-1], Warehouse.NorthCarolinaSQL.create_histories_table())
+
+
+class TurnoutTestSuite(SQLiteWarehouseTestCase):
+    """Voter turnout bitset test cases."""
+
+    def test_turnout_is_merged_across_batches(self):
+        self.db.set_turnout([("1", "7", "2020-11-03", "GENERAL"), ("1", "8", "2020-11-03", "GENERAL")])
+        self.db.set_turnout([("1", "7", "2022-11-08", "GENERAL"), ("1", "8", None, "")])
+        self.db.set_turnout([("1", "7", "2022-11-08", "GENERAL")])
+        general_2020 = self.db.get_election_id("2020-11-03", "GENERAL")
+        general_2022 = self.db.get_election_id("2022-11-08", "GENERAL")
+        self.assertEqual(len(self.db.dimensions["elections"]), 2)
+        turnout = dict(
+            ((county_code, voter_id), value)
+            for county_code, voter_id, value in self.db.db.execute("SELECT * FROM VoterTurnout").fetchall()
+        )
+        self.assertTrue(self.db.voted(turnout[("1", 7)], general_2020))
+        self.assertTrue(self.db.voted(turnout[("1", 7)], general_2022))
+        self.assertFalse(self.db.voted(turnout[("1", 8)], general_2022))
+        self.assertEqual(Warehouse.StateSQL.voted_in(general_2022), "(ASCII(SUBSTRING(t.turnout, 1, 1)) & 4) > 0")
+
+    def test_election_ids_past_the_bitset_are_rejected(self):
+        self.db.turnout_bytes = 1
+        for election in range(8):
+            self.db.get_election_id(f"2020-01-{election + 1:02}", "PRIMARY")
+        self.db.set_turnout([("1", "7", "2020-01-07", "PRIMARY")])
+        with self.assertRaises(ValueError):
+            self.db.set_turnout([("1", "7", "2020-01-08", "PRIMARY")])
+        self.assertIn("`turnout` varbinary(8192)", Warehouse.StateSQL.create_turnout_table())
+
+    def test_turnout_bytes_are_merged_by_the_database(self):
+        self.db.init_schema()
+        self.db.execute_sql(Warehouse.StateSQL.create_turnout_table())
+        self.db.executemany_prepared_sql(
+            "INSERT INTO VoterTurnout (county_code, voter_id, turnout) VALUES (%s, %s, %s);",
+            [("1", 7, bytes([1, 0, 0, 128])), ("1", 8, bytes([2]))]
+        )
+        # Elections 1 and 9, stored before this importer read the bitsets, land in bytes 0 and 1
+        for election in range(10):
+            self.db.get_election_id(f"2020-01-{election + 1:02}", "PRIMARY")
+        self.db.set_turnout([("1", "7", "2020-01-01", "PRIMARY"), ("1", "8", "2020-01-09", "PRIMARY")])
+        self.db.set_turnout([("1", "9", "2020-01-09", "PRIMARY")])
+        turnout = dict(
+            ((county_code, voter_id), value)
+            for county_code, voter_id, value in self.db.db.execute("SELECT * FROM VoterTurnout").fetchall()
+        )
+        self.assertEqual(turnout, {
+            ("1", 7): bytes([3, 0, 0, 128]), ("1", 8): bytes([2, 2]), ("1", 9): bytes([0, 2])
+        })
+        self.assertEqual(
+            [row[0] for row in self.db.db.execute(
+                f"SELECT voter_id FROM VoterTurnout t WHERE {Warehouse.StateSQL.voted_in(9)} ORDER BY voter_id"
+            )],
+            [8, 9]
+        )
+
+    def test_staged_turnout_replaces_the_live_bitsets(self):
+        self.db.set_turnout([("1", "7", "2020-11-03", "GENERAL")])
+        self.db.begin_turnout_staging()
+        self.db.set_turnout([("1", "8", "2022-11-08", "GENERAL")], staging=True)
+        self.assertEqual(self.db.db.execute("SELECT voter_id FROM VoterTurnout").fetchone()[0], 7)
+        self.db.finish_turnout_staging()
+        self.assertEqual([row[0] for row in self.db.db.execute("SELECT voter_id FROM VoterTurnout")], [8])
+
+
+class ExportTestSuite(SQLiteWarehouseTestCase):
+    """Walking list export test cases."""
+
+    def test_walking_list_filters(self):
+        self.db.init_schema()
+        voter = columns(Warehouse.NorthCarolinaSQL.set_voter())
+        self.db.executemany_prepared_sql(Warehouse.NorthCarolinaSQL.set_voter(), [
+            tuple({"voter_id": voter_id, "county_code": "1", "party_code": party}.get(c, "") for c in voter)
+            for voter_id, party in [(1, "DEM"), (2, "REP"), (3, "DEM")]
+        ])
+        self.set_histories([
+            {"voter_id": str(voter_id), "county_code": "1", "election_date": date}
+            for voter_id, date in [(1, "2016-11-08"), (3, "2016-11-08"), (3, "2022-11-08")]
+        ])
+        file = io.StringIO()
+        exported = self.db.export_walking_list(file, {"party": "DEM", "voted_since": "2020-01-01", "precinct": None})
+        lines = file.getvalue().splitlines()
+        self.assertEqual(exported, 1)
+        self.assertTrue(lines[0].startswith("voter_id,county_code,precinct,"))
+        self.assertTrue(lines[1].startswith("3,1,") and lines[1].endswith(",2022-11-08"))
+        self.assertEqual(self.db.export_walking_list(io.StringIO(), {"county": "1"}), 3)
+
+
 if __name__ == '__main__':
     unittest.main()
-
@@ -1,12 +1,15 @@
 # -*- coding: utf-8 -*-
 import argparse
+import datetime
 import importlib
 import os
+import sys
 
 from Warehouse.version import __version__
 from Warehouse.ImplementedStates import __implemented_states__
 
-# VoterWarehouse command-line Voter and Voter History handling tool
+# VoterWarehouse command-line Voter and Voter History handling tool. The state modules, and with them the YAML and
+# database libraries, are imported once the action needs them so --version and --help start quickly
 
 
 def import_type(args: argparse.Namespace) -> None:
@@ -22,7 +25,7 @@ def import_type(args: argparse.Namespace) -> None:
                 with getattr(
                     importlib.import_module(f"Warehouse.{args.state}"),
                     f"{args.state}"
-                )(args.config) as state_db:
+                )(args.config, load_mode=args.load_mode) as state_db:
                     with getattr(
                         importlib.import_module(f"Import.{args.state}"),
                         f"{args.state}"
@@ -32,7 +35,16 @@ def import_type(args: argparse.Namespace) -> None:
                                 if args.type in state.valid_import_types.keys():
                                     state.import_source(
                                         args.file,
-                                        args.type
+                                        args.type,
+                                        workers=args.workers,
+                                        staging=args.staging,
+                                        delta=args.delta,
+                                        resume=args.resume,
+                                        member_workers=args.member_workers,
+                                        fast_load=args.fast_load,
+                                        metrics=args.metrics,
+                                        row_limit=args.profile_rows if args.profile is not None else 0,
+                                        snapshots=args.snapshots
                                     )
                                 else:
                                     raise ValueError(f"Usage: Type {args.type} is not valid")
@@ -49,6 +61,62 @@ def import_type(args: argparse.Namespace) -> None:
         raise
 
 
+def profile_type(args: argparse.Namespace) -> None:
+    """
+    profile_type Runs an import under cProfile, then writes the pstats file and prints the hottest functions
+
+    :param argparse.Namespace args: Argument dictionary to be evaluated by import types
+    :return: None
+    """
+    import cProfile
+    import pstats
+
+    if args.workers > 1 or args.member_workers > 1:
+        print("Only this process is profiled, rows parsed or imported by worker processes are not")
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(import_type, args)
+    finally:
+        profiler.dump_stats(args.profile)
+        print(f"Profile written to {args.profile}, the {args.profile_top} functions with the most own time:")
+        pstats.Stats(profiler, stream=sys.stdout).sort_stats(pstats.SortKey.TIME).print_stats(args.profile_top)
+
+
+def export_type(args: argparse.Namespace) -> None:
+    """
+    export_type Streams a walking list for the requested filters to a CSV file, or args.output for '-'
+
+    :param argparse.Namespace args: Argument dictionary to be evaluated by the export
+    :return: None
+    """
+    try:
+        if args.state in __implemented_states__:
+            if os.path.isfile(args.config):
+                with getattr(
+                    importlib.import_module(f"Warehouse.{args.state}"),
+                    f"{args.state}"
+                )(args.config) as state_db:
+                    filters = {
+                        "county": args.county,
+                        "precinct": args.precinct,
+                        "party": args.party,
+                        "voted_since": args.voted_since
+                    }
+                    if args.file == "-":
+                        exported = state_db.export_walking_list(args.output, filters)
+                    else:
+                        with open(args.file, "w", newline="", encoding="utf-8") as file:
+                            exported = state_db.export_walking_list(file, filters)
+                        print(f"{exported} voters exported to {args.file}")
+            else:
+                raise FileExistsError(f"Usage: Config File must exist!")
+        else:
+            raise ValueError(f"Usage: State {args.state} is not implemented")
+    except Exception as error:
+        print('Caught this error: ' + repr(error))
+        raise
+
+
 def main(args: argparse.Namespace) -> None:
     """
     main Sets up the conditional actions workflow based on the specified action
@@ -59,10 +127,20 @@ def main(args: argparse.Namespace) -> None:
     try:
         match args.action:
             case "import":
-                if args.file is not None:
+                if args.profile_rows > 0 and args.profile is None:
+                    # Rows past the limit would be silently left out of an import that is not being profiled
+                    raise ValueError(f"Usage: --profile-rows can only be combined with --profile")
+                if args.file is not None and args.profile is not None:
+                    profile_type(args)
+                elif args.file is not None:
                     import_type(args)
                 else:
                     raise ValueError(f"Usage: File must be provided")
+            case "export":
+                if args.file is not None:
+                    export_type(args)
+                else:
+                    raise ValueError(f"Usage: File must be provided")
             case _:
                 raise ValueError(f"Usage: Action {args.action} is not valid")
     except Exception as error:
@@ -77,6 +155,10 @@ def main(args: argparse.Namespace) -> None:
     :return: None
     """
     try:
+        # Required for the parsing process pool in the frozen (PyInstaller) binary, a no-op otherwise
+        if getattr(sys, "frozen", False):
+            import multiprocessing
+            multiprocessing.freeze_support()
         parser = argparse.ArgumentParser()
         parser.add_argument(
             "-s",
@@ -105,14 +187,104 @@ def main(args: argparse.Namespace) -> None:
             help="Config YAML File",
             default="/etc/VoterWarehouse/config.yml"
         )
+        parser.add_argument(
+            "-w",
+            "--workers",
+            help="Number of processes parsing rows during an import",
+            type=int,
+            default=1
+        )
+        parser.add_argument(
+            "-m",
+            "--member-workers",
+            help="Number of processes importing the files of a Zip archive side by side",
+            type=int,
+            default=1
+        )
+        parser.add_argument(
+            "-l",
+            "--load-mode",
+            help="How batches are sent to the database: executemany or bulk (LOAD DATA LOCAL INFILE)",
+            choices=["executemany", "bulk"],
+            default="executemany"
+        )
+        parser.add_argument(
+            "--staging",
+            help="Import into a staging table and swap it in for the live table once complete",
+            action="store_true"
+        )
+        parser.add_argument(
+            "--fast-load",
+            help="Load an empty table without its secondary indexes and build them once the file is imported",
+            action="store_true"
+        )
+        parser.add_argument(
+            "--metrics",
+            help="File receiving the time spent in each import stage, a Prometheus textfile when it ends in .prom "
+                 "and JSON lines otherwise"
+        )
+        parser.add_argument(
+            "--snapshots",
+            help="Directory keeping an Arrow snapshot of the parsed rows of each imported file, read back instead of "
+                 "parsing the file when it is imported again. Needs the pyarrow package"
+        )
+        parser.add_argument(
+            "--profile",
+            help="Profile the import with cProfile and write the statistics to this pstats file"
+        )
+        parser.add_argument(
+            "--profile-top",
+            help="Number of functions with the most own time printed after a profiled import",
+            type=int,
+            default=25
+        )
+        parser.add_argument(
+            "--profile-rows",
+            help="Import at most this many rows of each file of the Zip archive while profiling, 0 imports every row",
+            type=int,
+            default=0
+        )
+        parser.add_argument(
+            "--delta",
+            help="Only send new and changed voters and delete voters of the imported counties missing from the file",
+            action="store_true"
+        )
+        parser.add_argument(
+            "--resume",
+            help="Skip the files and rows committed by an earlier, interrupted import of the same file",
+            action="store_true"
+        )
+        parser.add_argument(
+            "--county",
+            help="Export only the voters of this county code"
+        )
+        parser.add_argument(
+            "--precinct",
+            help="Export only the voters of this precinct"
+        )
+        parser.add_argument(
+            "--party",
+            help="Export only the voters of this party code"
+        )
+        parser.add_argument(
+            "--voted-since",
+            help="Export only the voters who voted on or after this YYYY-MM-DD date",
+            type=lambda value: datetime.date.fromisoformat(value).isoformat()
+        )
         parser.add_argument(
             '-v',
             '--version',
             action='version',
             version=__version__
         )
+        # The stream a walking list exported to '-' is written to
+        parser.set_defaults(output=sys.stdout)
+        args = parser.parse_args()
+        if args.action == "export" and args.file == "-":
+            # Standard output only carries the CSV, every message and error is printed to standard error instead
+            sys.stdout = sys.stderr
         try:
-            main(parser.parse_args())
+            main(args)
         except KeyboardInterrupt:
             print("\nShutdown by keyboard interrupt...exiting")
     except Exception as e: